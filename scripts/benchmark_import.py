@@ -0,0 +1,72 @@
+"""Benchmark of the time needed to import Pharmpy and parse a first model
+
+Every measurement is made in a new Python process. Run from the root of the repository:
+
+    python scripts/benchmark_import.py [path/to/model.mod] [--repeat N]
+
+The cold runs use an empty temporary directory, so that no cached Lark parsers can be
+used. The warm runs reuse the parsers cached by the previous runs.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CODE = '''
+import time
+start = time.perf_counter()
+import pharmpy.modeling
+imported = time.perf_counter()
+model = pharmpy.modeling.read_model({path!r})
+model.statements
+model.parameters
+model.dataset
+parsed = time.perf_counter()
+print(imported - start, parsed - imported)
+'''
+
+
+def measure(path, tmpdir):
+    env = {**os.environ, 'TMPDIR': tmpdir}
+    output = subprocess.run(
+        [sys.executable, '-c', CODE.format(path=path)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    import_time, parse_time = map(float, output.split())
+    return import_time, parse_time
+
+
+def report(name, times):
+    import_times, parse_times = zip(*times)
+    print(
+        f'{name:<6} import {statistics.median(import_times):.3f} s, '
+        f'first parse {statistics.median(parse_times):.3f} s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default='tests/testdata/nonmem/pheno_real.mod')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cold = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cold.append(measure(args.path, tmpdir))
+    report('cold', cold)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        measure(args.path, tmpdir)
+        warm = [measure(args.path, tmpdir) for _ in range(args.repeat)]
+    report('warm', warm)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import TYPE_CHECKING, Mapping, Set
+from typing import TYPE_CHECKING, Callable, Mapping, Set
 
 if TYPE_CHECKING:
     import numpy as np
@@ -22,11 +22,37 @@ def eval_expr(
     if fs:
         ordered_symbols, fn = _lambdify_canonical(expr)
         data = [datamap[rv] for rv in ordered_symbols]
-        return fn(*data)
+        values = fn(*data)
+        # NOTE: All symbols could have been mapped to scalars
+        return np.full(datasize, values) if np.ndim(values) == 0 else values
 
     return np.full(datasize, float(expr))
 
 
+def compile_expr(expr: sympy.Expr) -> Callable[[int, Mapping[sympy.Expr, np.ndarray]], np.ndarray]:
+    """Compile an expression into a function with the same signature as eval_expr
+
+    The expression is lambdified once and the returned function holds on to the
+    compiled kernel so that repeated evaluations are independent of the cache of
+    eval_expr.
+    """
+    fs = expr.free_symbols
+
+    if not fs:
+        value = float(expr)
+        return lambda datasize, datamap: np.full(datasize, value)
+
+    ordered_symbols, fn = _lambdify(expr)
+
+    def evaluate(datasize: int, datamap: Mapping[sympy.Expr, np.ndarray]) -> np.ndarray:
+        data = [datamap[rv] for rv in ordered_symbols]
+        values = fn(*data)
+        # NOTE: All symbols could have been mapped to scalars
+        return np.full(datasize, values) if np.ndim(values) == 0 else values
+
+    return evaluate
+
+
 @lru_cache(maxsize=256)
 def _free_symbols(expr: sympy.Expr) -> Set[sympy.Expr]:
     return expr.free_symbols  # pyright: ignore [reportReturnType]
@@ -34,6 +60,10 @@ def _free_symbols(expr: sympy.Expr) -> Set[sympy.Expr]:
 
 @lru_cache(maxsize=256)
 def _lambdify_canonical(expr: sympy.Expr):
+    return _lambdify(expr)
+
+
+def _lambdify(expr: sympy.Expr):
     fs = _free_symbols(expr)
     ordered_symbols = sorted(fs, key=str)
     # NOTE: Substitution allows to use cse. Otherwise weird things happen with
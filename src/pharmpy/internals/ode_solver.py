@@ -0,0 +1,330 @@
+"""Numeric solution of ODE systems with dose events for many individuals at once
+
+The events of all individuals are merged into breakpoints laid out as
+(individual, step). Between two breakpoints the parameters and the infusion rates
+are constant so linear systems can be advanced exactly with a matrix exponential
+and nonlinear systems with one call to an ODE solver for step j of all
+individuals together.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import numpy as np
+    from scipy import integrate, linalg, sparse
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps.scipy import integrate, linalg, sparse
+
+_RTOL = 1e-8
+_ATOL = 1e-12
+
+
+@dataclass(frozen=True)
+class Breakpoints:
+    """Events of all individuals
+
+    All arrays have the individuals in the first dimension and the steps in the
+    second. At each breakpoint the system is first integrated from the previous
+    breakpoint, then optionally reset, then a bolus dose is added and finally the
+    state is stored as the amounts of a record. A bolus dose with a dosing interval
+    is a steady state dose, which replaces the state with the amounts at steady state
+    directly after the dose.
+    """
+
+    time: np.ndarray
+    step: np.ndarray
+    record: np.ndarray
+    compartment: np.ndarray
+    bolus: np.ndarray
+    interval: np.ndarray
+    rates: np.ndarray
+    reset: np.ndarray
+    output: np.ndarray
+    nrecords: int
+
+
+def create_breakpoints(
+    individual: np.ndarray,
+    time: np.ndarray,
+    reset: np.ndarray,
+    compartment: np.ndarray,
+    amount: np.ndarray,
+    duration: np.ndarray,
+    lag: np.ndarray,
+    interval: np.ndarray,
+    ncompartments: int,
+) -> Breakpoints:
+    """Create breakpoints from dataset records
+
+    Parameters
+    ----------
+    individual : np.ndarray
+        Index of the individual of each record. Must be sorted.
+    time : np.ndarray
+        Time of each record
+    reset : np.ndarray
+        True for records resetting the system
+    compartment : np.ndarray
+        Index of the dose compartment of each record or -1 for no dose
+    amount : np.ndarray
+        Amount of each dose
+    duration : np.ndarray
+        Duration of each dose. Bolus doses have a duration of 0.
+    lag : np.ndarray
+        Lag time of each dose
+    interval : np.ndarray
+        Dosing interval of each steady state bolus dose without lag time or 0 for
+        other records. Steady state doses also reset the system.
+    ncompartments : int
+        Number of compartments of the system
+
+    Returns
+    -------
+    Breakpoints
+        All breakpoints
+    """
+    nrecords = len(time)
+    records = np.arange(nrecords)
+    is_dose = compartment >= 0
+    is_infusion = is_dose & (duration > 0)
+    is_lagged = is_dose & (lag != 0)
+    rate = np.where(is_infusion, amount / np.where(is_infusion, duration, 1.0), 0.0)
+
+    # NOTE: Doses without lag time are given at their own record
+    immediate = is_dose & ~is_lagged
+    lagged = records[is_lagged]
+    infusions = records[is_infusion]
+    extra_individual = np.concatenate((individual[lagged], individual[infusions]))
+    extra_time = np.concatenate(
+        (time[lagged] + lag[lagged], time[infusions] + lag[infusions] + duration[infusions])
+    )
+    extra_compartment = np.concatenate((compartment[lagged], compartment[infusions]))
+    extra_bolus = np.concatenate(
+        (np.where(is_infusion[lagged], 0.0, amount[lagged]), np.zeros(len(infusions)))
+    )
+    extra_rate = np.concatenate((rate[lagged], -rate[infusions]))
+
+    nextra = len(extra_time)
+    ind = np.concatenate((individual, extra_individual))
+    t = np.concatenate((time, extra_time))
+    # NOTE: Events that coincide with a record are handled before the record
+    kind = np.concatenate((np.ones(nrecords, dtype=int), np.zeros(nextra, dtype=int)))
+    seq = np.arange(nrecords + nextra)
+    order = np.lexsort((seq, kind, t, ind))
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+
+    ind = ind[order]
+    t = t[order]
+    is_record = kind[order] == 1
+    comp = np.concatenate((np.where(immediate, compartment, -1), extra_compartment))[order]
+    bolus = np.concatenate((np.where(immediate & ~is_infusion, amount, 0.0), extra_bolus))[order]
+    drate = np.concatenate((np.where(immediate, rate, 0.0), extra_rate))[order]
+    ii = np.concatenate((interval, np.zeros(nextra)))[order]
+    rst = np.concatenate((reset | (interval > 0), np.zeros(nextra, dtype=bool)))[order]
+    output = np.where(is_record, seq[order], -1)
+
+    first = np.ones(len(ind), dtype=bool)
+    first[1:] = ind[1:] != ind[:-1]
+    segment = np.cumsum(first | rst)
+
+    # NOTE: An infusion that is interrupted by a reset should not end after it
+    start = np.where(
+        is_lagged[infusions],
+        position[np.minimum(nrecords + np.searchsorted(lagged, infusions), len(position) - 1)],
+        position[infusions],
+    )
+    end = position[nrecords + len(lagged) + np.arange(len(infusions))]
+    drate[end[segment[start] != segment[end]]] = 0.0
+
+    # NOTE: The parameters of the next record are used for the interval up to an event
+    # and events after the last record of an individual are dropped
+    nbp = len(ind)
+    next_record = np.where(is_record, np.arange(nbp), nbp)
+    next_record = np.minimum.accumulate(next_record[::-1])[::-1]
+    keep = next_record < nbp
+    keep[keep] = ind[next_record[keep]] == ind[keep]
+    record = np.where(keep, output[np.minimum(next_record, nbp - 1)], -1)
+
+    changes = np.zeros((nbp, ncompartments))
+    has_change = comp >= 0
+    changes[np.flatnonzero(has_change), comp[has_change]] = drate[has_change]
+    before = np.cumsum(changes, axis=0) - changes
+    segment_start = np.flatnonzero(np.diff(segment, prepend=0))
+    rates = np.zeros((nbp, ncompartments))
+    rates[1:] = before[1:] - before[segment_start[segment[:-1] - 1]]
+    rates[first] = 0.0
+
+    step = np.zeros(nbp)
+    step[1:] = t[1:] - t[:-1]
+    step[first] = 0.0
+
+    ind, t, step, record, comp, bolus, ii, rates, rst, output = (
+        a[keep] for a in (ind, t, step, record, comp, bolus, ii, rates, rst, output)
+    )
+
+    nindividuals = int(individual[-1]) + 1 if nrecords else 0
+    counts = np.bincount(ind, minlength=nindividuals)
+    length = int(counts.max()) if nrecords else 0
+    starts = np.cumsum(counts) - counts
+    j = np.arange(len(ind)) - starts[ind]
+
+    def padded(values, fill):
+        a = np.full((nindividuals, length) + values.shape[1:], fill, dtype=values.dtype)
+        a[ind, j] = values
+        return a
+
+    return Breakpoints(
+        time=padded(t, 0.0),
+        step=padded(step, 0.0),
+        record=padded(record, 0),
+        compartment=padded(comp, -1),
+        bolus=padded(bolus, 0.0),
+        interval=padded(ii, 0.0),
+        rates=padded(rates, 0.0),
+        reset=padded(rst, False),
+        output=padded(output, -1),
+        nrecords=nrecords,
+    )
+
+
+def solve_linear(
+    breakpoints: Breakpoints, matrices: np.ndarray, inputs: np.ndarray, initial: np.ndarray
+) -> np.ndarray:
+    """Solve a linear system dA/dt = KA + b for all records
+
+    Parameters
+    ----------
+    breakpoints : Breakpoints
+        All breakpoints
+    matrices : np.ndarray
+        The compartmental matrix K for each record
+    inputs : np.ndarray
+        Zero order inputs b for each record
+    initial : np.ndarray
+        Initial amounts for each individual
+
+    Returns
+    -------
+    np.ndarray
+        Amounts for each record
+    """
+    n = initial.shape[1]
+    bp = breakpoints
+    active = bp.step > 0
+    record = bp.record[active]
+    augmented = np.zeros((len(record), n + 1, n + 1))
+    augmented[:, :n, :n] = matrices[record]
+    augmented[:, :n, n] = inputs[record] + bp.rates[active]
+    augmented *= bp.step[active][:, np.newaxis, np.newaxis]
+    # NOTE: The exponential of the augmented matrix gives both the propagator and
+    # the integral of it times the constant input
+    propagators = np.broadcast_to(np.eye(n + 1), bp.step.shape + (n + 1, n + 1)).copy()
+    if len(record):
+        propagators[active] = linalg.expm(augmented)
+
+    # NOTE: Directly after a dose d at steady state the amounts are (I - exp(K*II))^-1 d
+    steady = bp.interval > 0
+    steady_states = np.zeros(bp.interval.shape + (n,))
+    if np.any(steady):
+        record = bp.record[steady]
+        propagator = linalg.expm(matrices[record] * bp.interval[steady][:, np.newaxis, np.newaxis])
+        doses = np.zeros((len(record), n))
+        doses[np.arange(len(record)), bp.compartment[steady]] = bp.bolus[steady]
+        steady_states[steady] = np.linalg.solve(np.eye(n) - propagator, doses[..., np.newaxis])[
+            ..., 0
+        ]
+
+    amounts = np.empty((bp.nrecords, n))
+    state = initial.copy()
+    for j in range(bp.step.shape[1]):
+        propagator = propagators[:, j]
+        state = np.einsum('ikl,il->ik', propagator[:, :n, :n], state) + propagator[:, :n, n]
+        _handle_events(bp, j, state, initial, amounts, steady_states[:, j])
+    return amounts
+
+
+def solve_nonlinear(
+    breakpoints: Breakpoints,
+    rhs: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+    initial: np.ndarray,
+) -> np.ndarray:
+    """Solve a general system dA/dt = f(A, t) for all records
+
+    Parameters
+    ----------
+    breakpoints : Breakpoints
+        All breakpoints
+    rhs : Callable
+        Function of amounts, times and records giving the derivatives. All arguments
+        and the result have one row per individual.
+    initial : np.ndarray
+        Initial amounts for each individual
+
+    Returns
+    -------
+    np.ndarray
+        Amounts for each record
+    """
+    n = initial.shape[1]
+    bp = breakpoints
+    if np.any(bp.interval > 0):
+        raise ValueError('Steady state doses are only supported for linear ODE systems')
+    amounts = np.empty((bp.nrecords, n))
+    state = initial.copy()
+    for j in range(bp.step.shape[1]):
+        active = np.flatnonzero(bp.step[:, j] > 0)
+        if len(active):
+            state[active] = _integrate(
+                rhs,
+                state[active],
+                bp.time[active, j] - bp.step[active, j],
+                bp.step[active, j],
+                bp.record[active, j],
+                bp.rates[active, j],
+            )
+        _handle_events(bp, j, state, initial, amounts)
+    return amounts
+
+
+def _integrate(rhs, state, start, step, record, rates):
+    # NOTE: Time is rescaled so that all individuals are integrated over [0, 1]
+    # together. Individuals are independent so the jacobian is block diagonal.
+    m, n = state.shape
+    scale = step[:, np.newaxis]
+
+    def fun(s, y):
+        return (scale * (rhs(y.reshape(m, n), start + s * step, record) + rates)).ravel()
+
+    sparsity = sparse.block_diag([np.ones((n, n))] * m)
+    sol = integrate.solve_ivp(
+        fun,
+        (0.0, 1.0),
+        state.ravel(),
+        method='BDF',
+        rtol=_RTOL,
+        atol=_ATOL,
+        jac_sparsity=sparsity,
+        t_eval=[1.0],
+    )
+    if not sol.success:
+        raise RuntimeError(f'Could not integrate ODE system: {sol.message}')
+    return sol.y[:, -1].reshape(m, n)
+
+
+def _handle_events(bp: Breakpoints, j: int, state, initial, amounts, steady_states=None):
+    reset = bp.reset[:, j]
+    state[reset] = initial[reset]
+    comp = bp.compartment[:, j]
+    dosed = np.flatnonzero(comp >= 0)
+    state[dosed, comp[dosed]] += bp.bolus[dosed, j]
+    if steady_states is not None:
+        steady = bp.interval[:, j] > 0
+        state[steady] = steady_states[steady]
+    output = bp.output[:, j]
+    stored = output >= 0
+    amounts[output[stored]] = state[stored]
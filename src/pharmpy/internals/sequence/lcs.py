@@ -1,4 +1,4 @@
-from typing import Iterator, Literal, Sequence, Tuple, TypeVar
+from typing import Dict, Hashable, Iterator, List, Literal, Sequence, Tuple, TypeVar, Union
 
 T = TypeVar('T')
 C = Literal[-1, 0, 1]
@@ -7,68 +7,141 @@ C = Literal[-1, 0, 1]
 def diff(old: Sequence[T], new: Sequence[T]) -> Iterator[Tuple[C, T]]:
     """Get diff between a and b in order for all elements
 
-    Optimizes by first handling equal elements from the head and tail
-    Each entry is a pair of operation (+1, -1 or 0) and the element
+    Uses the linear space variant of the algorithm of Myers, which needs
+    O((N+M)D) time for sequences of lengths N and M with D differences.
+    Each entry is a pair of operation (+1, -1 or 0) and the element. Equal
+    elements are taken from new. In each run of changes all removed elements
+    come before all added elements.
     """
-    i = 0
-    for a, b in zip(old, new):
-        if a == b:
-            yield (0, b)
-            i += 1
+    a, b = _keys(old, new)
+    added = []
+    for op, i in _diff(a, b):
+        if op == -1:
+            yield -1, old[i]
+        elif op == 1:
+            added.append(i)
         else:
-            break
+            for j in added:
+                yield 1, new[j]
+            added.clear()
+            yield 0, new[i]
+    for j in added:
+        yield 1, new[j]
 
-    rold = old[i:]
-    rnew = new[i:]
 
-    saved = []
-    for a, b in zip(reversed(rold), reversed(rnew)):
-        if a == b:
-            saved.append((0, b))
-        else:
-            break
+def _keys(old: Sequence[T], new: Sequence[T]) -> Tuple[Sequence, Sequence]:
+    # NOTE: Elements are replaced by small integers so that all comparisons made
+    # by the algorithm are cheap. Elements that cannot be hashed are compared as is.
+    ids: Dict[Hashable, int] = {}
+    try:
+        a = [ids.setdefault(x, len(ids)) for x in old]  # pyright: ignore
+        b = [ids.setdefault(x, len(ids)) for x in new]  # pyright: ignore
+    except TypeError:
+        return old, new
+    return a, b
 
-    rold = rold[: len(rold) - len(saved)]
-    rnew = rnew[: len(rnew) - len(saved)]
 
-    c = _matrix(rold, rnew)
-    for op, val in _diff(c, rold, rnew, len(rold) - 1, len(rnew) - 1):
-        yield op, val
+def _diff(a: Sequence, b: Sequence) -> Iterator[Tuple[C, int]]:
+    """Diff as pairs of operation and index into a (for -1) or b (for 0 and +1)
 
-    while saved:
-        yield saved.pop()
+    Subproblems are kept on an explicit stack instead of using recursion.
+    Operations to output are pushed as (op, lo, hi) and subproblems as
+    (alo, ahi, blo, bhi). Items are pushed in reverse order.
+    """
+    stack: List[Union[Tuple[C, int, int], Tuple[int, int, int, int]]] = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if len(item) == 3:
+            op, lo, hi = item
+            for i in range(lo, hi):
+                yield op, i
+            continue
 
+        alo, ahi, blo, bhi = item
+        start = blo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        end = bhi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+
+        stack.append((0, bhi, end))
+        split = _middle_snake(a, b, alo, ahi, blo, bhi) if alo < ahi and blo < bhi else None
+        if split is None:
+            stack.append((1, blo, bhi))
+            stack.append((-1, alo, ahi))
+        else:
+            x, y = split
+            stack.append((x, ahi, y, bhi))
+            stack.append((alo, x, blo, y))
+        stack.append((0, start, blo))
 
-def _matrix(a: Sequence[T], b: Sequence[T]) -> Sequence[Sequence[int]]:
-    # generate matrix of length of longest common subsequence for sublists of both lists
-    lengths = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
-    for i, x in enumerate(a):
-        for j, y in enumerate(b):
-            if x == y:
-                lengths[i + 1][j + 1] = lengths[i][j] + 1
-            else:
-                lengths[i + 1][j + 1] = max(lengths[i + 1][j], lengths[i][j + 1])
-    return lengths
 
+def _middle_snake(
+    a: Sequence, b: Sequence, alo: int, ahi: int, blo: int, bhi: int
+) -> Union[Tuple[int, int], None]:
+    """Find a point on an optimal path through a[alo:ahi] and b[blo:bhi]
 
-def _diff(
-    c: Sequence[Sequence[int]], x: Sequence[T], y: Sequence[T], i: int, j: int
-) -> Iterator[Tuple[C, T]]:
-    """Print the diff using LCS length matrix using backtracking"""
-    if i < 0 and j < 0:
-        return
-    elif i < 0:
-        yield from _diff(c, x, y, i, j - 1)
-        yield 1, y[j]
-    elif j < 0:
-        yield from _diff(c, x, y, i - 1, j)
-        yield -1, x[i]
-    elif x[i] == y[j]:
-        yield from _diff(c, x, y, i - 1, j - 1)
-        yield 0, x[i]
-    elif c[i + 1][j] >= c[i][j + 1]:
-        yield from _diff(c, x, y, i, j - 1)
-        yield 1, y[j]
-    else:
-        yield from _diff(c, x, y, i - 1, j)
-        yield -1, x[i]
+    Searches from both ends at the same time until the paths overlap. Returns
+    None if the sequences have no element in common.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    length = 2 * max_d + 2
+    vf = [-1] * length
+    vb = [-1] * length
+    vf[offset + 1] = 0
+    vb[offset + 1] = 0
+    delta = n - m
+    # NOTE: If the total number of elements is odd the paths will overlap while
+    # extending the forward path, otherwise while extending the backward path
+    front = delta % 2 != 0
+    kf_start = kf_end = kb_start = kb_end = 0
+    for d in range(max_d):
+        for k in range(-d + kf_start, d + 1 - kf_end, 2):
+            i = offset + k
+            if k == -d or (k != d and vf[i - 1] < vf[i + 1]):
+                x = vf[i + 1]
+            else:
+                x = vf[i - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[i] = x
+            if x > n:
+                kf_end += 2
+            elif y > m:
+                kf_start += 2
+            elif front:
+                j = offset + delta - k
+                if 0 <= j < length and vb[j] != -1 and x >= n - vb[j]:
+                    return alo + x, blo + y
+
+        for k in range(-d + kb_start, d + 1 - kb_end, 2):
+            j = offset + k
+            if k == -d or (k != d and vb[j - 1] < vb[j + 1]):
+                x = vb[j + 1]
+            else:
+                x = vb[j - 1] + 1
+            y = x - k
+            while x < n and y < m and a[ahi - x - 1] == b[bhi - y - 1]:
+                x += 1
+                y += 1
+            vb[j] = x
+            if x > n:
+                kb_end += 2
+            elif y > m:
+                kb_start += 2
+            elif not front:
+                i = offset + delta - k
+                if 0 <= i < length and vf[i] != -1:
+                    xf = vf[i]
+                    yf = xf - (i - offset)
+                    if xf >= n - x:
+                        return alo + xf, blo + yf
+    return None
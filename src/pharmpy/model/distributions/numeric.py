@@ -16,6 +16,20 @@ class NumericDistribution(Immutable):
     def sample(self, rng, size: int) -> np.ndarray:
         pass
 
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Number of standard normal draws needed for one sample"""
+        pass
+
+    @abstractmethod
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        """Transform standard normal draws of shape (size, dimension) into samples
+
+        Gives the same samples as sample for z drawn with rng.standard_normal.
+        """
+        pass
+
 
 class ConstantDistribution(NumericDistribution):
     def __init__(self, value: Union[int, float]):
@@ -24,6 +38,13 @@ class ConstantDistribution(NumericDistribution):
     def sample(self, rng, size: int) -> np.ndarray:
         return np.full(size, self._value)
 
+    @property
+    def dimension(self) -> int:
+        return 0
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        return np.full(len(z), self._value)
+
 
 class NormalDistribution(NumericDistribution):
     def __init__(self, mean, std):
@@ -33,6 +54,13 @@ class NormalDistribution(NumericDistribution):
     def sample(self, rng, size: int) -> np.ndarray:
         return rng.normal(self._mean, self._std, size=size)
 
+    @property
+    def dimension(self) -> int:
+        return 1
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        return self._mean + self._std * z[:, 0]
+
 
 class MultivariateNormalDistribution(NumericDistribution):
     def __init__(self, mu, sigma):
@@ -41,3 +69,12 @@ class MultivariateNormalDistribution(NumericDistribution):
 
     def sample(self, rng, size: int) -> np.ndarray:
         return rng.multivariate_normal(self._mu, self._sigma, size=size)
+
+    @property
+    def dimension(self) -> int:
+        return len(self._mu)
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        # NOTE: This is the factorization used by Generator.multivariate_normal
+        _, s, vh = np.linalg.svd(self._sigma)
+        return z @ (np.sqrt(s)[:, None] * vh) + self._mu
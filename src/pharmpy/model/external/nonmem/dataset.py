@@ -1,6 +1,8 @@
 # Read dataset from file
+import operator
 import re
 import warnings
+from functools import lru_cache
 from io import StringIO
 
 from lark import Lark
@@ -48,6 +50,37 @@ class NMTRANDataIO(StringIO):
         super().__init__(contents)
 
 
+_fortran_special_regexp = re.compile(r'[dD]|[^eE][+\-]|^[+\-]$')
+
+
+def _read_table(file_io):
+    """Split a filtered dataset into a DataFrame of strings
+
+    The NM-TRAN delimiters are normalized into single commas using plain string
+    operations so that the fast C engine of pandas can be used. Datasets with a varying
+    number of items per row will be read using the slower python engine since it pads and
+    truncates rows differently.
+    """
+    contents = file_io.getvalue()
+    normalized = '\n'.join(line.strip() for line in contents.split('\n'))
+    # A TAB is a delimiter just like a comma
+    normalized = normalized.replace('\t', ',')
+    while '  ' in normalized:
+        normalized = normalized.replace('  ', ' ')
+    normalized = normalized.replace(' ,', ',').replace(', ', ',').replace(' ', ',')
+
+    options = dict(na_filter=False, header=None, quoting=3, dtype=object, index_col=False)
+    df = None
+    if '\r' not in normalized:
+        try:
+            df = pd.read_table(StringIO(normalized), sep=',', engine='c', **options)
+        except pd.errors.ParserError:
+            pass
+    if df is None or normalized.count(',') != len(df) * (len(df.columns) - 1):
+        df = pd.read_table(StringIO(contents), sep=r' *, *| *[\t] *| +', engine='python', **options)
+    return df
+
+
 def convert_fortran_number(number_string):
     """This function will try to convert the number_string from the general fortran exponential format
     into an np.float64. It covers "1d1", "1D1", "a+b", "a-b", "+" and "-". All other cases will
@@ -97,6 +130,34 @@ def _convert_data_item(x, null_value):
     return converted
 
 
+def _convert_data_column(column, null_value):
+    """Convert a column of data items to float64
+
+    Gives the same result as applying _convert_data_item to each item, but ordinary numbers
+    are converted in bulk. Only numbers of the special fortran format are converted one by one.
+    Columns with invalid items are converted itemwise to get the same error.
+    """
+    if len(column) == 0:
+        return column.apply(_convert_data_item, args=(null_value,))
+    items = column.where(column.notna() & ~column.isin(('.', '')), null_value)
+    values = items.to_numpy(dtype=object)
+    if values.astype(str).dtype.itemsize // np.dtype('U1').itemsize > 24:
+        return column.apply(_convert_data_item, args=(null_value,))
+    try:
+        converted = values.astype(np.float64)
+    except ValueError:
+        special = items.str.contains(_fortran_special_regexp).to_numpy()
+        converted = np.empty(len(values), dtype=np.float64)
+        try:
+            converted[~special] = values[~special].astype(np.float64)
+            converted[special] = [convert_fortran_number(x) for x in values[special]]
+        except ValueError:
+            return column.apply(_convert_data_item, args=(null_value,))
+    for na_value in data.conf.na_values:
+        converted[converted == na_value] = np.nan
+    return pd.Series(converted, index=column.index, name=column.name)
+
+
 def _make_ids_unique(df, columns):
     """Check if id numbers are reused and make renumber. If not simply pass through the dataset."""
     if 'ID' in df.columns:
@@ -117,6 +178,79 @@ def _make_ids_unique(df, columns):
     return df
 
 
+_filter_grammar = r'''
+    start: column skip1? (operator skip2?)? expr
+    column: COLNAME
+    COLNAME: /\w+/
+    skip1: WS
+    skip2: WS
+    WS: /\s+/
+    operator: OP_EQ | OP_STR_EQ | OP_NE | OP_STR_NE | OP_LT | OP_GT | OP_LT_EQ | OP_GT_EQ
+    OP_EQ    : ".EQN."
+    OP_STR_EQ: ".EQ." | "==" | "="
+    OP_NE    : ".NEN."
+    OP_STR_NE: ".NE." | "/="
+    OP_LT    : ".LT." | "<"
+    OP_GT    : ".GT." | ">"
+    OP_LT_EQ : ".LE." | "<="
+    OP_GT_EQ : ".GE." | ">="
+    expr: EXPR | QEXPR
+    EXPR  : /[^"',;()=<>\/.\s][^"',;()=\s]*/
+    QEXPR : /"[^"]*"/
+          | /'[^']*'/
+'''
+
+# Operator token type to comparison function and if the comparison is numeric
+_filter_operators = {
+    'OP_EQ': (operator.eq, True),
+    'OP_NE': (operator.ne, True),
+    'OP_LT': (operator.lt, True),
+    'OP_GT': (operator.gt, True),
+    'OP_LT_EQ': (operator.le, True),
+    'OP_GT_EQ': (operator.ge, True),
+    'OP_STR_EQ': (operator.eq, False),
+    'OP_STR_NE': (operator.ne, False),
+}
+
+
+@lru_cache(maxsize=None)
+def _filter_parser():
+    return Lark(
+        _filter_grammar,
+        start='start',
+        parser='lalr',
+        lexer='contextual',
+        propagate_positions=False,
+        maybe_placeholders=False,
+        debug=False,
+        cache=True,
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_filter(statement):
+    """Compile one IGNORE/ACCEPT statement into (column, comparison, expr, numeric)"""
+    tree = _filter_parser().parse(statement)
+    column = ''
+    expr = ''
+    comparison, numeric = _filter_operators['OP_STR_EQ']
+    for st in tree.iter_subtrees():
+        if st.data == 'column':
+            column = str(st.children[0])
+        elif st.data == 'expr':
+            expr = str(st.children[0])
+        elif st.data == 'operator':
+            operator_token = st.children[0]
+            tp = operator_token.type  # pyright: ignore [reportGeneralTypeIssues]
+            comparison, numeric = _filter_operators[tp]
+    if len(expr) >= 3 and (
+        (expr.startswith("'") and expr.endswith("'"))
+        or (expr.startswith('"') and expr.endswith('"'))
+    ):
+        expr = expr[1:-1]
+    return column, comparison, expr, numeric
+
+
 def _filter_ignore_accept(df, ignore, accept, null_value):
     if ignore and accept:
         raise ValueError("Cannot have both IGNORE and ACCEPT")
@@ -126,99 +260,29 @@ def _filter_ignore_accept(df, ignore, accept, null_value):
 
     statements = ignore if ignore else accept
 
-    grammar = r'''
-        start: column skip1? (operator skip2?)? expr
-        column: COLNAME
-        COLNAME: /\w+/
-        skip1: WS
-        skip2: WS
-        WS: /\s+/
-        operator: OP_EQ | OP_STR_EQ | OP_NE | OP_STR_NE | OP_LT | OP_GT | OP_LT_EQ | OP_GT_EQ
-        OP_EQ    : ".EQN."
-        OP_STR_EQ: ".EQ." | "==" | "="
-        OP_NE    : ".NEN."
-        OP_STR_NE: ".NE." | "/="
-        OP_LT    : ".LT." | "<"
-        OP_GT    : ".GT." | ">"
-        OP_LT_EQ : ".LE." | "<="
-        OP_GT_EQ : ".GE." | ">="
-        expr: EXPR | QEXPR
-        EXPR  : /[^"',;()=<>\/.\s][^"',;()=\s]*/
-        QEXPR : /"[^"]*"/
-              | /'[^']*'/
-    '''
-    parser = Lark(
-        grammar,
-        start='start',
-        parser='lalr',
-        lexer='contextual',
-        propagate_positions=False,
-        maybe_placeholders=False,
-        debug=False,
-        cache=True,
-    )
+    # The statements are applied one after the other, so an item that cannot be converted
+    # is only an error if its row has not already been filtered out by an earlier statement.
+    # Refer to NONMEM fileformat documentation for further information.
+    keep = np.ones(len(df), dtype=bool)
+    converted = {}
     for s in statements:
-        tree = parser.parse(s)
-        column = ''
-        expr = ''
-        operator = '=='
-        operator_type = str
-        for st in tree.iter_subtrees():
-            if st.data == 'column':
-                column = str(st.children[0])
-            elif st.data == 'expr':
-                expr = str(st.children[0])
-            elif st.data == 'operator':
-                operator_token = st.children[0]
-                tp = operator_token.type  # pyright: ignore [reportGeneralTypeIssues]
-                if tp == 'OP_EQ':
-                    operator = '=='
-                    operator_type = float
-                elif tp == 'OP_NE':
-                    operator = '!='
-                    operator_type = float
-                elif tp == 'OP_LT':
-                    operator = '<'
-                    operator_type = float
-                elif tp == 'OP_GT':
-                    operator = '>'
-                    operator_type = float
-                elif tp == 'OP_LT_EQ':
-                    operator = '<='
-                    operator_type = float
-                elif tp == 'OP_GT_EQ':
-                    operator = '>='
-                    operator_type = float
-                elif tp == 'OP_STR_EQ':
-                    operator = '=='
-                    operator_type = str
-                elif tp == 'OP_STR_NE':
-                    operator = '!='
-                    operator_type = str
-        if len(expr) >= 3 and (
-            (expr.startswith("'") and expr.endswith("'"))
-            or (expr.startswith('"') and expr.endswith('"'))
-        ):
-            expr = expr[1:-1]
-
-        if operator_type == str:
-            expression = f'{column} {operator} "{expr}"'
-            if ignore:
-                expression = 'not(' + expression + ')'
-            df.query(expression, inplace=True)
+        column, comparison, expr, numeric = _compile_filter(s)
+        if numeric:
+            if column not in converted:
+                try:
+                    values = _convert_data_column(df[column], str(null_value)).to_numpy()
+                except DatasetError:
+                    values = np.full(len(df), np.nan)
+                    values[keep] = _convert_data_column(df[column][keep], str(null_value))
+                converted[column] = values
+            mask = comparison(converted[column], convert_fortran_number(expr))
         else:
-            # Need to temporary convert column. Refer to NONMEM fileformat documentation
-            # for further information.
-            # Using a name with spaces since this cannot collide with other NONMEM names
-            magic_colname = 'a a'
-            df[magic_colname] = df[column].apply(_convert_data_item, args=(str(null_value),))
-            expression = f'`{magic_colname}` {operator} {expr}'
-            if ignore:
-                expression = 'not(' + expression + ')'
-            df.query(expression, inplace=True)
-            df.drop(labels=magic_colname, axis=1, inplace=True)
-    df.reset_index(drop=True, inplace=True)
-    return df
+            mask = comparison(df[column].to_numpy(), expr)
+        if ignore:
+            keep &= ~mask
+        else:
+            keep &= mask
+    return df[keep].reset_index(drop=True)
 
 
 def read_nonmem_dataset(
@@ -260,16 +324,7 @@ def read_nonmem_dataset(
         raise KeyError('Column names are not unique')
 
     file_io = NMTRANDataIO(path_or_io, ignore_character)
-    df = pd.read_table(
-        file_io,
-        sep=r' *, *| *[\t] *| +',
-        na_filter=False,
-        header=None,
-        engine='python',
-        quoting=3,
-        dtype=object,
-        index_col=False,
-    )
+    df = _read_table(file_io)
 
     diff_cols = len(df.columns) - len(colnames)
     if diff_cols > 0:
@@ -296,7 +351,7 @@ def read_nonmem_dataset(
             x for x in parse_columns if x not in ['TIME', 'DATE', 'DAT1', 'DAT2', 'DAT3']
         ]
     for column in parse_columns:
-        df[column] = df[column].apply(_convert_data_item, args=(str(null_value),))
+        df[column] = _convert_data_column(df[column], str(null_value))
     df = _make_ids_unique(df, parse_columns)
 
     if not raw:
@@ -316,7 +371,7 @@ def read_nonmem_dataset(
             item in df.columns for item in ['DATE', 'DAT1', 'DAT2', 'DAT3']
         ):
             try:
-                df['TIME'] = df['TIME'].apply(_convert_data_item, args=(str(null_value),))
+                df['TIME'] = _convert_data_column(df['TIME'], str(null_value))
             except DatasetError:
                 pass
 
@@ -7,10 +7,33 @@ from pharmpy.internals.parse import GenericParser, InsertMissing, with_ignored_t
 grammar_root = Path(__file__).resolve().parent / 'grammars'
 
 
+class LazyLark:
+    """Lark parser of a record parser class built on first use
+
+    Building the parsers of all records takes a large part of the time needed to import
+    Pharmpy, so they are only built when a record of their kind is first parsed. The
+    parse tables are cached on disk by Lark, so that later processes only need to load
+    them.
+    """
+
+    def __get__(self, instance, owner):
+        grammar = Path(grammar_root / owner.grammar_filename).resolve()
+        with open(str(grammar), 'r') as fh:
+            lark = Lark(
+                fh,
+                **{
+                    **GenericParser.lark_options,
+                    'cache': True,
+                    **getattr(owner, 'grammar_options', {}),
+                },
+            )
+        # NOTE: Replace the descriptor so that the parser is only built once
+        owner.lark = lark
+        return lark
+
+
 def install_grammar(cls):
-    grammar = Path(grammar_root / cls.grammar_filename).resolve()
-    with open(str(grammar), 'r') as fh:
-        cls.lark = Lark(fh, **{**GenericParser.lark_options, **getattr(cls, 'grammar_options', {})})
+    cls.lark = LazyLark()
     return cls
 
 
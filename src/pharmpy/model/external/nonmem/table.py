@@ -1,15 +1,103 @@
 from __future__ import annotations
 
+import mmap
 import re
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Union
 
 from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.internals.math import flattened_to_symmetric
 
 
+def iterate_tables(
+    path: Union[str, Path], notitle: bool = False, nolabel: bool = False
+) -> Iterator[NONMEMTable]:
+    """Iterate over the tables of a NONMEM table file
+
+    The file is memory mapped and the boundaries between tables are found by scanning for
+    the TABLE NO. lines. Only one table at a time is parsed and kept in memory, which makes
+    it possible to process large simulation tables one subproblem at a time.
+    """
+    path = Path(path)
+    suffix = path.suffix
+    if path.stat().st_size == 0:
+        raise OSError("Empty table file")
+    with open(path, 'rb') as tablefile, mmap.mmap(
+        tablefile.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        if notitle:
+            yield _parse_table(mm[:], None, None)
+            return
+        starts = _table_starts(mm)
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        ends = starts[1:] + [len(mm)]
+        for start, end in zip(starts, ends):
+            newline = mm.find(b'\n', start, end)
+            content_start = end if newline == -1 else newline + 1
+            table_line = mm[start:content_start].decode()
+            yield _parse_table(mm[content_start:end], table_line, suffix)
+
+
+def _table_starts(mm) -> List[int]:
+    starts = []
+    pos = mm.find(b'TABLE NO.')
+    while pos != -1:
+        if pos == 0 or mm[pos - 1 : pos] == b'\n':
+            starts.append(pos)
+        pos = mm.find(b'TABLE NO.', pos + 1)
+    return starts
+
+
+# Repeated header lines in generic tables, i.e. all header lines but the first
+_header_line_regexp = re.compile(rb'^[^\S\n][A-Za-z_][^\n]*(?:\n|$)', re.MULTILINE)
+
+
+def _parse_table(content: bytes, table_line: Optional[str], suffix: Optional[str]) -> NONMEMTable:
+    if suffix == '.ext':
+        table = ExtTable(content)
+    elif suffix == '.phi':
+        table = PhiTable(content)
+    elif suffix == '.cov' or suffix == '.cor' or suffix == '.coi':
+        table = CovTable(content)
+    else:
+        newline = content.find(b'\n')
+        if newline != -1 and _header_line_regexp.search(content, newline + 1):
+            content = content[: newline + 1] + _header_line_regexp.sub(b'', content[newline + 1 :])
+        table = NONMEMTable(content)  # Fallback to non-specific table type
+
+    if table_line is not None:
+        m = re.match(r'TABLE NO.\s+(\d+)', table_line)
+        if not m:
+            raise ValueError(f"Illegal {suffix}-file: missing TABLE NO.")
+        table.number = int(m.group(1))
+        table.is_evaluation = False
+        if re.search(r'(Evaluation)', table_line):
+            table.is_evaluation = True  # No estimation step was run
+
+        m = re.match(
+            r'TABLE NO.\s+\d+: (.*?)(?:: ([\w-]+))?: (?:Goal Function=(.*): )?Problem=(\d+) '
+            r'Subproblem=(\d+) Superproblem1=(\d+) Iteration1=(\d+) Superproblem2=(\d+) '
+            r'Iteration2=(\d+)',
+            table_line,
+        )
+
+        if m:
+            table.method = m.group(1)
+            table.design_optimality = m.group(2)
+            table.goal_function = m.group(3)
+            table.problem = int(m.group(4))
+            table.subproblem = int(m.group(5))
+            table.superproblem1 = int(m.group(6))
+            table.iteration1 = int(m.group(7))
+            table.superproblem2 = int(m.group(8))
+            table.iteration2 = int(m.group(9))
+
+    return table
+
+
 class NONMEMTableFile:
     """A NONMEM table file that can contain multiple tables"""
 
@@ -21,86 +109,12 @@ class NONMEMTableFile:
         nolabel: bool = False,
     ):
         if path is not None:
-            path = Path(path)
-            suffix = path.suffix
-            tables = []
-            if path.stat().st_size == 0:
-                raise OSError("Empty table file")
-            with open(str(path), 'r') as tablefile:
-                if notitle:
-                    table = self._parse_table(
-                        tablefile.read().splitlines(keepends=True), notitle=notitle, nolabel=nolabel
-                    )
-                    tables.append(table)
-                else:
-                    current = []
-                    for line in tablefile:
-                        if line.startswith("TABLE NO."):
-                            if current:
-                                table = self._parse_table(current, suffix)
-                                tables.append(table)
-                            current = [line]
-                        else:
-                            current.append(line)
-                    table = self._parse_table(current, suffix)
-                    tables.append(table)
-            self.tables = tables
+            self.tables = list(iterate_tables(path, notitle=notitle, nolabel=nolabel))
         elif tables is not None:
             self.tables = tables
         else:
             raise ValueError('NONMEMTableFile: path and tables cannot be both None')
 
-    def _parse_table(
-        self,
-        content: List[str],
-        suffix: Optional[str] = None,
-        notitle: bool = False,
-        nolabel: bool = False,
-    ) -> NONMEMTable:
-        # NOTE: Content lines must contain endlines!
-
-        table_line = None if notitle else content.pop(0)
-
-        if suffix == '.ext':
-            table = ExtTable(''.join(content))
-        elif suffix == '.phi':
-            table = PhiTable(''.join(content))
-        elif suffix == '.cov' or suffix == '.cor' or suffix == '.coi':
-            table = CovTable(''.join(content))
-        else:
-            # Remove repeated header lines, but not the first
-            content[1:] = [line for line in content[1:] if not re.match(r'\s[A-Za-z_]', line)]
-            table = NONMEMTable(''.join(content))  # Fallback to non-specific table type
-
-        if table_line is not None:
-            m = re.match(r'TABLE NO.\s+(\d+)', table_line)
-            if not m:
-                raise ValueError(f"Illegal {suffix}-file: missing TABLE NO.")
-            table.number = int(m.group(1))
-            table.is_evaluation = False
-            if re.search(r'(Evaluation)', table_line):
-                table.is_evaluation = True  # No estimation step was run
-
-            m = re.match(
-                r'TABLE NO.\s+\d+: (.*?)(?:: ([\w-]+))?: (?:Goal Function=(.*): )?Problem=(\d+) '
-                r'Subproblem=(\d+) Superproblem1=(\d+) Iteration1=(\d+) Superproblem2=(\d+) '
-                r'Iteration2=(\d+)',
-                table_line,
-            )
-
-            if m:
-                table.method = m.group(1)
-                table.design_optimality = m.group(2)
-                table.goal_function = m.group(3)
-                table.problem = int(m.group(4))
-                table.subproblem = int(m.group(5))
-                table.superproblem1 = int(m.group(6))
-                table.iteration1 = int(m.group(7))
-                table.superproblem2 = int(m.group(8))
-                table.iteration2 = int(m.group(9))
-
-        return table
-
     def __iter__(self):
         return iter(self.tables)
 
@@ -154,7 +168,8 @@ class NONMEMTable:
 
     def __init__(self, content=None, df=None):
         if content is not None:
-            self._df = pd.read_table(StringIO(content), sep=r'\s+', engine='c')
+            buffer = BytesIO(content) if isinstance(content, bytes) else StringIO(content)
+            self._df = pd.read_table(buffer, sep=r'\s+', engine='c')
         elif df is not None:
             self._df = df
         else:
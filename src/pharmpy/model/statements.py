@@ -2,8 +2,20 @@ from __future__ import annotations
 
 import warnings
 from abc import ABC, abstractmethod
+from bisect import bisect_left
 from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional, Set, Tuple, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Container,
+    Iterable,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    overload,
+)
 
 import pharmpy.internals.unicode as unicode
 from pharmpy.basic import BooleanExpr, Expr, Matrix, TExpr, TSymbol
@@ -155,12 +167,18 @@ class Assignment(Statement):
         {ETA_CL, POP_CL}
 
         """
+        try:
+            return set(self._rhs_symbols)
+        except AttributeError:
+            pass
         prefuncs = self._expression._sympy_().atoms(sympy.Function)
         from sympy.core.function import AppliedUndef
 
         # Allow applied undefined functions
         funcs = {Expr(f) for f in prefuncs if isinstance(f, AppliedUndef)}
         symbols = self._expression.free_symbols
+        # NOTE: Cached since this is needed over and over again for dependency graphs
+        self._rhs_symbols = frozenset(funcs | symbols)
         return funcs | symbols
 
     def __eq__(self, other):
@@ -1946,6 +1964,35 @@ class Compartment(CompartmentBase):
         )
 
 
+def _defined_symbols(statement: Statement) -> Sequence[Expr]:
+    if isinstance(statement, Assignment):
+        return (statement.symbol,)
+    elif isinstance(statement, CompartmentalSystem):
+        return statement.amounts
+    else:
+        return ()
+
+
+def _add_dependency_edges(graph, statements: Sequence[Statement], targets: Container[int]):
+    """Add edges from each statement with index in targets to all previous statements
+    defining any of its right hand side symbols
+    """
+    definitions = {}
+    for i, statement in enumerate(statements):
+        if i in targets:
+            for symbol in statement.rhs_symbols:
+                for j in definitions.get(symbol, ()):
+                    graph.add_edge(i, j)
+        for symbol in _defined_symbols(statement):
+            definitions.setdefault(symbol, []).append(i)
+
+
+def _dependency_graph_from_edges(edges: Iterable[Tuple[int, int]]):
+    graph = nx.DiGraph()
+    graph.add_edges_from(edges)
+    return graph
+
+
 class Statements(Sequence, Immutable):
     """A sequence of symbolic statements describing the model
 
@@ -1961,8 +2008,19 @@ class Statements(Sequence, Immutable):
     """
 
     def __init__(self, statements: Optional[Union[Statements, Iterable[Statement]]] = None):
+        # The dependency graph is created lazily and derived Statements will update it
+        # incrementally when possible
+        self._graph = None
+        # Symbol to indices of defining statements and index to fully expanded expression
+        self._definitions = None
+        self._plain_definitions = False
+        self._expanded = None
         if isinstance(statements, Statements):
             self._statements = statements._statements
+            self._graph = statements._graph
+            self._definitions = statements._definitions
+            self._plain_definitions = statements._plain_definitions
+            self._expanded = statements._expanded
         elif statements is None:
             self._statements = ()
         else:
@@ -1976,7 +2034,14 @@ class Statements(Sequence, Immutable):
 
     def __getitem__(self, ind):
         if isinstance(ind, slice):
-            return Statements(self._statements[ind])
+            stats = Statements(self._statements[ind])
+            start, stop, step = ind.indices(len(self))
+            if self._graph is not None and step == 1:
+                # Dependencies between two statements do not depend on other statements
+                stats._graph = _dependency_graph_from_edges(
+                    (i - start, j - start) for i, j in self._graph.edges if start <= j and i < stop
+                )
+            return stats
         else:
             return self._statements[ind]
 
@@ -1985,11 +2050,16 @@ class Statements(Sequence, Immutable):
 
     def __add__(self, other: Union[Statements, Statement, Sequence[Statement]]) -> Statements:
         if isinstance(other, Statements):
-            return Statements(self._statements + other._statements)
+            stats = Statements(self._statements + other._statements)
         elif isinstance(other, Statement):
-            return Statements(self._statements + (other,))
+            stats = Statements(self._statements + (other,))
         else:
-            return Statements(self._statements + tuple(other))
+            stats = Statements(self._statements + tuple(other))
+        if self._graph is not None:
+            graph = self._graph.copy()
+            _add_dependency_edges(graph, stats._statements, range(len(self), len(stats)))
+            stats._graph = graph
+        return stats
 
     def __radd__(self, other: Union[Statement, Sequence[Statement]]) -> Statements:
         if isinstance(other, Statement):
@@ -2148,7 +2218,21 @@ class Statements(Sequence, Immutable):
         V = TVV⋅ℯ
         S₁ = V
         """
-        return Statements(s.subs(substitutions) for s in self)
+        new = tuple(s.subs(substitutions) for s in self)
+        # Keep unchanged statements to be able to reuse cached information
+        new = tuple(old if old == stat else stat for old, stat in zip(self._statements, new))
+        stats = Statements(new)
+        if self._graph is not None:
+            changed = {i for i, (old, stat) in enumerate(zip(self, new)) if old is not stat}
+            if all(
+                set(_defined_symbols(self[i])) == set(_defined_symbols(new[i])) for i in changed
+            ):
+                graph = self._graph.copy()
+                graph.remove_edges_from([(i, j) for i, j in self._graph.edges if i in changed])
+                graph.remove_nodes_from([n for n in self._graph.nodes if graph.degree(n) == 0])
+                _add_dependency_edges(graph, new, changed)
+                stats._graph = graph
+        return stats
 
     def _lookup_last_assignment(
         self, symbol: TSymbol
@@ -2235,32 +2319,46 @@ class Statements(Sequence, Immutable):
         symbol = Expr(symbol)
         expression = Expr(expression)
 
-        last = True
+        last = None
+        removed = set()
         new = list(self._statements)
         for i, stat in zip(range(len(new) - 1, -1, -1), reversed(new)):
             if isinstance(stat, Assignment) and stat.symbol == symbol:
-                if last:
+                if last is None:
                     new[i] = Assignment(symbol, expression)
-                    last = False
+                    last = i
                 else:
                     del new[i]
-        return Statements(new)
+                    removed.add(i)
+        stats = Statements(new)
+        if self._graph is not None:
+            if last is None:
+                stats._graph = self._graph
+            else:
+                # Only the dependencies of the reassigned statement change
+                index_map = {}
+                for i in range(len(self)):
+                    if i not in removed:
+                        index_map[i] = len(index_map)
+                graph = _dependency_graph_from_edges(
+                    (index_map[i], index_map[j])
+                    for i, j in self._graph.edges
+                    if i != last and i not in removed and j not in removed
+                )
+                _add_dependency_edges(graph, stats._statements, {index_map[last]})
+                stats._graph = graph
+        return stats
 
     def _create_dependency_graph(self):
-        """Create a graph of dependencies between statements"""
-        graph = nx.DiGraph()
-        for i in range(len(self) - 1, -1, -1):
-            rhs = self[i].rhs_symbols
-            for j in range(i - 1, -1, -1):
-                statement = self[j]
-                if isinstance(statement, Assignment):
-                    if statement.symbol in rhs:
-                        graph.add_edge(i, j)
-                elif isinstance(statement, CompartmentalSystem):
-                    amts = set(statement.amounts)
-                    if not rhs.isdisjoint(amts):
-                        graph.add_edge(i, j)
-        return graph
+        """Create a graph of dependencies between statements
+
+        The graph is created once and then cached. It must not be modified.
+        """
+        if self._graph is None:
+            graph = nx.DiGraph()
+            _add_dependency_edges(graph, self._statements, range(len(self)))
+            self._graph = graph
+        return self._graph
 
     def direct_dependencies(self, statement: Statement) -> Statements:
         """Find all direct dependencies of a statement
@@ -2407,14 +2505,71 @@ class Statements(Sequence, Immutable):
         PTVCL*WGT*exp(ETA_1)
         """
         expression = Expr(expression)
-        for statement in reversed(self):
-            if isinstance(statement, CompartmentalSystem):
-                raise ValueError(
-                    "CompartmentalSystem not supported by full_expression. Use the properties before_odes "
-                    "or after_odes."
-                )
-            expression = expression.subs({statement.symbol: statement.expression})
-        return expression
+        if any(isinstance(statement, CompartmentalSystem) for statement in self):
+            raise ValueError(
+                "CompartmentalSystem not supported by full_expression. Use the properties before_odes "
+                "or after_odes."
+            )
+        if not self._has_plain_definitions():
+            for statement in reversed(self):
+                expression = expression.subs({statement.symbol: statement.expression})
+            return expression
+        substitutions = {}
+        for symbol in expression.free_symbols:
+            i = self._definition_index(symbol, len(self))
+            if i is not None:
+                substitutions[symbol] = self._expanded_definition(i)
+        return expression.subs(substitutions) if substitutions else expression
+
+    def _has_plain_definitions(self) -> bool:
+        """Check that all assignments are to symbols, i.e. not for example to derivatives"""
+        if self._definitions is None:
+            definitions = {}
+            for i, statement in enumerate(self):
+                if isinstance(statement, Assignment):
+                    definitions.setdefault(statement.symbol, []).append(i)
+            plain = all(symbol in symbol.free_symbols for symbol in definitions)
+            self._definitions = definitions if plain else {}
+            self._plain_definitions = plain
+        return self._plain_definitions
+
+    def _definition_index(self, symbol: Expr, before: int) -> Optional[int]:
+        """Index of the last assignment of symbol before index before"""
+        indices = self._definitions.get(symbol)
+        if not indices:
+            return None
+        k = bisect_left(indices, before)
+        return indices[k - 1] if k > 0 else None
+
+    def _expanded_definition(self, i: int) -> Expr:
+        """Fully expanded expression of the assignment with index i
+
+        Expansions are memoized so that all expressions share the expansions of
+        common definitions. Only the definitions that are actually needed are expanded.
+        """
+        if self._expanded is None:
+            self._expanded = {}
+        expanded = self._expanded
+        stack = [i]
+        while stack:
+            k = stack[-1]
+            if k in expanded:
+                stack.pop()
+                continue
+            expression = self[k].expression
+            dependencies = {
+                symbol: self._definition_index(symbol, k) for symbol in expression.free_symbols
+            }
+            missing = [j for j in dependencies.values() if j is not None and j not in expanded]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            substitutions = {
+                symbol: expanded[j] for symbol, j in dependencies.items() if j is not None
+            }
+            expanded[k] = expression.subs(substitutions) if substitutions else expression
+        return expanded[i]
 
     def __eq__(self, other):
         if len(self) != len(other):
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Mapping, Optional, Union
+from typing import TYPE_CHECKING, Callable, Mapping, Optional, Union
 
 from pharmpy.basic import Expr, TExpr
-from pharmpy.internals.expr.eval import eval_expr
-from pharmpy.model import Model
+from pharmpy.internals.expr.eval import compile_expr, eval_expr
+from pharmpy.internals.ode_solver import create_breakpoints, solve_linear, solve_nonlinear
+from pharmpy.model import CompartmentalSystem, DataInfo, DatasetError, Infusion, Model
 
 from .expressions import (
     calculate_epsilon_gradient_expression,
@@ -12,6 +13,7 @@ from .expressions import (
     get_individual_prediction_expression,
     get_population_prediction_expression,
 )
+from .odes import get_initial_conditions, has_linear_odes
 
 if TYPE_CHECKING:
     import numpy as np
@@ -42,6 +44,32 @@ class DataFrameMapping(Mapping['sympy.Symbol', 'np.ndarray']):
         return map(sympy.Symbol, self._df.columns)
 
 
+class ParameterDataFrameMapping(DataFrameMapping):
+    """Map symbols to parameter values or else to dataset columns
+
+    Keeping the parameters out of the expression makes it possible to reuse the same
+    lambdified kernel for all parameter values.
+    """
+
+    def __init__(self, df: pd.DataFrame, parameters: ParameterMap):
+        super().__init__(df)
+        self._parameters = {str(key): float(value) for key, value in parameters.items()}
+
+    def __getitem__(self, symbol: sympy.Symbol):
+        try:
+            return self._parameters[symbol.name]
+        except KeyError:
+            return super().__getitem__(symbol)
+
+
+def _zero_etas(model: Model, df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        0,
+        index=df[model.datainfo.id_column.name].unique(),
+        columns=model.random_variables.etas.names,
+    )
+
+
 def evaluate_expression(
     model: Model,
     expression: Union[str, TExpr],
@@ -89,17 +117,67 @@ def evaluate_expression(
     743    5.165105
     Length: 744, dtype: float64
 
+    """
+    evaluator = create_expression_evaluator(model, expression)
+    return evaluator(parameter_estimates)
+
+
+def create_expression_evaluator(
+    model: Model, expression: Union[str, TExpr]
+) -> Callable[..., pd.Series]:
+    """Create a function that evaluates expression using model
+
+    The expression is expanded and compiled once with the population parameters
+    as arguments so that repeated evaluation for different parameter values only costs
+    numerical computation. Missing parameters will use the initial estimates of the
+    model.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    expression : str or TExpr
+        Expression to evaluate
+
+    Returns
+    -------
+    Callable
+        A function taking optional parameter estimates and an optional dataset and
+        returning a series of one evaluated value for each data record
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model, create_expression_evaluator
+    >>> from pharmpy.tools import load_example_modelfit_results
+    >>> model = load_example_model("pheno")
+    >>> results = load_example_modelfit_results("pheno")
+    >>> pe = results.parameter_estimates
+    >>> evaluator = create_expression_evaluator(model, "TVCL*1000")
+    >>> evaluator(pe).iloc[0]
+    6.57377
+    >>> round(evaluator({'PTVCL': 0.005}).iloc[0], 6)
+    7.0
+
+    See also
+    --------
+    evaluate_expression : Evaluate an expression once
     """
     expression = Expr(expression)
     full_expr = model.statements.before_odes.full_expression(expression)
+    fn = compile_expr(full_expr)
     inits = model.parameters.inits
-    mapping = inits if parameter_estimates is None else {**inits, **parameter_estimates}
-    expr = full_expr.subs(mapping)
+    model_dataset = model.dataset
 
-    df = model.dataset
+    def evaluate(
+        parameter_estimates: Optional[ParameterMap] = None,
+        dataset: Optional[pd.DataFrame] = None,
+    ) -> pd.Series:
+        mapping = inits if parameter_estimates is None else {**inits, **parameter_estimates}
+        df = model_dataset if dataset is None else dataset
+        array = fn(len(df), ParameterDataFrameMapping(df, mapping))
+        return pd.Series(array)
 
-    array = eval_expr(expr, len(df), DataFrameMapping(df))
-    return pd.Series(array)
+    return evaluate
 
 
 def evaluate_population_prediction(
@@ -112,7 +190,8 @@ def evaluate_population_prediction(
     The evaluation is done for each data record in the model dataset
     or optionally using the dataset argument.
 
-    This function currently only support models without ODE systems
+    For models with an ODE system the system is solved numerically, see
+    create_amounts_evaluator.
 
     Parameters
     ----------
@@ -153,14 +232,70 @@ def evaluate_population_prediction(
     --------
     evaluate_individual_prediction : Evaluate the individual prediction
     """
-    y = get_population_prediction_expression(model)
-    mapping = model.parameters.inits if parameters is None else parameters
-    expr = y.subs(mapping)
+    evaluator = create_population_prediction_evaluator(model)
+    return evaluator(parameters, dataset)
 
-    df = model.dataset if dataset is None else dataset
 
-    pred = eval_expr(expr, len(df), DataFrameMapping(df))
-    return pd.Series(pred, name='PRED')
+def create_population_prediction_evaluator(model: Model) -> Callable[..., pd.Series]:
+    """Create a function that evaluates the numeric population prediction
+
+    The prediction expression is created and compiled once with the population
+    parameters as arguments. Calling the returned function for new parameter values
+    only costs numerical computation, which is useful in for example optimization loops.
+
+    For models with an ODE system the system is solved numerically, see
+    create_amounts_evaluator.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    Callable
+        A function taking an optional dictionary of parameters and values and an optional
+        dataset and returning the population predictions
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model
+    >>> from pharmpy.modeling import create_population_prediction_evaluator
+    >>> from pharmpy.tools import load_example_modelfit_results
+    >>> model = load_example_model("pheno_linear")
+    >>> results = load_example_modelfit_results("pheno_linear")
+    >>> pe = results.parameter_estimates
+    >>> evaluator = create_population_prediction_evaluator(model)
+    >>> round(evaluator(dict(pe)).iloc[0], 6)
+    17.529739
+
+    See also
+    --------
+    evaluate_population_prediction : Evaluate the population prediction once
+    """
+    if model.statements.ode_system is not None:
+        individual_evaluator = _create_ode_prediction_evaluator(model, 'PRED')
+
+        def evaluate_odes(
+            parameters: Optional[ParameterMap] = None, dataset: Optional[pd.DataFrame] = None
+        ) -> pd.Series:
+            return individual_evaluator(None, parameters, dataset)
+
+        return evaluate_odes
+
+    fn = compile_expr(get_population_prediction_expression(model))
+    inits = model.parameters.inits
+    model_dataset = model.dataset
+
+    def evaluate(
+        parameters: Optional[ParameterMap] = None, dataset: Optional[pd.DataFrame] = None
+    ) -> pd.Series:
+        mapping = inits if parameters is None else parameters
+        df = model_dataset if dataset is None else dataset
+        pred = fn(len(df), ParameterDataFrameMapping(df, mapping))
+        return pd.Series(pred, name='PRED')
+
+    return evaluate
 
 
 def evaluate_individual_prediction(
@@ -178,7 +313,8 @@ def evaluate_individual_prediction(
     The evaluation is done at the current eta values
     or optionally at the given eta values.
 
-    This function currently only support models without ODE systems
+    For models with an ODE system the system is solved numerically, see
+    create_amounts_evaluator.
 
     Parameters
     ----------
@@ -222,33 +358,358 @@ def evaluate_individual_prediction(
     evaluate_population_prediction : Evaluate the population prediction
     """
 
-    y = get_individual_prediction_expression(model)
-    mapping = model.parameters.inits if parameters is None else parameters
-    y = y.subs(mapping)
+    evaluator = create_individual_prediction_evaluator(model)
+    return evaluator(etas, parameters, dataset)
 
-    df = model.dataset if dataset is None else dataset
 
+def create_individual_prediction_evaluator(model: Model) -> Callable[..., pd.Series]:
+    """Create a function that evaluates the numeric individual prediction
+
+    The prediction expression is created and compiled once with the population
+    parameters and the etas as arguments. Calling the returned function for new parameter
+    or eta values only costs numerical computation.
+
+    For models with an ODE system the system is solved numerically, see
+    create_amounts_evaluator.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    Callable
+        A function taking optional eta values, an optional dictionary of parameters and
+        values and an optional dataset and returning the individual predictions
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model
+    >>> from pharmpy.modeling import create_individual_prediction_evaluator
+    >>> from pharmpy.tools import load_example_modelfit_results
+    >>> model = load_example_model("pheno_linear")
+    >>> results = load_example_modelfit_results("pheno_linear")
+    >>> etas = results.individual_estimates
+    >>> evaluator = create_individual_prediction_evaluator(model)
+    >>> round(evaluator(etas).iloc[0], 6)
+    17.771084
+
+    See also
+    --------
+    evaluate_individual_prediction : Evaluate the individual prediction once
+    """
+    if model.statements.ode_system is not None:
+        return _create_ode_prediction_evaluator(model, 'IPRED')
+
+    fn = compile_expr(get_individual_prediction_expression(model))
+    inits = model.parameters.inits
+    model_dataset = model.dataset
     idcol = model.datainfo.id_column.name
 
-    _etas = (
-        pd.DataFrame(
-            0,
-            index=df[idcol].unique(),
-            columns=model.random_variables.etas.names,
-        )
-        if etas is None
-        else etas
-    )
+    def evaluate(
+        etas: Optional[pd.DataFrame] = None,
+        parameters: Optional[ParameterMap] = None,
+        dataset: Optional[pd.DataFrame] = None,
+    ) -> pd.Series:
+        mapping = inits if parameters is None else parameters
+        df = model_dataset if dataset is None else dataset
+        _etas = _zero_etas(model, df) if etas is None else etas
+        _df = df.join(_etas, on=idcol)
+        ipred = fn(len(_df), ParameterDataFrameMapping(_df, mapping))
+        return pd.Series(ipred, name='IPRED')
+
+    return evaluate
 
-    _df = df.join(_etas, on=idcol)
 
-    ipred = eval_expr(y, len(_df), DataFrameMapping(_df))
-    return pd.Series(ipred, name='IPRED')
+def evaluate_amounts(
+    model: Model,
+    etas: Optional[pd.DataFrame] = None,
+    parameters: Optional[ParameterMap] = None,
+    dataset: Optional[pd.DataFrame] = None,
+):
+    """Evaluate the numeric amounts of all compartments of the ODE system
 
+    The ODE system is solved numerically with the doses of the dataset. The
+    evaluation is done at the current model parameter values and with all etas 0
+    or optionally at the given parameter and eta values. The amounts are given
+    for each data record in the model dataset or optionally using the dataset
+    argument.
 
-def _replace_parameters(model: Model, y: List[sympy.Expr], parameters: Optional[ParameterMap]):
-    mapping = model.parameters.inits if parameters is None else parameters
-    return [x.subs(mapping) for x in y]
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    etas : pd.DataFrame
+        Optional dataframe of eta values
+    parameters : dict
+        Optional dictionary of parameters and values
+    dataset : pd.DataFrame
+        Optional dataset
+
+    Returns
+    -------
+    pd.DataFrame
+        Amounts with one column per compartment
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model, evaluate_amounts
+    >>> from pharmpy.tools import load_example_modelfit_results
+    >>> model = load_example_model("pheno")
+    >>> results = load_example_modelfit_results("pheno")
+    >>> pe = results.parameter_estimates
+    >>> evaluate_amounts(model, parameters=dict(pe)).head()
+       A_CENTRAL
+    0  25.000000
+    1  24.762602
+    2  27.052753
+    3  29.047539
+    4  30.865980
+
+    See also
+    --------
+    create_amounts_evaluator : Create a function that evaluates the amounts
+    """
+    evaluator = create_amounts_evaluator(model)
+    return evaluator(etas, parameters, dataset)
+
+
+def create_amounts_evaluator(model: Model) -> Callable[..., pd.DataFrame]:
+    """Create a function that evaluates the numeric amounts of the ODE system
+
+    All expressions needed to solve the ODE system are compiled once. Linear
+    systems are solved exactly using matrix exponentials and other systems using
+    an ODE solver. In both cases all individuals are solved together. Bolus doses,
+    infusions, lag times, bioavailability, resets (EVID 3 and 4) and steady state bolus
+    doses for linear systems are supported.
+    Doses are given to the compartment of their administration id if the dataset
+    has an admid column, else to the compartment in the compartment column if
+    available and else to the first dosing compartment.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    Callable
+        A function taking optional eta values, an optional dictionary of parameters and
+        values and an optional dataset and returning the amounts
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model, create_amounts_evaluator
+    >>> model = load_example_model("pheno")
+    >>> evaluator = create_amounts_evaluator(model)
+    >>> round(evaluator().iloc[1, 0], 6)
+    24.768554
+
+    See also
+    --------
+    evaluate_amounts : Evaluate the amounts once
+    """
+    odes = model.statements.ode_system
+    if not isinstance(odes, CompartmentalSystem):
+        raise ValueError('Model has no ODE system')
+    before_odes = model.statements.before_odes
+    amounts = list(odes.amounts)
+    names = [amount.name for amount in amounts]
+    amount_symbols = {amount: Expr.symbol(name) for amount, name in zip(amounts, names)}
+
+    def _compile(expr):
+        return compile_expr(before_odes.full_expression(Expr(expr).subs(amount_symbols)))
+
+    if has_linear_odes(model):
+        matrix = [_compile(expr) for expr in odes.compartmental_matrix]
+        inputs = [_compile(expr) for expr in odes.zero_order_inputs]
+        rhs_symbols, rhs_symbol_values, rhs = [], [], []
+    else:
+        matrix, inputs = [], []
+        rhs_exprs = [
+            Expr(expr).subs(amount_symbols)
+            for expr in odes.compartmental_matrix @ odes.amounts + odes.zero_order_inputs
+        ]
+        rhs_symbols = sorted(
+            set().union(*(expr.free_symbols for expr in rhs_exprs))
+            - set(amount_symbols.values())
+            - {odes.t},
+            key=str,
+        )
+        rhs_symbol_values = [_compile(symbol) for symbol in rhs_symbols]
+        rhs = [compile_expr(expr) for expr in rhs_exprs]
+
+    doses = {}
+    first_dose = {}
+    for comp in odes.dosing_compartments:
+        index = names.index(comp.amount.name)
+        first_dose.setdefault(index, comp.doses[0].admid)
+        for dose in comp.doses:
+            amount = dose.amount * comp.bioavailability
+            if isinstance(dose, Infusion):
+                duration = dose.duration if dose.duration is not None else amount / dose.rate
+            else:
+                duration = 0
+            doses[dose.admid] = (
+                index,
+                _compile(amount),
+                _compile(duration),
+                _compile(comp.lag_time),
+            )
+    default_admid = odes.dosing_compartments[0].doses[0].admid
+
+    initial_conditions = get_initial_conditions(model)
+    initial = [_compile(initial_conditions[amount.subs({odes.t: 0})]) for amount in amounts]
+
+    inits = model.parameters.inits
+    model_dataset = model.dataset
+    di = model.datainfo
+    idcol = di.id_column.name
+    idvcol = di.idv_column.name
+
+    def evaluate(
+        etas: Optional[pd.DataFrame] = None,
+        parameters: Optional[ParameterMap] = None,
+        dataset: Optional[pd.DataFrame] = None,
+    ) -> pd.DataFrame:
+        mapping = inits if parameters is None else {**inits, **parameters}
+        df = model_dataset if dataset is None else dataset
+        _etas = _zero_etas(model, df) if etas is None else etas
+        _df = df.join(_etas, on=idcol)
+        datamap = ParameterDataFrameMapping(_df, mapping)
+        size = len(_df)
+
+        ids = df[idcol].to_numpy()
+        time = df[idvcol].to_numpy(dtype=np.float64)
+        new_individual = np.ones(size, dtype=bool)
+        new_individual[1:] = ids[1:] != ids[:-1]
+        individual = np.cumsum(new_individual) - 1
+        if np.any(np.diff(time)[~new_individual[1:]] < 0):
+            raise DatasetError('Time is decreasing within an individual')
+
+        evid = _get_evid(di, df)
+        additional = _get_column(di, df, 'additional')
+        if additional is not None and np.any(additional != 0):
+            raise ValueError('Additional doses are not supported')
+        ss = _get_column(di, df, 'ss')
+        ii = _get_column(di, df, 'ii')
+        admid = _get_column(di, df, 'admid')
+        if admid is None:
+            cmt = _get_column(di, df, 'compartment')
+            if cmt is None:
+                admid = np.full(size, default_admid)
+            else:
+                admid = np.array([first_dose.get(int(c) - 1, -1) for c in cmt])
+
+        compartment = np.full(size, -1)
+        amount = np.zeros(size)
+        duration = np.zeros(size)
+        lag = np.zeros(size)
+        is_dose = (evid == 1) | (evid == 4)
+        for key, (index, amount_fn, duration_fn, lag_fn) in doses.items():
+            dosed = is_dose & (admid == key)
+            if np.any(dosed):
+                compartment[dosed] = index
+                amount[dosed] = amount_fn(size, datamap)[dosed]
+                dose_duration = duration_fn(size, datamap)[dosed]
+                duration[dosed] = np.where(np.isfinite(dose_duration), dose_duration, 0.0)
+                lag[dosed] = lag_fn(size, datamap)[dosed]
+        if np.any(is_dose & (compartment == -1)):
+            raise ValueError('Could not find the dosing compartment of all doses')
+        interval = np.zeros(size)
+        if ss is not None:
+            steady = is_dose & (ss != 0)
+            if np.any(steady & ((ss != 1) | (duration > 0) | (lag != 0))):
+                raise ValueError(
+                    'Only steady state bolus doses without lag time and with SS=1 are supported'
+                )
+            if np.any(steady):
+                interval[steady] = ii[steady]
+
+        breakpoints = create_breakpoints(
+            individual,
+            time,
+            (evid == 3) | (evid == 4),
+            compartment,
+            amount,
+            duration,
+            lag,
+            interval,
+            len(amounts),
+        )
+        first = np.flatnonzero(new_individual)
+        initial_values = np.column_stack([fn(size, datamap)[first] for fn in initial])
+        if matrix:
+            matrix_values = np.column_stack([fn(size, datamap) for fn in matrix])
+            input_values = np.column_stack([fn(size, datamap) for fn in inputs])
+            values = solve_linear(
+                breakpoints,
+                matrix_values.reshape(size, len(amounts), len(amounts)),
+                input_values,
+                initial_values,
+            )
+        else:
+            symbol_values = [fn(size, datamap) for fn in rhs_symbol_values]
+
+            def _rhs(state, t, record):
+                rhs_map = {symbol: state[:, i] for i, symbol in enumerate(amount_symbols.values())}
+                rhs_map[odes.t] = t
+                for symbol, value in zip(rhs_symbols, symbol_values):
+                    rhs_map[symbol] = value[record]
+                return np.column_stack([fn(len(t), rhs_map) for fn in rhs])
+
+            values = solve_nonlinear(breakpoints, _rhs, initial_values)
+        return pd.DataFrame(values, columns=names, index=df.index)
+
+    return evaluate
+
+
+def _get_column(di: DataInfo, df: pd.DataFrame, coltype: str) -> Optional[np.ndarray]:
+    try:
+        return df[di.typeix[coltype][0].name].to_numpy()
+    except IndexError:
+        return None
+
+
+def _get_evid(di: DataInfo, df: pd.DataFrame) -> np.ndarray:
+    evid = _get_column(di, df, 'event')
+    if evid is not None:
+        return evid
+    dose = _get_column(di, df, 'dose')
+    if dose is not None:
+        return (dose != 0).astype(int)
+    return np.zeros(len(df), dtype=int)
+
+
+def _create_ode_prediction_evaluator(model: Model, name: str) -> Callable[..., pd.Series]:
+    odes = model.statements.ode_system
+    assert isinstance(odes, CompartmentalSystem)
+    dv = list(model.dependent_variables.keys())[0]
+    y = model.statements.after_odes.full_expression(dv)
+    y = y.subs({Expr.symbol(eps): 0 for eps in model.random_variables.epsilons.names})
+    y = y.subs({amount: Expr.symbol(amount.name) for amount in odes.amounts})
+    y = y.subs({odes.t: Expr.symbol(model.datainfo.idv_column.name)})
+    fn = compile_expr(model.statements.before_odes.full_expression(y))
+    amounts_evaluator = create_amounts_evaluator(model)
+    inits = model.parameters.inits
+    model_dataset = model.dataset
+    idcol = model.datainfo.id_column.name
+
+    def evaluate(
+        etas: Optional[pd.DataFrame] = None,
+        parameters: Optional[ParameterMap] = None,
+        dataset: Optional[pd.DataFrame] = None,
+    ) -> pd.Series:
+        mapping = inits if parameters is None else {**inits, **parameters}
+        df = model_dataset if dataset is None else dataset
+        _etas = _zero_etas(model, df) if etas is None else etas
+        amounts = amounts_evaluator(_etas, mapping, df)
+        _df = pd.concat((df, amounts), axis=1).join(_etas, on=idcol)
+        pred = fn(len(_df), ParameterDataFrameMapping(_df, mapping))
+        return pd.Series(pred, name=name)
+
+    return evaluate
 
 
 def evaluate_eta_gradient(
@@ -313,7 +774,7 @@ def evaluate_eta_gradient(
     """
 
     y = calculate_eta_gradient_expression(model)
-    y = _replace_parameters(model, y, parameters)
+    mapping = model.parameters.inits if parameters is None else parameters
 
     df = model.dataset if dataset is None else dataset
     idcol = model.datainfo.id_column.name
@@ -323,11 +784,7 @@ def evaluate_eta_gradient(
     elif model.initial_individual_estimates is not None:
         _etas = model.initial_individual_estimates
     else:
-        _etas = pd.DataFrame(
-            0,
-            index=df[idcol].unique(),
-            columns=model.random_variables.etas.names,
-        )
+        _etas = _zero_etas(model, df)
 
     derivative_names = [f'dF/d{eta}' for eta in model.random_variables.etas.names]
 
@@ -335,7 +792,7 @@ def evaluate_eta_gradient(
 
     return pd.DataFrame(
         {
-            name: eval_expr(expr, len(_df), DataFrameMapping(_df))
+            name: eval_expr(expr, len(_df), ParameterDataFrameMapping(_df, mapping))
             for expr, name in zip(y, derivative_names)
         }
     )
@@ -403,7 +860,7 @@ def evaluate_epsilon_gradient(
     """
 
     y = calculate_epsilon_gradient_expression(model)
-    y = _replace_parameters(model, y, parameters)
+    mapping = model.parameters.inits if parameters is None else parameters
     eps_names = model.random_variables.epsilons.names
     repl = {Expr.symbol(eps): 0 for eps in eps_names}
     y = [x.subs(repl) for x in y]
@@ -417,18 +874,14 @@ def evaluate_epsilon_gradient(
     elif model.initial_individual_estimates is not None:
         _etas = model.initial_individual_estimates
     else:
-        _etas = pd.DataFrame(
-            0,
-            index=df[idcol].unique(),
-            columns=model.random_variables.etas.names,
-        )
+        _etas = _zero_etas(model, df)
 
     _df = df.join(_etas, on=idcol)
     derivative_names = [f'dY/d{eps}' for eps in eps_names]
 
     return pd.DataFrame(
         {
-            name: eval_expr(expr, len(_df), DataFrameMapping(_df))
+            name: eval_expr(expr, len(_df), ParameterDataFrameMapping(_df, mapping))
             for expr, name in zip(y, derivative_names)
         }
     )
@@ -18,6 +18,8 @@ from pharmpy.deps import pandas as pd
 from pharmpy.internals.math import round_and_keep_sum
 from pharmpy.model import Model
 
+from .parameter_sampling import create_rng
+
 
 class DatasetIterator:
     """Base class for iterator classes that generate new datasets from an input dataset
@@ -144,6 +146,9 @@ class Resample(DatasetIterator):
         without replacement
     :param name_pattern: Name to use for generated datasets. A number starting from 1 will
         be put in the placeholder.
+    :param seed: Random number generator or seed. If given, the groups of all resamples are
+        drawn in one batch using the generator. The default is to use the global numpy random
+        state for one resample at a time.
 
     :returns: A tuple of a resampled DataFrame and a list of resampled groups in order
     """
@@ -158,6 +163,7 @@ class Resample(DatasetIterator):
         replace=False,
         name_pattern='resample_{}',
         name=None,
+        seed=None,
     ):
         df = self._retrieve_dataset(dataset_or_model)
         unique_groups = df[group].unique()
@@ -201,11 +207,20 @@ class Resample(DatasetIterator):
                             f'replacement.'
                         )
 
+        # Rows of the dataset ordered by group so that the rows of group i are
+        # self._rows[self._starts[i]:self._starts[i] + self._counts[i]]
+        codes, uniques = pd.factorize(df[group])
+        self._groups = pd.Index(uniques)
+        self._rows = np.argsort(codes, kind='stable')
+        self._counts = np.bincount(codes, minlength=len(uniques))
+        self._starts = np.cumsum(self._counts) - self._counts
+
         self._df = df
         self._group = group
         self._replace = replace
-        self._stratas = stratas
+        self._stratas = {strata: np.asarray(groups) for strata, groups in stratas.items()}
         self._sample_size_dict = sample_size_dict
+        self._batch = None if seed is None else self._draw_batch(create_rng(seed), resamples)
         if resamples > 1 and name:
             warnings.warn(
                 f'One name was provided despite having multiple resamples, falling back to '
@@ -216,28 +231,49 @@ class Resample(DatasetIterator):
             self._name = name
         super().__init__(resamples, name_pattern=name_pattern)
 
+    def _draw_batch(self, rng, n):
+        # One call to the generator per stratum for all n resamples
+        batch = []
+        for strata, size in self._sample_size_dict.items():
+            groups = self._stratas[strata]
+            if self._replace:
+                positions = rng.integers(len(groups), size=(n, size))
+            else:
+                positions = rng.permuted(np.tile(np.arange(len(groups)), (n, 1)), axis=1)
+                positions = positions[:, :size]
+            batch.append(groups[positions])
+        return np.concatenate(batch, axis=1)
+
+    def _draw(self):
+        if self._batch is not None:
+            return self._batch[self._next - 1]
+        random_groups = [
+            np.random.choice(self._stratas[strata], size=size, replace=self._replace)
+            for strata, size in self._sample_size_dict.items()
+        ]
+        return np.concatenate(random_groups)
+
+    def _take(self, random_groups):
+        codes = self._groups.get_indexer(random_groups)
+        counts = self._counts[codes]
+        # Positions of the rows of all sampled groups in self._rows
+        offsets = np.repeat(self._starts[codes] - (np.cumsum(counts) - counts), counts)
+        rows = self._rows[offsets + np.arange(len(offsets))]
+        new_df = self._df.take(rows).reset_index(drop=True)
+        new_df[self._group] = np.repeat(np.arange(1, len(codes) + 1), counts)
+        return new_df
+
     def __next__(self):
         self._check_exhausted()
 
-        random_groups = []
-        for strata in self._sample_size_dict:
-            random_groups += np.random.choice(
-                self._stratas[strata], size=self._sample_size_dict[strata], replace=self._replace
-            ).tolist()
-
-        new_df = pd.DataFrame()
-        # Build the dataset given the random_groups list
-        for grp_id, new_grp in zip(random_groups, range(1, len(random_groups) + 1)):
-            sub = self._df.loc[self._df[self._group] == grp_id].copy()
-            sub[self._group] = new_grp
-            new_df = pd.concat([new_df, sub])
-        new_df.reset_index(inplace=True, drop=True)
+        random_groups = self._draw()
+        new_df = self._take(random_groups)
         if self._name:
             new_df.name = self._name
         else:
             self._prepare_next(new_df)
 
-        return self._combine_dataset(new_df), random_groups
+        return self._combine_dataset(new_df), random_groups.tolist()
 
 
 def resample_data(
@@ -249,6 +285,7 @@ def resample_data(
     replace: bool = False,
     name_pattern: str = 'resample_{}',
     name: Optional[str] = None,
+    seed: Optional[Union[np.random.Generator, int]] = None,
 ):
     """Iterate over resamples of a dataset.
 
@@ -282,6 +319,10 @@ def resample_data(
         be put in the placeholder.
     name : str
         Option to name pattern in case of only one resample
+    seed : int or rng
+        Random number generator or seed. If given, the groups of all resamples are drawn
+        in one batch using the generator. The default is to use the global numpy random
+        state for one resample at a time.
 
     Returns
     -------
@@ -297,4 +338,5 @@ def resample_data(
         replace=replace,
         name_pattern=name_pattern,
         name=name,
+        seed=seed,
     )
@@ -8,9 +8,11 @@ from pharmpy.model import Model
 if TYPE_CHECKING:
     import numpy as np
     import pandas as pd
+    from scipy import stats
 else:
     from pharmpy.deps import numpy as np
     from pharmpy.deps import pandas as pd
+    from pharmpy.deps.scipy import stats
 
 
 def create_rng(seed: Optional[Union[np.random.Generator, int]] = None):
@@ -48,24 +50,107 @@ def create_rng(seed: Optional[Union[np.random.Generator, int]] = None):
     return rng
 
 
-def _sample_truncated_joint_normal(sigma, mu, a, b, n, rng):
-    """Give an array of samples from the truncated joint normal distribution using sample rejection
+# NOTE: Below this acceptance rate the remaining samples are drawn with a Gibbs sampler.
+# The rate is not trusted until enough samples have been drawn.
+_MIN_ACCEPTANCE_RATE = 0.1
+_MIN_DRAWN_SAMPLES = 1000
+# NOTE: Below this acceptance rate batches are sized to give all remaining samples
+_OVERSAMPLING_ACCEPTANCE_RATE = 0.5
+_MAX_BATCH_SIZE = 100000
+_GIBBS_BURNIN = 50
+
+
+def _sample_truncated_joint_normal(sigma, mu, a, b, n, rng, statistics=None):
+    """Give an array of samples from the truncated joint normal distribution
     - mu, sigma - parameters for the normal distribution
     - a, b - vectors of lower and upper limits for each random variable
     - n - number of samples
+    - statistics - optional dict in which the counts of accepted and drawn samples
+      and of samples from the Gibbs sampler are added to 'accepted', 'drawn' and 'gibbs'
+
+    Samples are drawn with rejection sampling in batches that are sized from the
+    acceptance rate observed so far. If the acceptance rate is too low the
+    remaining samples are drawn with a Gibbs sampler and a warning with the
+    acceptance statistics is given.
     """
     if not is_posdef(sigma):
         raise ValueError("Covariance matrix not positive definite")
-    kept_samples = np.empty((0, len(mu)))
-    remaining = n
-    while remaining > 0:
-        samples = rng.multivariate_normal(mu, sigma, size=remaining, check_valid='ignore')
-        in_range = np.logical_and(samples > a, samples < b).all(axis=1)
-        kept_samples = np.concatenate((kept_samples, samples[in_range]))
-        remaining = n - len(kept_samples)
+    # NOTE: This is the factorization used by Generator.multivariate_normal
+    _, s, vh = np.linalg.svd(sigma)
+    factor = np.sqrt(s)[:, None] * vh
+
+    kept_samples = np.empty((n, len(mu)))
+    accepted = 0
+    drawn = 0
+    gibbs = 0
+    while accepted < n:
+        remaining = n - accepted
+        if drawn == 0:
+            size = remaining
+        else:
+            acceptance_rate = accepted / drawn
+            if drawn >= _MIN_DRAWN_SAMPLES and acceptance_rate < _MIN_ACCEPTANCE_RATE:
+                warnings.warn(
+                    f'Acceptance rate of truncated normal sampling was {acceptance_rate:.2%} '
+                    f'({accepted} of {drawn} samples). Using Gibbs sampling for the remaining '
+                    f'{remaining} samples.'
+                )
+                kept_samples[accepted:] = _sample_truncated_joint_normal_gibbs(
+                    sigma, mu, a, b, kept_samples[:accepted], remaining, rng
+                )
+                gibbs = remaining
+                break
+            elif acceptance_rate < _OVERSAMPLING_ACCEPTANCE_RATE:
+                expected_draws = remaining * (drawn + 1) / (accepted + 1)
+                size = min(int(np.ceil(1.2 * expected_draws)), _MAX_BATCH_SIZE)
+                size = max(size, remaining)
+            else:
+                # NOTE: Drawing exactly the remaining number of samples when few are
+                # rejected keeps the random number stream of earlier versions
+                size = remaining
+        samples = rng.standard_normal((size, len(mu))) @ factor + mu
+        samples = samples[np.logical_and(samples > a, samples < b).all(axis=1)][:remaining]
+        kept_samples[accepted : accepted + len(samples)] = samples
+        accepted += len(samples)
+        drawn += size
+    if statistics is not None:
+        statistics['accepted'] += accepted
+        statistics['drawn'] += drawn
+        statistics['gibbs'] += gibbs
     return kept_samples
 
 
+def _sample_truncated_joint_normal_gibbs(sigma, mu, a, b, start, n, rng):
+    """Give an array of samples from the truncated joint normal distribution using Gibbs sampling
+
+    Runs n independent chains in parallel and keeps the last state of each. The
+    chains start from the rows of start if there are any, otherwise from mu moved
+    inside of the limits.
+    """
+    if len(start) == 0:
+        start = np.clip(mu, a, b)[np.newaxis, :]
+    x = start[np.arange(n) % len(start)].copy()
+    # NOTE: Keeps samples strictly inside of the limits
+    lower = np.nextafter(a, np.inf)
+    upper = np.nextafter(b, -np.inf)
+    precision = np.linalg.inv(sigma)
+    sd = 1 / np.sqrt(np.diag(precision))
+    for _ in range(_GIBBS_BURNIN):
+        for i in range(len(mu)):
+            deviation = (x - mu) @ precision[i] - precision[i, i] * (x[:, i] - mu[i])
+            mean = mu[i] - deviation / precision[i, i]
+            x[:, i] = stats.truncnorm.rvs(
+                (a[i] - mean) / sd[i],
+                (b[i] - mean) / sd[i],
+                loc=mean,
+                scale=sd[i],
+                size=n,
+                random_state=rng,
+            )
+            x[:, i] = np.clip(x[:, i], lower[i], upper[i])
+    return x
+
+
 def _sample_from_function(
     model,
     parameter_estimates,
@@ -212,7 +297,12 @@ def sample_parameters_from_covariance_matrix(
 ):
     """Sample parameter vectors using the covariance matrix
 
-    If parameters is not provided all estimated parameters will be used
+    If parameters is not provided all estimated parameters will be used. Samples outside
+    of the parameter bounds are rejected. If too few samples are within the bounds the
+    remaining samples will be drawn using Gibbs sampling and a warning with the acceptance
+    rate will be given. The number of accepted and drawn samples and the number of samples
+    from the Gibbs sampler are available as a dict in ``samples.attrs['acceptance']`` with
+    the keys 'accepted', 'drawn' and 'gibbs'.
 
     Parameters
     ----------
@@ -273,10 +363,12 @@ def sample_parameters_from_covariance_matrix(
         else:
             raise ValueError("Uncertainty covariance matrix not positive-definite")
 
-    fn = partial(_sample_truncated_joint_normal, sigma)
+    acceptance = {'accepted': 0, 'drawn': 0, 'gibbs': 0}
+    fn = partial(_sample_truncated_joint_normal, sigma, statistics=acceptance)
     samples = _sample_from_function(
         model, parameter_estimates, fn, force_posdef_samples=force_posdef_samples, n=n, seed=seed
     )
+    samples.attrs['acceptance'] = acceptance
     return samples
 
 
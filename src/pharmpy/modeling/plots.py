@@ -1,15 +1,14 @@
 import re
 import warnings
-from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Literal, Optional, Union
 
 import pharmpy.visualization
 from pharmpy.basic import Expr
 from pharmpy.model import Assignment, Model
-from pharmpy.modeling import bin_observations
 
 from .data import get_observations
+from .results import calculate_vpc
 
 if TYPE_CHECKING:
     import altair as alt
@@ -751,122 +750,7 @@ def _validate_strat(model, stratify_on):
         raise ValueError(f'{stratify_on} column does not exist in dataset.')
 
 
-def _calculate_vpc(
-    model, simulations, binning: str, nbins: int, qi: float, ci: float, query=None, stratify_on=None
-):
-    dv = model.datainfo.dv_column.name
-    nrows = len(model.dataset)
-    nsim = int(len(simulations) / nrows)
-    observations = get_observations(model, keep_index=True)
-    obstab = model.dataset.loc[observations.index]
-    if query is not None:
-        obstab = obstab.query(query)
-    obstab = obstab[dv]
-
-    bincol, boundaries = bin_observations(model, binning, nbins)
-
-    if len(bincol.unique()) != bincol.unique().max() + 1:
-        raise ValueError("Some bins are empty, please choose a different number of bins.")
-
-    obsgroup = obstab.groupby(bincol)
-
-    simtab = simulations
-    if stratify_on is not None:
-        simtab[stratify_on] = np.tile(model.dataset[stratify_on], nsim)
-    simtab = simtab.reset_index(['SIM'])
-    simtab = simtab.loc[observations.index]
-    simtab["__BIN__"] = bincol
-    if query is not None:
-        simtab = simtab.query(query)
-    simser = simtab[[dv, "SIM"]]
-    simser.index = simtab["__BIN__"]
-    simgroup = simser.groupby("__BIN__")
-
-    lower_quantile = (1 - qi) / 2
-    upper_quantile = 1 - lower_quantile
-
-    median_cis = simgroup.apply(
-        partial(_calculate_confidence_interval_of_quantile, quantile=0.5, ci=ci, dv=dv),
-        include_groups=False,
-    )
-    sim_central_lower = [lower for lower, _ in median_cis]
-    sim_central_upper = [upper for _, upper in median_cis]
-
-    lowerpi_cis = simgroup.apply(
-        partial(_calculate_confidence_interval_of_quantile, quantile=lower_quantile, ci=ci, dv=dv),
-        include_groups=False,
-    )
-    sim_lower_lower = [lower for lower, _ in lowerpi_cis]
-    sim_lower_upper = [upper for _, upper in lowerpi_cis]
-
-    upperpi_cis = simgroup.apply(
-        partial(_calculate_confidence_interval_of_quantile, quantile=upper_quantile, ci=ci, dv=dv),
-        include_groups=False,
-    )
-    sim_upper_lower = [lower for lower, _ in upperpi_cis]
-    sim_upper_upper = [upper for _, upper in upperpi_cis]
-
-    midpoints = (boundaries[1::] + boundaries[0:-1]) / 2
-
-    simgroup = simser.drop(columns=["SIM"]).squeeze().groupby("__BIN__")
-
-    df = pd.DataFrame(
-        {
-            'obs_central': obsgroup.apply(
-                partial(_get_quantile, quantile=0.5), include_groups=False
-            ),
-            'obs_lower': obsgroup.apply(
-                partial(_get_quantile, quantile=lower_quantile), include_groups=False
-            ),
-            'obs_upper': obsgroup.apply(
-                partial(_get_quantile, quantile=upper_quantile), include_groups=False
-            ),
-            'sim_central': simgroup.median(),
-            'sim_central_lower': sim_central_lower,
-            'sim_central_upper': sim_central_upper,
-            'sim_lower': simgroup.apply(
-                partial(_get_quantile, quantile=lower_quantile), include_groups=False
-            ),
-            'sim_lower_lower': sim_lower_lower,
-            'sim_lower_upper': sim_lower_upper,
-            'sim_upper': simgroup.apply(
-                partial(_get_quantile, quantile=upper_quantile), include_groups=False
-            ),
-            'sim_upper_lower': sim_upper_lower,
-            'sim_upper_upper': sim_upper_upper,
-            'bin_midpoint': midpoints,
-            'bin_edges_right': boundaries[1::],
-            'bin_edges_left': boundaries[0:-1],
-            'n_data_points': obsgroup.count(),
-        }
-    )
-    return df
-
-
-def _calculate_confidence_interval_of_quantile(data, quantile, ci, dv):
-    data_sim = data.groupby("SIM")
-    quantiles = data_sim.apply(
-        partial(_get_quantile, quantile=quantile, sort_by=dv), include_groups=False
-    )
-    sorted_quantiles = quantiles.sort_values().to_list()
-    n = len(sorted_quantiles)
-    alpha = (1 - ci) / 2
-    i = int(np.floor(alpha * (n - 1) + 0.5))
-    lower = sorted_quantiles[i]
-    upper = sorted_quantiles[n - i - 1]
-    return lower, upper
-
-
-def _get_quantile(data, quantile, sort_by=None):
-    n = len(data)
-    if sort_by is None:
-        sorted_data = data.sort_values().to_list()
-    else:
-        sorted_data = data[sort_by].sort_values().to_list()
-    return sorted_data[int(np.floor(quantile * (n - 1) + 0.5))]
-
-
-def _vpc_plot(model, simulations, binning, nbins, qi, ci, query=None, title='', stratify_on=None):
+def _vpc_plot(model, simulations, binning, nbins, qi, ci, query=None, title=''):
     obs = get_observations(model, keep_index=True)
     idv = model.datainfo.idv_column.name
     idname = model.datainfo.id_column.name
@@ -874,16 +758,7 @@ def _vpc_plot(model, simulations, binning, nbins, qi, ci, query=None, title='',
     if query is not None:
         data = data.query(query)
 
-    df = _calculate_vpc(
-        model,
-        simulations,
-        binning=binning,
-        nbins=nbins,
-        qi=qi,
-        ci=ci,
-        query=query,
-        stratify_on=stratify_on,
-    )
+    df = calculate_vpc(model, simulations, binning=binning, nbins=nbins, qi=qi, ci=ci, query=query)
 
     scatter = (
         alt.Chart(data)
@@ -941,7 +816,7 @@ def _vpc_plot(model, simulations, binning, nbins, qi, ci, query=None, title='',
 
 def vpc_plot(
     model: Model,
-    simulations: Union[Path, pd.DataFrame, str],
+    simulations: Union[Path, pd.DataFrame, str, Iterable[pd.DataFrame]],
     binning: Literal["equal_width", "equal_number"] = "equal_number",
     nbins: int = 8,
     qi: float = 0.95,
@@ -954,11 +829,12 @@ def vpc_plot(
     ----------
     model : Model
         Pharmpy model
-    simulations : Path or pd.DataFrame
+    simulations : Path, pd.DataFrame or iterable of pd.DataFrame
         DataFrame containing the simulation data or path to dataset.
         The dataset has to have one (index) column named "SIM" containing
         the simulation number, one (index) column named "index" containing the data indices and one dv column.
-        See below for more information.
+        See below for more information. Can also be the replicates of simulation results,
+        which are then read from disk one at a time, see calculate_vpc.
     binning : ["equal_number", "equal_width"]
         Binning method. Can be "equal_number" or "equal_width". The default is "equal_number".
     nbins : int
@@ -1011,8 +887,12 @@ def vpc_plot(
     >>> from pharmpy.tools import run_simulation
     >>> model = load_example_model("pheno")
     >>> sim_model = set_simulation(model, n=100)
-    >>> sim_data = run_simulation(sim_model) # doctest: +SKIP
-    >>> vpc_plot(model, sim_data) # doctest: +SKIP
+    >>> sim_res = run_simulation(sim_model) # doctest: +SKIP
+    >>> vpc_plot(model, sim_res.replicates) # doctest: +SKIP
+
+    See also
+    --------
+    calculate_vpc : Calculate the statistics of a VPC
     """
     if isinstance(simulations, str) or isinstance(simulations, Path):
         simulations = pd.read_table(simulations, delimiter=r'\s+|,', engine='python')
@@ -1044,7 +924,6 @@ def vpc_plot(
                         ci=ci,
                         query=query,
                         title=f'{stratify_on} {bin_stratification[i]} - {bin_stratification[i+1]}',
-                        stratify_on=stratify_on,
                     )
                 )
         else:
@@ -1060,7 +939,6 @@ def vpc_plot(
                         ci=ci,
                         query=query,
                         title=f'{stratify_on} {value}',
-                        stratify_on=stratify_on,
                     )
                 )
         chart = _concat(charts)
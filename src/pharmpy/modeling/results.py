@@ -1,23 +1,17 @@
 from __future__ import annotations
 
 import math
-from itertools import chain
 from typing import TYPE_CHECKING, Iterable, Literal, Optional, Union
 
 from pharmpy.basic import BooleanExpr, Expr
+from pharmpy.internals.expr.eval import compile_expr
 from pharmpy.internals.expr.parse import parse as parse_expr
 from pharmpy.internals.expr.subs import subs, xreplace_dict
 from pharmpy.internals.math import round_to_n_sigdig
 from pharmpy.model import CompartmentalSystem, CompartmentalSystemBuilder, Model, output
-from pharmpy.model.distributions.numeric import ConstantDistribution
-from pharmpy.model.random_variables import (
-    eval_expr,
-    filter_distributions,
-    sample_rvs,
-    subs_distributions,
-)
-
-from .data import get_ids, get_observations
+from pharmpy.model.random_variables import filter_distributions, sample_rvs, subs_distributions
+
+from .data import bin_observations, get_ids, get_observations
 from .expressions import get_individual_parameters
 from .odes import get_initial_conditions
 from .parameter_sampling import create_rng, sample_parameters_from_covariance_matrix
@@ -33,6 +27,11 @@ else:
     from pharmpy.deps import pandas as pd
     from pharmpy.deps import sympy
 
+# NOTE: Sizes used for the VPC when the simulations are read one replicate at a time
+_VPC_CHUNK_SIZE = 2**22
+_VPC_HISTOGRAM_SIZE = 4096
+_VPC_SELECTION_SIZE = 2**16
+
 
 def calculate_eta_shrinkage(
     model: Model,
@@ -221,6 +220,10 @@ def calculate_individual_parameter_statistics(
     parameter_estimates: pd.Series,
     covariance_matrix: Optional[pd.DataFrame] = None,
     seed: Optional[Union[np.random.Generator, int]] = None,
+    nsamples: int = 1000000,
+    nparameter_samples: int = 100,
+    nsamples_per_parameter: int = 10,
+    memory_limit: int = 2**29,
 ):
     """Calculate statistics for individual parameters
 
@@ -248,6 +251,15 @@ def calculate_individual_parameter_statistics(
         the names of the left hand sides will be used as the names of the parameters.
     seed : Generator or int
         Random number generator or int seed
+    nsamples : int
+        Number of samples from the random variables used for the mean and the variance
+    nparameter_samples : int
+        Number of samples from the parameter uncertainty used for the standard error
+    nsamples_per_parameter : int
+        Number of samples from the random variables for each parameter sample
+    memory_limit : int
+        Approximate number of bytes to use for the samples used for the mean and the
+        variance. The samples are drawn in chunks if more memory would be needed.
 
     Returns
     -------
@@ -314,8 +326,6 @@ def calculate_individual_parameter_statistics(
         )
     )
 
-    batches = []
-
     if not all_covariate_free_symbols:
         cases = {'median': {}}
     else:
@@ -337,78 +347,177 @@ def calculate_individual_parameter_statistics(
         )
     )
 
-    nsamples = 1000000
-    nbatches = 100
-    batchsize = 10
-
-    samples = sample_rvs(filtered_sampling_rvs, nsamples, rng)
+    covariate_values = {
+        symbol: np.array([float(values[symbol]) for values in cases.values()])
+        for symbol in all_covariate_free_symbols
+    }
+    ncases = len(cases)
+
+    compiled_exprs = [(name, compile_expr(full_expr)) for name, full_expr in full_exprs]
+
+    means, variances = _sample_moments(
+        compiled_exprs,
+        filtered_sampling_rvs,
+        parameter_estimates,
+        covariate_values,
+        ncases,
+        nsamples,
+        memory_limit,
+        rng,
+    )
 
     if covariance_matrix is not None:
         parameters_samples = sample_parameters_from_covariance_matrix(
             model,
             input_parameter_estimates,
             covariance_matrix,
-            n=nbatches,
+            n=nparameter_samples,
             force_posdef_covmatrix=True,
             seed=rng,
         )
+        stderrs = _sample_stderrs(
+            compiled_exprs,
+            distributions,
+            parameters_samples,
+            covariate_values,
+            ncases,
+            nsamples_per_parameter,
+            rng,
+        )
+    else:
+        stderrs = [np.full(ncases, np.nan) for _ in compiled_exprs]
 
-        for _, row in parameters_samples.iterrows():
-            parameters = xreplace_dict(row)
-            local_sampling_rvs = list(
-                subs_distributions(
-                    distributions, {Expr(key): float(val) for key, val in parameters.items()}
-                )
-            ) + [
-                ((key,), ConstantDistribution(value))
-                for key, value in parameters.items()
-                if key in all_parameter_free_symbols
-            ]
-            batch = sample_rvs(local_sampling_rvs, batchsize, rng)
-            batches.append(batch)
-
-    table = pd.DataFrame(columns=['parameter', 'covariates', 'mean', 'variance', 'stderr'])
+    index = []
     i = 0
-
-    for name, full_expr in full_exprs:
-        df = pd.DataFrame(index=list(cases.keys()), columns=['mean', 'variance', 'stderr'])
-        parameter_estimates_expr = subs(full_expr, parameter_estimates, simultaneous=True)
-
-        for case, cov_values in cases.items():
-            expr = subs(parameter_estimates_expr, cov_values, simultaneous=True)
-            values = eval_expr(expr, nsamples, samples)
-
-            mean = np.mean(values)
-            variance = np.var(values)
-
-            # NOTE: This is NaN for empty inputs, dtype is required for those.
-            cov_expr = subs(full_expr, cov_values, simultaneous=True)
-            stderr = pd.Series(
-                chain.from_iterable(eval_expr(cov_expr, batchsize, batch) for batch in batches),
-                dtype='float64',
-            ).std()
-
-            df.loc[case] = [mean, variance, stderr]
-
-        df.index.name = 'covariates'
-        df.reset_index(inplace=True)
+    for name, _ in compiled_exprs:
         if not name:
             name = f'unknown{i}'
             i += 1
-        df['parameter'] = name
-        table = pd.concat([table, df])
-
-    table.set_index(['parameter', 'covariates'], inplace=True)
-    table = table.astype('float64')
+        index.extend((name, case) for case in cases.keys())
+
+    table = pd.DataFrame(
+        {
+            'mean': np.concatenate(means),
+            'variance': np.concatenate(variances),
+            'stderr': np.concatenate(stderrs),
+        },
+        index=pd.MultiIndex.from_tuples(index, names=['parameter', 'covariates']),
+        dtype='float64',
+    )
 
     return table
 
 
+def _sample_moments(
+    compiled_exprs,
+    sampling_rvs,
+    parameter_estimates,
+    covariate_values,
+    ncases,
+    nsamples,
+    memory_limit,
+    rng,
+):
+    # NOTE: Expressions are evaluated on arrays of shape (case, sample). The
+    # samples are drawn in chunks if they do not fit in the memory limit.
+    parameters = {key: float(value) for key, value in parameter_estimates.items()}
+    covariates = {key: values[:, np.newaxis] for key, values in covariate_values.items()}
+    nrvs = sum(len(symbols) for symbols, _ in sampling_rvs)
+    # NOTE: Leaves room for the copies made by sample_rvs and for the
+    # intermediate arrays of the compiled expressions
+    bytes_per_sample = 8 * (2 * nrvs + 4 * ncases)
+    chunksize = max(1, min(nsamples, memory_limit // bytes_per_sample))
+
+    chunks = [[] for _ in compiled_exprs]
+    for start in range(0, nsamples, chunksize):
+        size = min(chunksize, nsamples - start)
+        samples = sample_rvs(sampling_rvs, size, rng)
+        datamap = {**parameters, **covariates, **samples}
+        for moments, (_, fn) in zip(chunks, compiled_exprs):
+            values = np.broadcast_to(fn((ncases, size), datamap), (ncases, size))
+            moments.append((size, np.mean(values, axis=1), np.var(values, axis=1)))
+
+    means, variances = [], []
+    for moments in chunks:
+        count, mean, variance = moments[0]
+        for size, chunk_mean, chunk_variance in moments[1:]:
+            # NOTE: Pairwise update of Chan et al.
+            total = count + size
+            delta = chunk_mean - mean
+            mean = mean + delta * size / total
+            variance = (
+                count * variance + size * chunk_variance + delta**2 * count * size / total
+            ) / total
+            count = total
+        means.append(mean)
+        variances.append(variance)
+
+    return means, variances
+
+
+def _sample_stderrs(
+    compiled_exprs,
+    distributions,
+    parameters_samples,
+    covariate_values,
+    ncases,
+    nsamples,
+    rng,
+):
+    # NOTE: Expressions are evaluated on arrays of shape (case, parameter
+    # sample, sample). The standard normal draws for all parameter samples are
+    # made at once, in the order that sampling each distribution for one
+    # parameter sample at a time would use them.
+    nparameters = len(parameters_samples)
+    sampling_rvs = [
+        list(
+            subs_distributions(
+                distributions,
+                {Expr(key): float(val) for key, val in xreplace_dict(row).items()},
+            )
+        )
+        for _, row in parameters_samples.iterrows()
+    ]
+    dimensions = [distribution.dimension for _, distribution in sampling_rvs[0]]
+    offsets = np.cumsum([0] + [nsamples * dimension for dimension in dimensions])
+    z = rng.standard_normal((nparameters, offsets[-1]))
+
+    samples = {}
+    for k, (symbols, _) in enumerate(sampling_rvs[0]):
+        draws = z[:, offsets[k] : offsets[k + 1]].reshape(nparameters, nsamples, dimensions[k])
+        values = np.array([rvs[k][1].transform(draws[p]) for p, rvs in enumerate(sampling_rvs)])
+        if len(symbols) > 1:
+            for j, symbol in enumerate(symbols):
+                samples[symbol] = values[..., j]
+        else:
+            samples[symbols[0]] = values
+
+    parameters = {
+        sympy.Symbol(name): parameters_samples[name].to_numpy()[:, np.newaxis]
+        for name in parameters_samples.columns
+    }
+    covariates = {
+        key: values[:, np.newaxis, np.newaxis] for key, values in covariate_values.items()
+    }
+    datamap = {**parameters, **covariates, **samples}
+    shape = (ncases, nparameters, nsamples)
+
+    stderrs = []
+    for _, fn in compiled_exprs:
+        values = np.broadcast_to(fn(shape, datamap), shape).reshape(ncases, -1)
+        stderrs.append(np.std(values, axis=1, ddof=1))
+    return stderrs
+
+
 def calculate_pk_parameters_statistics(
     model: Model,
     parameter_estimates: pd.Series,
     covariance_matrix: Optional[pd.DataFrame] = None,
     seed: Optional[Union[np.random.Generator, int]] = None,
+    nsamples: int = 1000000,
+    nparameter_samples: int = 100,
+    nsamples_per_parameter: int = 10,
+    memory_limit: int = 2**29,
 ):
     """Calculate statistics for common pharmacokinetic parameters
 
@@ -426,6 +535,15 @@ def calculate_pk_parameters_statistics(
         Parameter uncertainty covariance matrix
     seed : Generator or int
         Random number generator or seed
+    nsamples : int
+        Number of samples from the random variables used for the mean and the variance
+    nparameter_samples : int
+        Number of samples from the parameter uncertainty used for the standard error
+    nsamples_per_parameter : int
+        Number of samples from the random variables for each parameter sample
+    memory_limit : int
+        Approximate number of bytes to use for the samples used for the mean and the
+        variance. The samples are drawn in chunks if more memory would be needed.
 
     Returns
     -------
@@ -532,11 +650,285 @@ def calculate_pk_parameters_statistics(
         expressions.append(sympy.Eq(sympy.Symbol('k_e'), elimination_rate))
 
     df = calculate_individual_parameter_statistics(
-        model, expressions, parameter_estimates, covariance_matrix, seed=seed
+        model,
+        expressions,
+        parameter_estimates,
+        covariance_matrix,
+        seed=seed,
+        nsamples=nsamples,
+        nparameter_samples=nparameter_samples,
+        nsamples_per_parameter=nsamples_per_parameter,
+        memory_limit=memory_limit,
     )
     return df
 
 
+def calculate_vpc(
+    model: Model,
+    simulations: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    binning: Literal["equal_width", "equal_number"] = "equal_number",
+    nbins: int = 8,
+    qi: float = 0.95,
+    ci: float = 0.95,
+    query: Optional[str] = None,
+):
+    """Calculate the statistics needed for a VPC
+
+    For each bin of the observations the median and the lower and upper quantiles
+    of the prediction interval are calculated for the observations and for the
+    simulations, together with the confidence intervals of the simulated quantiles.
+
+    The simulations can be given one replicate at a time, for example as the
+    replicates of a SimulationResults object that are kept on disk. They are then
+    read a few times but never all at once. The quantiles of all simulated values of
+    a bin are found exactly by counting the values in finer and finer histograms
+    until few enough values are left to be kept in memory.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    simulations : pd.DataFrame or iterable of pd.DataFrame
+        Simulated data with one dv column indexed on "SIM" and on the data indices or a
+        collection of such data for one replicate each indexed on the data indices. The
+        collection must be possible to iterate over more than once. All simulations
+        must have the same rows in the same order as the dataset of the model.
+    binning : ["equal_number", "equal_width"]
+        Binning method. Can be "equal_number" or "equal_width". The default is "equal_number".
+    nbins : int
+        Number of bins. Default is 8.
+    qi : float
+        Prediction interval. Default is 0.95.
+    ci : float
+        Confidence interval. Default is 0.95.
+    query : str
+        Query on the dataset selecting the observations to use. Optional.
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame of statistics with one row per bin
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import set_simulation, calculate_vpc, load_example_model
+    >>> from pharmpy.tools import run_simulation
+    >>> model = load_example_model("pheno")
+    >>> sim_model = set_simulation(model, n=100)
+    >>> sim_res = run_simulation(sim_model) # doctest: +SKIP
+    >>> calculate_vpc(model, sim_res.replicates) # doctest: +SKIP
+
+    See also
+    --------
+    vpc_plot : Plot a VPC
+    """
+    dv = model.datainfo.dv_column.name
+    dataset = model.dataset
+    nrows = len(dataset)
+    observations = get_observations(model, keep_index=True)
+
+    bincol, boundaries = bin_observations(model, binning, nbins)
+
+    if len(bincol.unique()) != bincol.unique().max() + 1:
+        raise ValueError("Some bins are empty, please choose a different number of bins.")
+
+    obstab = dataset.loc[observations.index]
+    if query is not None:
+        obstab = obstab.query(query)
+    bins = bincol.loc[obstab.index].to_numpy()
+
+    # NOTE: Simulated values are read as (simulation, observation). Columns of the
+    # observations are sorted on bin so that each bin is a contiguous block.
+    order = np.argsort(bins, kind='stable')
+    bins = bins[order]
+    obsvalues = obstab[dv].to_numpy()[order]
+    chunks = _simulated_observations(simulations, dv, nrows, obstab.index[order])
+
+    lower_quantile = (1 - qi) / 2
+    upper_quantile = 1 - lower_quantile
+    quantiles = np.array([lower_quantile, 0.5, upper_quantile])
+
+    present_bins, starts = np.unique(bins, return_index=True)
+    ends = np.append(starts[1:], len(bins))
+
+    # NOTE: First pass for the quantiles of each simulation and the range of each bin
+    per_sim_chunks = []
+    lowest = np.full(len(starts), np.inf)
+    highest = np.full(len(starts), -np.inf)
+    for chunk in chunks():
+        per_sim_chunks.append(
+            np.stack(
+                [
+                    _nearest_rank_quantiles(chunk[:, start:end], quantiles)
+                    for start, end in zip(starts, ends)
+                ],
+                axis=1,
+            )
+        )
+        lowest = np.minimum(lowest, np.minimum.reduceat(chunk, starts, axis=1).min(axis=0))
+        highest = np.maximum(highest, np.maximum.reduceat(chunk, starts, axis=1).max(axis=0))
+    # NOTE: Quantiles of each simulation as (bin, quantile, simulation)
+    per_sim = np.sort(np.concatenate(per_sim_chunks).transpose(1, 2, 0), axis=2)
+    nsim = per_sim.shape[2]
+    alpha = (1 - ci) / 2
+    ci_index = int(np.floor(alpha * (nsim - 1) + 0.5))
+    ci_lower = per_sim[:, :, ci_index]
+    ci_upper = per_sim[:, :, nsim - ci_index - 1]
+
+    # NOTE: The pooled quantiles use nearest ranks and the median is the mean of the
+    # two middle values
+    sizes = (ends - starts) * nsim
+    ranks = np.column_stack(
+        (
+            np.floor(lower_quantile * (sizes - 1) + 0.5),
+            (sizes - 1) // 2,
+            sizes // 2,
+            np.floor(upper_quantile * (sizes - 1) + 0.5),
+        )
+    ).astype(int)
+    if len(per_sim_chunks) == 1:
+        # NOTE: All simulated values are in memory so the ranks can be partitioned out
+        pooled = np.stack(
+            [
+                np.take(
+                    np.partition(chunk[:, start:end], np.unique(bin_ranks), axis=None), bin_ranks
+                )
+                for start, end, bin_ranks in zip(starts, ends, ranks)
+            ]
+        )
+    else:
+        pooled = _select_ranks(chunks, starts, ends, sizes, ranks, lowest, highest)
+
+    table = []
+    for j, (i, start, end) in enumerate(zip(present_bins, starts, ends)):
+        obs = _nearest_rank_quantiles(obsvalues[start:end], quantiles)
+        table.append(
+            {
+                'obs_central': obs[1],
+                'obs_lower': obs[0],
+                'obs_upper': obs[2],
+                'sim_central': np.mean(pooled[j, 1:3]),
+                'sim_central_lower': ci_lower[j, 1],
+                'sim_central_upper': ci_upper[j, 1],
+                'sim_lower': pooled[j, 0],
+                'sim_lower_lower': ci_lower[j, 0],
+                'sim_lower_upper': ci_upper[j, 0],
+                'sim_upper': pooled[j, 3],
+                'sim_upper_lower': ci_lower[j, 2],
+                'sim_upper_upper': ci_upper[j, 2],
+                'bin_midpoint': (boundaries[i] + boundaries[i + 1]) / 2,
+                'bin_edges_right': boundaries[i + 1],
+                'bin_edges_left': boundaries[i],
+                'n_data_points': np.count_nonzero(~np.isnan(obsvalues[start:end])),
+            }
+        )
+
+    return pd.DataFrame(table, index=present_bins)
+
+
+def _simulated_observations(simulations, dv, nrows, index):
+    """Function giving an iterator over chunks of simulated observations
+
+    Each chunk is an array of (simulation, observation). A DataFrame with all
+    simulations is a single chunk while replicates are read in batches of at most
+    _VPC_CHUNK_SIZE values.
+    """
+    if isinstance(simulations, pd.DataFrame):
+        nsim = len(simulations) // nrows
+        rows = simulations.index.droplevel('SIM')[:nrows]
+        columns = pd.Index(rows).get_indexer(index)
+        values = simulations[dv].to_numpy().reshape(nsim, nrows)[:, columns]
+        return lambda: iter((values,))
+
+    if iter(simulations) is simulations:
+        raise ValueError('The replicates of simulations must be possible to iterate over twice')
+
+    batch_size = max(1, _VPC_CHUNK_SIZE // max(1, len(index)))
+
+    def iterate():
+        batch = []
+        columns = None
+        for replicate in simulations:
+            if columns is None:
+                columns = pd.Index(replicate.index).get_indexer(index)
+            batch.append(replicate[dv].to_numpy()[columns])
+            if len(batch) == batch_size:
+                yield np.stack(batch)
+                batch = []
+        if batch:
+            yield np.stack(batch)
+
+    return iterate
+
+
+def _select_ranks(chunks, starts, ends, sizes, ranks, lowest, highest):
+    """Find the values with given ranks among all simulated values of each bin
+
+    The value with a rank is searched for in a closed interval that initially covers
+    all values of the bin. In each pass over the chunks the values in the interval are
+    counted in _VPC_HISTOGRAM_SIZE cells and the interval is narrowed to the smallest
+    and largest value of the cell containing the rank. The search ends when these are
+    equal, which is immediate for tied values, or the interval has at most
+    _VPC_SELECTION_SIZE values. These are then collected in the next pass and sorted.
+    """
+    nbins, nranks = ranks.shape
+    ncells = _VPC_HISTOGRAM_SIZE
+    lower = np.repeat(lowest[:, np.newaxis], nranks, axis=1)
+    upper = np.repeat(highest[:, np.newaxis], nranks, axis=1)
+    below = np.zeros((nbins, nranks), dtype=np.int64)
+    count = np.repeat(sizes[:, np.newaxis], nranks, axis=1)
+    result = np.where(lower == upper, lower, np.nan)
+
+    while np.any(np.isnan(result)):
+        pending = np.isnan(result)
+        collect = pending & (count <= _VPC_SELECTION_SIZE)
+        refine = pending & ~collect
+        edges = lower[..., np.newaxis] + (upper - lower)[..., np.newaxis] * (
+            np.arange(ncells + 1) / ncells
+        )
+        counts = np.zeros((nbins, nranks, ncells), dtype=np.int64)
+        cell_min = np.full((nbins, nranks, ncells), np.inf)
+        cell_max = np.full((nbins, nranks, ncells), -np.inf)
+        collected = {(j, k): [] for j, k in zip(*np.nonzero(collect))}
+        for chunk in chunks():
+            for j, k in zip(*np.nonzero(pending)):
+                block = chunk[:, starts[j] : ends[j]]
+                values = block[(block >= lower[j, k]) & (block <= upper[j, k])]
+                if collect[j, k]:
+                    collected[j, k].append(values)
+                else:
+                    cell = np.minimum(
+                        np.searchsorted(edges[j, k], values, side='right') - 1, ncells - 1
+                    )
+                    counts[j, k] += np.bincount(cell, minlength=ncells)
+                    np.minimum.at(cell_min[j, k], cell, values)
+                    np.maximum.at(cell_max[j, k], cell, values)
+
+        for (j, k), parts in collected.items():
+            values = np.sort(np.concatenate(parts))
+            result[j, k] = values[ranks[j, k] - below[j, k]]
+        for j, k in zip(*np.nonzero(refine)):
+            cumulative = np.cumsum(counts[j, k])
+            cell = int(np.searchsorted(cumulative, ranks[j, k] - below[j, k], side='right'))
+            below[j, k] += cumulative[cell - 1] if cell > 0 else 0
+            count[j, k] = counts[j, k, cell]
+            if cell_min[j, k, cell] == cell_max[j, k, cell]:
+                result[j, k] = cell_min[j, k, cell]
+            elif cell_min[j, k, cell] == lower[j, k] and cell_max[j, k, cell] == upper[j, k]:
+                # NOTE: The interval is too narrow to be split into cells
+                count[j, k] = 0
+            lower[j, k] = cell_min[j, k, cell]
+            upper[j, k] = cell_max[j, k, cell]
+    return result
+
+
+def _nearest_rank_quantiles(values, quantiles):
+    # NOTE: The quantile q of the n values in the last axis is the value with
+    # rank floor(q * (n - 1) + 0.5). Partitioning is enough to find all ranks.
+    ranks = np.floor(quantiles * (values.shape[-1] - 1) + 0.5).astype(int)
+    return np.take(np.partition(values, np.unique(ranks), axis=-1), ranks, axis=-1)
+
+
 def _split_equation(s):
     if isinstance(s, str):
         a = s.split('=')
@@ -650,20 +1042,37 @@ def calculate_bic(
     >>> calculate_bic(model, ofv, type='iiv')
     594.431131169692
     """
+    return likelihood + _bic_penalty(model, type, multiple_testing, mult_test_p, mult_test_e)
+
+
+def _bic_penalty(
+    model: Model,
+    type: str,
+    multiple_testing: bool = False,
+    mult_test_p: int = 1,
+    mult_test_e: int = 1,
+    nobs: Optional[int] = None,
+    nsubs: Optional[int] = None,
+) -> float:
+    # NOTE: The number of observations and individuals can be given to avoid
+    # recalculating them for many models with the same dataset
     parameters = model.parameters.nonfixed
     if type == 'fixed':
-        penalty = len(parameters) * math.log(len(get_observations(model)))
+        nobs = len(get_observations(model)) if nobs is None else nobs
+        penalty = len(parameters) * math.log(nobs)
     elif type == 'random':
-        penalty = len(parameters) * math.log(len(get_ids(model)))
+        nsubs = len(get_ids(model)) if nsubs is None else nsubs
+        penalty = len(parameters) * math.log(nsubs)
     elif type == 'iiv':
+        nsubs = len(get_ids(model)) if nsubs is None else nsubs
         nomegas_iiv = len(
             [name for name in model.random_variables.iiv.parameter_names if name in parameters]
         )
-        penalty = nomegas_iiv * math.log(len(get_ids(model)))
+        penalty = nomegas_iiv * math.log(nsubs)
     elif type == 'mixed':
         theta_f, theta_r = _categorize_parameters(model)
-        nsubs = len(get_ids(model))
-        nobs = len(get_observations(model))
+        nsubs = len(get_ids(model)) if nsubs is None else nsubs
+        nobs = len(get_observations(model)) if nobs is None else nobs
         penalty = len(theta_r) * math.log(nsubs) + len(theta_f) * math.log(nobs)
     else:
         supported_types = ('mixed', 'fixed', 'random', 'iiv')
@@ -676,7 +1085,7 @@ def calculate_bic(
             )
         penalty += 2 * len(parameters) * math.log(mult_test_p / mult_test_e)
 
-    return likelihood + penalty
+    return penalty
 
 
 def _categorize_parameters(model):
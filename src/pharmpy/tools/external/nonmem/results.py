@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import warnings
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Optional, Union
 
@@ -10,10 +11,16 @@ from pharmpy.internals.math import nearest_positive_semidefinite
 from pharmpy.model import EstimationSteps, Model, Parameters, RandomVariables
 from pharmpy.model.external.nonmem.nmtran_parser import NMTranControlStream
 from pharmpy.model.external.nonmem.parsing import parse_table_columns
-from pharmpy.model.external.nonmem.table import ExtTable, NONMEMTableFile, PhiTable
+from pharmpy.model.external.nonmem.table import ExtTable, NONMEMTableFile, PhiTable, iterate_tables
 from pharmpy.model.external.nonmem.update import create_name_map
 from pharmpy.workflows.log import Log
-from pharmpy.workflows.results import ModelfitResults, SimulationResults
+from pharmpy.workflows.results import (
+    LazyAttribute,
+    LazyModelfitResults,
+    ModelfitResults,
+    SimulationResults,
+    SimulationTable,
+)
 
 from .results_file import NONMEMResultsFile
 
@@ -83,15 +90,6 @@ def _parse_modelfit_results(
         cov_abort,
     ) = _parse_ext(control_stream, name_map, ext_tables, subproblem, parameters)
 
-    table_df = _parse_tables(
-        path, control_stream, netas=len(model.random_variables.etas.names)
-    )  # $TABLEs
-    residuals = _parse_residuals(table_df)
-    predictions = _parse_predictions(table_df)
-    iofv, ie, iec = _parse_phi(path, control_stream, name_map, etas, model, final_pe, subproblem)
-    gradients_iterations, final_zero_gradient, gradients = _parse_grd(
-        path, control_stream, name_map, parameters, subproblem
-    )
     rse = _calculate_relative_standard_errors(final_pe, ses)
     (
         runtime_total,
@@ -121,18 +119,44 @@ def _parse_modelfit_results(
     termcause_iters = pd.Series(termination_cause, index=eststeps, name='termination_cause')
     sigdigs_iters = pd.Series(significant_digits, index=eststeps, name='significant_digits')
 
-    if covstatus and ses is not None and not cov_abort:
-        cov = _parse_matrix(path.with_suffix(".cov"), control_stream, name_map, table_numbers)
-        cor = _parse_matrix(path.with_suffix(".cor"), control_stream, name_map, table_numbers)
-        if cor is not None:
-            np.fill_diagonal(cor.values, 1)
-        coi = _parse_matrix(path.with_suffix(".coi"), control_stream, name_map, table_numbers)
-    else:
-        cov, cor, coi = None, None, None
+    # NOTE: Everything that is not needed for ranking models is parsed on first access
+    @cache
+    def tables():
+        table_df = _parse_tables(path, control_stream, netas=len(etas.names))  # $TABLEs
+        return _parse_residuals(table_df), _parse_predictions(table_df)
+
+    @cache
+    def phi():
+        return _parse_phi(path, control_stream, name_map, etas, model, final_pe, subproblem)
+
+    @cache
+    def grd():
+        return _parse_grd(path, control_stream, name_map, parameters, subproblem)
+
+    @cache
+    def matrices():
+        if covstatus and ses is not None and not cov_abort:
+            cov = _parse_matrix(path.with_suffix(".cov"), control_stream, name_map, table_numbers)
+            cor = _parse_matrix(path.with_suffix(".cor"), control_stream, name_map, table_numbers)
+            if cor is not None:
+                np.fill_diagonal(cor.values, 1)
+            coi = _parse_matrix(path.with_suffix(".coi"), control_stream, name_map, table_numbers)
+        else:
+            cov, cor, coi = None, None, None
 
-    cov, cor, coi, ses = calculate_cov_cor_coi_ses(cov, cor, coi, ses)
-    if cov is not None:
-        cov = nearest_positive_semidefinite(cov)
+        cov, cor, coi, _ = calculate_cov_cor_coi_ses(cov, cor, coi, ses)
+        if cov is not None:
+            cov = nearest_positive_semidefinite(cov)
+        return cov, cor, coi
+
+    def estimation_warnings():
+        warnings = []
+        if any(estimate_near_boundary):
+            warnings.append('estimate_near_boundary')
+        _, final_zero_gradient, _ = grd()
+        if final_zero_gradient:
+            warnings.append('final_zero_gradient')
+        return warnings
 
     evaluation = _parse_evaluation(estimation_steps)
 
@@ -146,13 +170,7 @@ def _parse_modelfit_results(
     else:
         covstep_successful = False
 
-    warnings = []
-    if any(estimate_near_boundary):
-        warnings.append('estimate_near_boundary')
-    if final_zero_gradient:
-        warnings.append('final_zero_gradient')
-
-    res = ModelfitResults(
+    res = LazyModelfitResults(
         name=name,
         description=description,
         minimization_successful=minimization_successful[last_est_ind],
@@ -166,29 +184,29 @@ def _parse_modelfit_results(
         significant_digits=significant_digits[-1],
         significant_digits_iterations=sigdigs_iters,
         relative_standard_errors=rse,
-        individual_estimates=ie,
-        individual_estimates_covariance=iec,
+        individual_estimates=LazyAttribute(lambda: phi()[1]),
+        individual_estimates_covariance=LazyAttribute(lambda: phi()[2]),
         runtime_total=runtime_total,
         log_likelihood=log_likelihood,
-        covariance_matrix=cov,
-        correlation_matrix=cor,
-        precision_matrix=coi,
+        covariance_matrix=LazyAttribute(lambda: matrices()[0]),
+        correlation_matrix=LazyAttribute(lambda: matrices()[1]),
+        precision_matrix=LazyAttribute(lambda: matrices()[2]),
         standard_errors=ses,
         standard_errors_sdcorr=ses_sdcorr,
-        individual_ofv=iofv,
+        individual_ofv=LazyAttribute(lambda: phi()[0]),
         parameter_estimates=final_pe,
         parameter_estimates_sdcorr=sdcorr,
         parameter_estimates_iterations=pe_iterations,
         ofv=final_ofv,
         ofv_iterations=ofv_iterations,
-        predictions=predictions,
-        residuals=residuals,
+        predictions=LazyAttribute(lambda: tables()[1]),
+        residuals=LazyAttribute(lambda: tables()[0]),
         evaluation=evaluation,
         log=log,
         covstep_successful=covstep_successful,
-        gradients=gradients,
-        gradients_iterations=gradients_iterations,
-        warnings=warnings,
+        gradients=LazyAttribute(lambda: grd()[2]),
+        gradients_iterations=LazyAttribute(lambda: grd()[0]),
+        warnings=LazyAttribute(estimation_warnings),
     )
     return res
 
@@ -505,10 +523,10 @@ def _parse_tables(path: Path, control_stream: NMTranControlStream, netas) -> pd.
         nolabel = table_rec.has_option("NOLABEL") or noheader
         table_path = path.parent / table_rec.path
         try:
-            table_file = NONMEMTableFile(table_path, notitle=notitle, nolabel=nolabel)
+            # Only the first table is needed so the rest of the file is never parsed
+            table = next(iterate_tables(table_path, notitle=notitle, nolabel=nolabel))
         except IOError:
             continue
-        table = table_file.tables[0]
 
         df[colnames_in_table] = table.data_frame.iloc[:, columns_in_table]
 
@@ -818,31 +836,33 @@ def parse_modelfit_results(
     return res
 
 
-def _parse_table_file(model, path: Optional[Union[str, Path]], subproblem: Optional[int] = None):
+def _iterate_simulated_tables(model, path: Path):
     table_recs = model.internals.control_stream.get_records('TABLE')
-    df = pd.DataFrame()
+    index = pd.RangeIndex(len(model.dataset), name='index')
     for table_rec in table_recs:
         noheader = table_rec.has_option("NOHEADER")
         notitle = table_rec.has_option("NOTITLE") or noheader
         nolabel = table_rec.has_option("NOLABEL") or noheader
         table_path = path.parent / table_rec.path
+        # One subproblem at a time is parsed and only its DV column is kept. A file that
+        # cannot be read is skipped.
         try:
-            table_file = NONMEMTableFile(table_path, notitle=notitle, nolabel=nolabel)
+            for table in iterate_tables(table_path, notitle=notitle, nolabel=nolabel):
+                yield table.data_frame[['DV']].set_axis(index)
         except IOError:
             continue
-        for i in range(len(table_file)):
-            sim = table_file.tables[i].data_frame[['DV']].copy()
-            assert 'DV' in sim.columns
-            sim['SIM'] = i + 1
-            sim['index'] = np.arange(len(model.dataset))
-            df = pd.concat([df, sim], ignore_index=True)
-    df = df.set_index(['SIM', 'index'])
-    return df
 
 
 def parse_simulation_results(
     model, path: Optional[Union[str, Path]], subproblem: Optional[int] = None
 ):
-    table = _parse_table_file(model, path=path, subproblem=subproblem)
-    res = SimulationResults(name=model.name, description=model.description, table=table)
+    path = Path(path)
+    # NOTE: The replicates are written to disk one at a time and the table of all
+    # replicates is only created if it is used
+    replicates = SimulationTable.write(
+        path.with_name(path.name + '.sim.npz'), _iterate_simulated_tables(model, path)
+    )
+    res = SimulationResults.from_dict(
+        {'name': model.name, 'description': model.description, 'replicates': replicates}
+    )
     return res
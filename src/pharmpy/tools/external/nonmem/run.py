@@ -12,7 +12,8 @@ from pathlib import Path
 from pharmpy.model.external.nonmem import convert_model
 from pharmpy.modeling import write_csv, write_model
 from pharmpy.tools.external.nonmem import conf, parse_modelfit_results, parse_simulation_results
-from pharmpy.workflows import ModelEntry
+from pharmpy.workflows import ModelEntry, SimulationResults
+from pharmpy.workflows.results import SimulationTable
 
 PARENT_DIR = f'..{os.path.sep}'
 
@@ -119,11 +120,11 @@ def execute_model(model_entry, db):
         simulation_results = None
 
     log = modelfit_results.log if modelfit_results else None
-    model_entry = model_entry.attach_results(
+    run_entry = model_entry.attach_results(
         modelfit_results=modelfit_results, simulation_results=simulation_results, log=log
     )
 
-    with database.transaction(model_entry) as txn:
+    with database.transaction(run_entry) as txn:
         if (
             not (model_path / basename).with_suffix('.lst').is_file()
             or not (model_path / basename).with_suffix('.ext').is_file()
@@ -139,6 +140,9 @@ def execute_model(model_entry, db):
             for rec in model.internals.control_stream.get_records('TABLE'):
                 txn.store_local_file(model_path / rec.path)
 
+        if simulation_results is not None:
+            txn.store_local_file(simulation_results.replicates.path)
+
         txn.store_local_file(stdout)
         txn.store_local_file(stderr)
 
@@ -152,7 +156,24 @@ def execute_model(model_entry, db):
 
         txn.store_model_entry()
 
-    return model_entry
+    if simulation_results is not None:
+        # NOTE: The replicates are read from the copy in the database and not from
+        # the run directory
+        replicates = SimulationTable(
+            database.retrieve_file(model.name, simulation_results.replicates.path.name)
+        )
+        simulation_results = SimulationResults.from_dict(
+            {
+                'name': simulation_results.name,
+                'description': simulation_results.description,
+                'replicates': replicates,
+            }
+        )
+        run_entry = model_entry.attach_results(
+            modelfit_results=modelfit_results, simulation_results=simulation_results, log=log
+        )
+
+    return run_entry
 
 
 def nmfe_path():
@@ -9,11 +9,7 @@ from pharmpy.deps import altair as alt
 from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.deps import symengine
-from pharmpy.internals.math import (
-    conditional_joint_normal,
-    conditional_joint_normal_lambda,
-    is_posdef,
-)
+from pharmpy.internals.math import is_posdef
 from pharmpy.model import Model
 from pharmpy.modeling import (
     calculate_individual_shrinkage,
@@ -617,85 +613,80 @@ def calculate_results_from_samples(
     npars = sigma_symb.rows - ncovs
     param_names = get_params(frem_model, rvs, npars)
     nids = len(covariate_baselines)
-    param_indices = list(range(npars))
-    scaling = np.diag(np.concatenate((np.ones(npars), cov_stdevs.values))) if rescale else None
-
-    mu_bars_given_5th = np.empty((n, ncovs, npars))
-    mu_bars_given_95th = np.empty((n, ncovs, npars))
-    mu_id_bars = np.empty((n, nids, npars))
-    original_id_bar = np.empty((nids, npars))
-    variability = np.empty((n, ncovs + 2, npars))  # none, cov1, cov2, ..., all
-    original_variability = np.empty((ncovs + 2, npars))
+
     coefficients_index = pd.MultiIndex.from_product(
         [['all', 'each'], param_names], names=['condition', 'parameter']
     )
     coefficients = pd.DataFrame(index=coefficients_index, columns=covariates, dtype=np.float64)
-    parameter_variability = []
 
-    # Switch to symengine for speed
-    # Could also assume order of parameters, but not much gain
-    sigma_symb = symengine.sympify(sigma_symb)
-    parvecs.columns = [symengine.Symbol(colname) for colname in parvecs.columns]
+    # NOTE: The covariance matrix is compiled once and evaluated for all samples at
+    # the same time. The estimates are evaluated last.
+    sigma_func = symengine.Lambdify(
+        [symengine.Symbol(name) for name in parvecs.columns],
+        symengine.sympify(sigma_symb),
+        real=True,
+    )
+    sigmas = np.asarray(sigma_func(parvecs.to_numpy(dtype=np.float64)), dtype=np.float64)
+    sigmas = sigmas.reshape((n + 1, npars + ncovs, npars + ncovs))
+    if rescale:
+        scale = np.concatenate((np.ones(npars), cov_stdevs.values))
+        sigmas = sigmas * np.outer(scale, scale)
+
+    sigma_11 = sigmas[:, :npars, :npars]
+    sigma_12 = sigmas[:, :npars, npars:]
+    sigma_21 = sigmas[:, npars:, :npars]
+    sigma_22 = sigmas[:, npars:, npars:]
+    variances = np.diagonal(sigma_11, axis1=1, axis2=2)
+
+    # Conditioning on one covariate at a time
+    # Sigma_12 * Sigma_22^-1 is a column per covariate
+    cov_variances = np.diagonal(sigma_22, axis1=1, axis2=2)
+    cov_weights = sigma_12 * (1.0 / cov_variances)[:, np.newaxis, :]
+    first_references = np.array(
+        [cov_others[cov] if cov in categorical else cov_5th[cov] for cov in covariates],
+        dtype=np.float64,
+    )
+    cov_refs_values = cov_refs[covariates].to_numpy(dtype=np.float64)
+    mu_bars_given_5th = np.swapaxes(cov_weights * (first_references - cov_refs_values), 1, 2)
+    mu_bars_given_95th = np.swapaxes(
+        cov_weights * (cov_95th[covariates].to_numpy(dtype=np.float64) - cov_refs_values), 1, 2
+    )
+    cov_variability = variances[:, np.newaxis, :] - np.swapaxes(
+        cov_weights * np.swapaxes(sigma_21, 1, 2), 1, 2
+    )
 
+    # Conditioning on all covariates for each individual
+    id_weights = sigma_12 @ np.linalg.inv(sigma_22)
+    id_variability = sigma_11 - id_weights @ sigma_21
     estimated_covbase = _calculate_covariate_baselines(frem_model, frem_model_results, covariates)
-    covbase = estimated_covbase.to_numpy()
-
-    parameter_variability_all = None
-
-    for sample_no, params in parvecs.iterrows():
-        sigma = sigma_symb.subs(dict(params))
-        sigma = np.array(sigma).astype(np.float64)
-        if scaling is not None:
-            sigma = scaling @ sigma @ scaling
-        if sample_no != 'estimates':
-            variability[sample_no, 0, :] = np.diag(sigma)[:npars]
-        else:
-            original_variability[0, :] = np.diag(sigma)[:npars]
-            # Coefficients conditioned on all parameters
-            # Sigma_12 * Sigma_22^-1
-            coeffs_all = sigma[0:npars, npars:] @ np.linalg.inv(sigma[npars:, npars:])
-            coefficients.loc['all'] = coeffs_all
-        for i, cov in enumerate(covariates):
-            indices = param_indices + [i + npars]
-            cov_sigma = sigma[indices][:, indices]
-            cov_mu = np.array([0] * npars + [cov_refs[cov]])
-            if cov in categorical:
-                first_reference = cov_others[cov]
-            else:
-                first_reference = cov_5th[cov]
-            mu_bar_given_5th_cov, sigma_bar = conditional_joint_normal(
-                cov_mu, cov_sigma, np.array([first_reference])
-            )
-            if sample_no != 'estimates':
-                mu_bar_given_95th_cov, _ = conditional_joint_normal(
-                    cov_mu, cov_sigma, np.array([cov_95th[cov]])
-                )
-                mu_bars_given_5th[sample_no, i, :] = mu_bar_given_5th_cov
-                mu_bars_given_95th[sample_no, i, :] = mu_bar_given_95th_cov
-                variability[sample_no, i + 1, :] = np.diag(sigma_bar)
-            else:
-                original_variability[i + 1, :] = np.diag(sigma_bar)
-                parameter_variability.append(sigma_bar)
-                # Calculate coefficients
-                # Cov(Par, covariate) / Var(covariate)
-                for parind, parname in enumerate(param_names):
-                    coefficients.loc[('each', parname), cov] = (
-                        cov_sigma[parind][-1] / cov_sigma[-1][-1]
-                    )
-
-        id_mu = np.array([0] * npars + list(cov_refs))
-        cjn = conditional_joint_normal_lambda(id_mu, sigma, npars)
-        for i in range(len(estimated_covbase)):
-            row = covbase[i, :]
-            assert npars + len(row) == len(id_mu)
-            mu_id_bar, sigma_id_bar = cjn(row)
-            if sample_no != 'estimates':
-                mu_id_bars[sample_no, i, :] = mu_id_bar
-                variability[sample_no, -1, :] = np.diag(sigma_id_bar)
-            else:
-                original_id_bar[i, :] = mu_id_bar
-                original_variability[ncovs + 1, :] = np.diag(sigma_id_bar)
-                parameter_variability_all = sigma_id_bar
+    covbase = estimated_covbase.to_numpy(dtype=np.float64)
+    assert covbase.shape[1] == ncovs
+    mu_id_bars = np.einsum('spc,ic->sip', id_weights, covbase - cov_refs_values)
+
+    variability = np.concatenate(
+        (
+            variances[:, np.newaxis, :],
+            cov_variability,
+            np.diagonal(id_variability, axis1=1, axis2=2)[:, np.newaxis, :],
+        ),
+        axis=1,
+    )  # none, cov1, cov2, ..., all
+
+    original_variability = variability[n]
+    original_id_bar = mu_id_bars[n]
+    parameter_variability_all = id_variability[n] if nids > 0 else None
+    parameter_variability = sigma_11[n] - np.einsum(
+        'pc,cq->cpq', cov_weights[n], sigma_21[n]
+    )  # One matrix per covariate
+    # Coefficients conditioned on all parameters
+    coefficients.loc['all'] = id_weights[n]
+    # Cov(Par, covariate) / Var(covariate)
+    coefficients.loc['each'] = sigma_12[n] / cov_variances[n]
+
+    mu_bars_given_5th = mu_bars_given_5th[:n]
+    mu_bars_given_95th = mu_bars_given_95th[:n]
+    mu_id_bars = mu_id_bars[:n]
+    variability = variability[:n]
 
     # Create covariate effects table
     mu_bars_given_5th = np.exp(mu_bars_given_5th)
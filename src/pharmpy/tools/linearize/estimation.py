@@ -0,0 +1,385 @@
+"""Estimation of models without ODE system using FO or FOCE
+
+The objective function is evaluated with numpy for all individuals at once. Sums
+over the observations of each individual are made with np.add.reduceat and the
+small matrices of each individual (number of etas x number of etas) are handled
+with batched linear algebra. Since the observation variance is diagonal only the
+covariance of the etas needs to be inverted, see the Woodbury identity.
+
+For FOCE the conditional estimates of the etas of all individuals are found together
+using Fisher scoring. The OFV follows the definitions in
+Wang Y, Derivation of various NONMEM estimation methods, J Pharmacokinet Pharmacodyn 2007.
+As for NONMEM the constant term with log(2*pi) is not included.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from pharmpy.basic import Expr
+from pharmpy.internals.expr.eval import compile_expr
+from pharmpy.model import Model
+from pharmpy.modeling import (
+    calculate_epsilon_gradient_expression,
+    calculate_eta_gradient_expression,
+    get_individual_prediction_expression,
+    get_observations,
+)
+from pharmpy.workflows import ModelEntry
+from pharmpy.workflows.results import ModelfitResults
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from scipy import optimize
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps import pandas as pd
+    from pharmpy.deps.scipy import optimize
+
+# NOTE: Lower bound used in the optimization for parameters with a lower bound of 0
+_SMALLEST_VARIANCE = 1e-10
+_MAX_ETA_ITERATIONS = 100
+_MAX_STEP_HALVINGS = 30
+_ETA_TOLERANCE = 1e-8
+# NOTE: Step for the finite difference gradient of the scaled parameters. It needs to be
+# large compared to the tolerance of the conditional estimates of the etas.
+_GRADIENT_STEP = 1e-6
+
+
+class _NameMapping(Mapping[Any, Any]):
+    """Map symbols to values by name"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self._values = values
+
+    def __getitem__(self, symbol):
+        return self._values[symbol.name]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(Expr.symbol, self._values)
+
+
+def create_objective_function(
+    model: Model,
+) -> Callable[[Mapping[str, float]], Tuple[np.ndarray, np.ndarray]]:
+    """Create a function that evaluates the FO or FOCE objective function of a model
+
+    The estimation method of the first estimation step of the model is used. The
+    model cannot have an ODE system.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    Callable
+        A function taking a dictionary of parameter values and returning the OFV of
+        each individual and the conditional estimates of the etas for each individual
+    """
+    if model.statements.ode_system is not None:
+        raise ValueError('Models with ODE systems are not supported')
+    step = model.estimation_steps[0]
+    if step.method not in ('FO', 'FOCE'):
+        raise ValueError(f'Estimation method {step.method} is not supported, only FO and FOCE')
+    conditional = step.method == 'FOCE'
+    interaction = conditional and step.interaction
+
+    rvs = model.random_variables
+    eta_names = rvs.etas.names
+    neta = len(eta_names)
+    eta_symbols = [Expr.symbol(eta) for eta in eta_names]
+    zero_etas = {eta: 0 for eta in eta_symbols}
+
+    f_expr = get_individual_prediction_expression(model)
+    g_exprs = calculate_eta_gradient_expression(model)
+    h_exprs = [
+        h.subs({Expr.symbol(eps): 0 for eps in rvs.epsilons.names})
+        for h in calculate_epsilon_gradient_expression(model)
+    ]
+    if not conditional:
+        f_expr = f_expr.subs(zero_etas)
+        g_exprs = [g.subs(zero_etas) for g in g_exprs]
+    if not interaction:
+        h_exprs = [h.subs(zero_etas) for h in h_exprs]
+    f_fn = compile_expr(f_expr)
+    g_fns = [compile_expr(g) for g in g_exprs]
+    h_fns = [compile_expr(h) for h in h_exprs]
+    dh_fns = [[compile_expr(h.diff(eta)) for eta in eta_symbols] for h in h_exprs]
+
+    omega_fn = _matrix_evaluator(rvs.etas.covariance_matrix)
+    sigma_fn = _matrix_evaluator(rvs.epsilons.covariance_matrix)
+
+    observations = get_observations(model, keep_index=True)
+    df = model.dataset.loc[observations.index]
+    ids, id_index = np.unique(df[model.datainfo.id_column.name].to_numpy(), return_inverse=True)
+    # NOTE: Observations are sorted on individual so that np.add.reduceat can be used
+    order = np.argsort(id_index, kind='stable')
+    id_index = id_index[order]
+    dv = observations.to_numpy(dtype='float64')[order]
+    data = {name: df[name].to_numpy()[order] for name in df.columns}
+    starts = np.flatnonzero(np.r_[True, id_index[1:] != id_index[:-1]])
+    nobs = len(dv)
+
+    def evaluate(parameters, etas):
+        values = {**data, **parameters}
+        for k, eta in enumerate(eta_names):
+            values[eta] = etas[id_index, k]
+        mapping = _NameMapping(values)
+        f = f_fn(nobs, mapping)
+        g = np.column_stack([fn(nobs, mapping) for fn in g_fns]) if g_fns else np.empty((nobs, 0))
+        h = np.column_stack([fn(nobs, mapping) for fn in h_fns])
+        if interaction:
+            dh = np.stack([[fn(nobs, mapping) for fn in fns] for fns in dh_fns]).transpose(2, 0, 1)
+        else:
+            dh = None
+        return f, g, h, dh
+
+    def moments(sigma, h, dh):
+        variance = np.einsum('jk,kl,jl->j', h, sigma, h)
+        if dh is None:
+            return variance, None
+        return variance, 2 * np.einsum('jk,kl,jle->je', h, sigma, dh)
+
+    def conditional_objective(etas, omega_inv, residual, variance):
+        # NOTE: -2 log of the joint density of the observations and the etas of each individual
+        individual = np.add.reduceat(np.log(variance) + residual**2 / variance, starts)
+        return individual + np.einsum('ie,ef,if->i', etas, omega_inv, etas)
+
+    def fisher_scoring_terms(etas, omega_inv, residual, variance, g, dvariance):
+        gradient = etas @ omega_inv - _sum(g * (residual / variance)[:, None], starts)
+        information = omega_inv + _sum(
+            g[:, :, None] * g[:, None, :] / variance[:, None, None], starts
+        )
+        if dvariance is not None:
+            weights = 1 / variance - residual**2 / variance**2
+            gradient = gradient + 0.5 * _sum(dvariance * weights[:, None], starts)
+            information = information + 0.5 * _sum(
+                dvariance[:, :, None] * dvariance[:, None, :] / variance[:, None, None] ** 2,
+                starts,
+            )
+        return gradient, information
+
+    def estimate_etas(parameters, etas, omega_inv, sigma, fixed_variance):
+        def terms(etas):
+            f, g, h, dh = evaluate(parameters, etas)
+            if fixed_variance is None:
+                variance, dvariance = moments(sigma, h, dh)
+            else:
+                variance, dvariance = fixed_variance, None
+            residual = dv - f
+            ofv = conditional_objective(etas, omega_inv, residual, variance)
+            return ofv, residual, variance, g, dvariance
+
+        ofv, residual, variance, g, dvariance = terms(etas)
+        for _ in range(_MAX_ETA_ITERATIONS):
+            gradient, information = fisher_scoring_terms(
+                etas, omega_inv, residual, variance, g, dvariance
+            )
+            step = np.linalg.solve(information, gradient[:, :, None])[:, :, 0]
+            # NOTE: Step halving for each individual until its objective does not increase
+            scale = np.ones(len(etas))
+            for _ in range(_MAX_STEP_HALVINGS):
+                candidate = etas - scale[:, None] * step
+                candidate_terms = terms(candidate)
+                worse = ~(candidate_terms[0] <= ofv)
+                if not worse.any():
+                    break
+                scale[worse] /= 2
+            else:
+                scale[worse] = 0
+                candidate = etas - scale[:, None] * step
+                candidate_terms = terms(candidate)
+            converged = np.max(np.abs(candidate - etas), initial=0) < _ETA_TOLERANCE
+            etas = candidate
+            ofv, residual, variance, g, dvariance = candidate_terms
+            if converged:
+                break
+        return etas, residual, variance, g, dvariance
+
+    last_etas = np.zeros((len(ids), neta))
+
+    def objective_function(parameters: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        nonlocal last_etas
+        parameters = dict(parameters)
+        omega = omega_fn(parameters)
+        sigma = sigma_fn(parameters)
+        omega_inv = np.linalg.inv(omega)
+        _, omega_logdet = np.linalg.slogdet(omega)
+
+        etas = np.zeros((len(ids), neta))
+        if interaction:
+            fixed_variance = None
+        else:
+            _, _, h, _ = evaluate(parameters, etas)
+            fixed_variance, _ = moments(sigma, h, None)
+        if conditional:
+            etas, residual, variance, g, dvariance = estimate_etas(
+                parameters, last_etas, omega_inv, sigma, fixed_variance
+            )
+            last_etas = etas
+        else:
+            f, g, _, _ = evaluate(parameters, etas)
+            residual, variance, dvariance = dv - f, fixed_variance, None
+
+        if interaction:
+            # NOTE: Laplacian approximation with the expected information as Hessian
+            _, information = fisher_scoring_terms(etas, omega_inv, residual, variance, g, dvariance)
+            _, information_logdet = np.linalg.slogdet(information)
+            ofv = conditional_objective(etas, omega_inv, residual, variance)
+            return ofv + omega_logdet + information_logdet, etas
+
+        # NOTE: The predictions are linearized in the etas around their conditional estimates
+        residual = residual + np.sum(g * etas[id_index], axis=1)
+        weighted_residual = residual / variance
+        information = omega_inv + _sum(
+            g[:, :, None] * g[:, None, :] / variance[:, None, None], starts
+        )
+        b = _sum(g * weighted_residual[:, None], starts)
+        _, information_logdet = np.linalg.slogdet(information)
+        quadratic = np.add.reduceat(residual * weighted_residual, starts) - np.einsum(
+            'ie,ie->i', b, np.linalg.solve(information, b[:, :, None])[:, :, 0]
+        )
+        logdet = np.add.reduceat(np.log(variance), starts) + omega_logdet + information_logdet
+        return logdet + quadratic, etas
+
+    objective_function.ids = ids  # pyright: ignore [reportFunctionMemberAccess]
+    return objective_function
+
+
+def _sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # NOTE: Gives an empty sum for each individual if there are no etas
+    if values.size == 0:
+        return np.zeros((len(starts),) + values.shape[1:])
+    return np.add.reduceat(values, starts, axis=0)
+
+
+def _matrix_evaluator(matrix) -> Callable[[Mapping[str, float]], np.ndarray]:
+    size = matrix.rows
+    elements = []
+    for i in range(size):
+        for j in range(size):
+            element = matrix[i, j]
+            if element.is_symbol():
+                elements.append((i, j, element.name, None))
+            else:
+                elements.append((i, j, None, float(element)))
+
+    def evaluate(parameters: Mapping[str, float]) -> np.ndarray:
+        a = np.empty((size, size))
+        for i, j, name, value in elements:
+            a[i, j] = parameters[name] if name is not None else value
+        return a
+
+    return evaluate
+
+
+def estimate(model: Model) -> ModelfitResults:
+    """Estimate the parameters of a model without ODE system using FO or FOCE
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    ModelfitResults
+        Results of the estimation
+    """
+    start_time = time.time()
+    objective_function = create_objective_function(model)
+    parameters = model.parameters
+    inits = parameters.inits
+    estimated = parameters.nonfixed
+    names = estimated.names
+    evaluation = model.estimation_steps[0].evaluation
+
+    # NOTE: Parameters are scaled with their initial estimates
+    scale = np.array([abs(p.init) if p.init != 0 else 1.0 for p in estimated])
+    bounds = [
+        (
+            (_SMALLEST_VARIANCE if p.lower == 0 else p.lower) / s if np.isfinite(p.lower) else None,
+            p.upper / s if np.isfinite(p.upper) else None,
+        )
+        for p, s in zip(estimated, scale)
+    ]
+
+    def unscale(x):
+        return {**inits, **dict(zip(names, x * scale))}
+
+    def ofv(x):
+        try:
+            iofv, _ = objective_function(unscale(x))
+        except np.linalg.LinAlgError:
+            return np.inf
+        total = float(np.sum(iofv))
+        return total if np.isfinite(total) else np.inf
+
+    iterations: List[Tuple[float, np.ndarray]] = []
+
+    def record(x):
+        iterations.append((ofv(x), x * scale))
+
+    x0 = np.ones(len(names))
+    record(x0)
+    if evaluation or not names:
+        x = x0
+        successful = True
+        function_evaluations = 1
+    else:
+        optimum = optimize.minimize(
+            ofv,
+            x0,
+            method='L-BFGS-B',
+            bounds=bounds,
+            callback=record,
+            options={'eps': _GRADIENT_STEP},
+        )
+        x = optimum.x
+        successful = bool(optimum.success)
+        function_evaluations = int(optimum.nfev)
+
+    iofv, etas = objective_function(unscale(x))
+    ids = objective_function.ids  # pyright: ignore [reportFunctionMemberAccess]
+    index = pd.Index(ids, name=model.datainfo.id_column.name)
+    iteration_index = pd.MultiIndex.from_tuples(
+        [(1, i) for i in range(len(iterations))], names=['steps', 'iteration']
+    )
+    ofv_iterations = pd.Series([ofv for ofv, _ in iterations], index=iteration_index, name='OFV')
+    parameter_estimates_iterations = pd.DataFrame(
+        [estimates for _, estimates in iterations],
+        index=iteration_index.set_names(['step', 'iteration']),
+        columns=names,
+    )
+    return ModelfitResults(
+        name=model.name,
+        description=model.description,
+        ofv=float(np.sum(iofv)),
+        ofv_iterations=ofv_iterations,
+        parameter_estimates=pd.Series(x * scale, index=names, name='estimates'),
+        parameter_estimates_iterations=parameter_estimates_iterations,
+        minimization_successful=successful,
+        function_evaluations=function_evaluations,
+        estimation_runtime=time.time() - start_time,
+        individual_ofv=pd.Series(iofv, index=index, name='iOFV'),
+        individual_estimates=pd.DataFrame(
+            etas, index=index, columns=model.random_variables.etas.names
+        ),
+        evaluation=pd.Series([evaluation], index=[1], name='evaluation'),
+    )
+
+
+def execute_model(model_entry: ModelEntry, context) -> ModelEntry:
+    assert isinstance(model_entry, ModelEntry)
+    modelfit_results = estimate(model_entry.model)
+    model_entry = model_entry.attach_results(modelfit_results=modelfit_results)
+    with context.model_database.transaction(model_entry) as txn:
+        txn.store_model_entry()
+    return model_entry
@@ -10,9 +10,26 @@ r"""
    * - ``default_tool``
      - 'nonmem'
      - str
-     - Name of default estimation tool either 'nonmem' or 'nlmixr'
+     - Name of default estimation tool either 'nonmem', 'nlmixr', 'rxode' or 'native'
+   * - ``cache``
+     - False
+     - bool
+     - Serve results of identical models from a results cache shared by all tools and runs
+   * - ``cache_path``
+     - User cache directory
+     - str
+     - Path to the directory of the results cache
+   * - ``cache_max_size``
+     - 10737418240
+     - int
+     - Maximum size of the results cache in bytes. The least recently used results are evicted
+       first.
 """
 
+from pathlib import Path
+
+import appdirs
+
 import pharmpy.config as config
 
 from .tool import create_fit_workflow, create_workflow
@@ -21,6 +38,14 @@ from .tool import create_fit_workflow, create_workflow
 class ModelfitConfiguration(config.Configuration):
     module = 'pharmpy.tools.modelfit'  # TODO: change default
     default_tool = config.ConfigItem('nonmem', 'Name of default estimation tool', cls=str)
+    cache = config.ConfigItem(
+        False, 'Serve results of identical models from a results cache shared by all runs'
+    )
+    cache_path = config.ConfigItem(
+        str(Path(appdirs.user_cache_dir(config.appname)) / 'modelfit'),
+        'Path to the directory of the results cache',
+    )
+    cache_max_size = config.ConfigItem(10 * 1024**3, 'Maximum size of the results cache in bytes')
 
 
 conf = ModelfitConfiguration()
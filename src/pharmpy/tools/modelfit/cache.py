@@ -0,0 +1,110 @@
+"""On-disk cache of modelfit results shared by all tools and runs
+
+Entries are keyed on the ModelHash of the model, which does not depend on the name
+or description of the model. A model that has already been estimated by any tool in
+any run is therefore served from the cache even if it has been given a new name. The
+least recently used entries are evicted when the total size of the cache exceeds its
+maximum size.
+"""
+
+import os
+import pickle
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import pharmpy
+from pharmpy.internals.fs.lock import path_lock
+from pharmpy.model import Model
+from pharmpy.workflows.hashing import ModelHash
+from pharmpy.workflows.log import Log
+from pharmpy.workflows.results import ModelfitResults
+
+FILE_LOCK = '.lock'
+ENTRY_SUFFIX = '.pickle'
+
+
+class ModelfitResultsCache:
+    """Cache of modelfit results in a local directory
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the cache directory. Will be created if it does not exist.
+    max_size : int
+        Maximum total size of the cache in bytes
+    """
+
+    def __init__(self, path: Union[str, Path], max_size: int):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+
+    def _entry_path(self, model_or_hash: Union[Model, ModelHash]) -> Path:
+        return self.path / f'{ModelHash(model_or_hash)}{ENTRY_SUFFIX}'
+
+    def retrieve(
+        self, model_or_hash: Union[Model, ModelHash]
+    ) -> Optional[Tuple[ModelfitResults, Optional[Log]]]:
+        """Retrieve the modelfit results and log of a model
+
+        Returns None if the model is not in the cache.
+        """
+        path = self._entry_path(model_or_hash)
+        try:
+            with open(path, 'rb') as f:
+                modelfit_results, log = pickle.load(f)
+            # NOTE: The modification time is used as time of last use for eviction
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        return modelfit_results, log
+
+    def store(
+        self,
+        model_or_hash: Union[Model, ModelHash],
+        modelfit_results: ModelfitResults,
+        log: Optional[Log] = None,
+    ) -> None:
+        """Store the modelfit results and log of a model and evict old entries if needed"""
+        path = self._entry_path(model_or_hash)
+        # NOTE: Write to a temporary file first so that concurrent readers never
+        # see a partially written entry
+        tmp_path = self.path / f'.{path.name}.{uuid.uuid4()}'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((modelfit_results, log), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        lock_path = self.path / FILE_LOCK
+        lock_path.touch(exist_ok=True)
+        with path_lock(str(lock_path), shared=False):
+            entries = []
+            for path in self.path.glob(f'*{ENTRY_SUFFIX}'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total_size <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+
+
+def get_modelfit_results_cache(tool: str) -> Optional[ModelfitResultsCache]:
+    """Get the modelfit results cache for an estimation tool as configured
+
+    Returns None if the cache is disabled. Each version of Pharmpy and each estimation
+    tool has its own cache.
+    """
+    from pharmpy.tools.modelfit import conf
+
+    if not conf.cache:
+        return None
+    path = Path(conf.cache_path) / pharmpy.__version__ / tool
+    return ModelfitResultsCache(path, conf.cache_max_size)
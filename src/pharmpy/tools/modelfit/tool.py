@@ -1,9 +1,14 @@
+import math
+from dataclasses import replace
 from typing import Iterable, Literal, Optional, Tuple, Union
 
 from pharmpy.model import Model
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder
+from pharmpy.workflows.hashing import ModelHash
 
-SupportedExternalTools = Literal['nonmem', 'nlmixr', 'rxode']
+from .cache import get_modelfit_results_cache
+
+SupportedExternalTools = Literal['nonmem', 'nlmixr', 'rxode', 'native']
 
 
 def create_workflow(
@@ -21,6 +26,8 @@ def create_workflow(
         Number of models to fit. This is only used if the tool is going to be combined with other tools.
     tool : str
         Which tool to use for fitting. Currently, 'nonmem', 'nlmixr', 'rxode' can be used.
+        'native' estimates models without ODE system, for example linearized models, with
+        FO or FOCE in Pharmpy itself.
 
     Returns
     -------
@@ -97,18 +104,52 @@ def retrieve_from_database_or_execute_model_with_tool(tool):
                     db_model_entry.modelfit_results, db_model_entry.log
                 )
 
+        cache = get_modelfit_results_cache(_get_tool_name(tool))
+        if cache is not None:
+            model_hash = ModelHash(model)
+            cached = cache.retrieve(model_hash)
+            if cached is not None:
+                return _attach_cached_results(context, model_entry, *cached)
+
         # NOTE: Fallback to executing the model
         execute_model = get_execute_model(tool)
-        return execute_model(model_entry, context)
+        model_entry = execute_model(model_entry, context)
+
+        if cache is not None and _is_cacheable(model_entry.modelfit_results):
+            cache.store(model_hash, model_entry.modelfit_results, model_entry.log)
+
+        return model_entry
 
     return task
 
 
-def get_execute_model(tool: Optional[SupportedExternalTools]):
+def _attach_cached_results(context, model_entry, modelfit_results, log):
+    model = model_entry.model
+    modelfit_results = replace(modelfit_results, name=model.name, description=model.description)
+    model_entry = model_entry.attach_results(modelfit_results=modelfit_results, log=log)
+    with context.model_database.transaction(model_entry) as txn:
+        txn.store_model_entry()
+    return model_entry
+
+
+def _is_cacheable(modelfit_results):
+    # NOTE: Runs that did not produce an OFV could have failed for reasons that
+    # have nothing to do with the model (license, crash etc.)
+    return (
+        modelfit_results is not None
+        and modelfit_results.ofv is not None
+        and not math.isnan(modelfit_results.ofv)
+    )
+
+
+def _get_tool_name(tool: Optional[SupportedExternalTools]) -> str:
     from pharmpy.tools.modelfit import conf
 
-    if tool is None:
-        tool = conf.default_tool
+    return conf.default_tool if tool is None else tool
+
+
+def get_execute_model(tool: Optional[SupportedExternalTools]):
+    tool = _get_tool_name(tool)
 
     if tool == 'nonmem':
         from pharmpy.tools.external.nonmem.run import execute_model
@@ -116,6 +157,8 @@ def get_execute_model(tool: Optional[SupportedExternalTools]):
         from pharmpy.tools.external.nlmixr.run import execute_model
     elif tool == 'rxode':
         from pharmpy.tools.external.rxode.run import execute_model
+    elif tool == 'native':
+        from pharmpy.tools.linearize.estimation import execute_model
     else:
         raise ValueError(f"Unknown estimation tool {tool}")
 
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import ast
+import functools
 import importlib
 import inspect
+import operator
 import re
 import warnings
 from datetime import datetime
@@ -13,20 +16,20 @@ import pharmpy.tools.modelfit
 import pharmpy.workflows.results
 from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
+from pharmpy.deps.scipy import stats
 from pharmpy.internals.fs.path import normalize_user_given_path
 from pharmpy.model import Model
 from pharmpy.modeling import (
-    calculate_aic,
-    calculate_bic,
     check_high_correlations,
     check_parameters_near_bounds,
+    get_ids,
+    get_observations,
     get_omegas,
     get_sigmas,
     get_thetas,
     read_model,
 )
-from pharmpy.modeling.lrt import degrees_of_freedom as lrt_df
-from pharmpy.modeling.lrt import test as lrt_test
+from pharmpy.modeling.results import _bic_penalty
 from pharmpy.tools.psn_helpers import create_results as psn_create_results
 from pharmpy.workflows import Results, Workflow, execute_workflow, split_common_options
 from pharmpy.workflows.model_database import LocalModelDirectoryDatabase, ModelDatabase
@@ -110,13 +113,19 @@ def create_results(path: Union[str, Path], **kwargs) -> Results:
     return res
 
 
-def read_results(path: Union[str, Path]) -> Results:
+def read_results(path: Union[str, Path], attributes: Optional[List[str]] = None) -> Results:
     """Read results object from file
 
+    Results can be read from json files or from npz files (see Results.to_npz). If
+    path is a directory the results.npz or results.json file in it will be read.
+
     Parameters
     ----------
     path : str, Path
         Path to results file
+    attributes : list
+        Only read these attributes. All other attributes will be None. Only supported
+        for the npz format for which this avoids reading the data of other attributes.
 
     Return
     ------
@@ -134,7 +143,7 @@ def read_results(path: Union[str, Path]) -> Results:
 
     """
     path = normalize_user_given_path(path)
-    res = pharmpy.workflows.results.read_results(path)
+    res = pharmpy.workflows.results.read_results(path, attributes=attributes)
     return res
 
 
@@ -767,6 +776,8 @@ def rank_models(
     """
     if len(models) != len(models_res):
         raise ValueError('Different length of `models` and `models_res`')
+    if rank_type not in ('ofv', 'lrt', 'aic', 'bic'):
+        raise ValueError('Unknown rank_type: must be ofv, lrt, aic, or bic')
     if rank_type == 'lrt' and not parent_dict:
         parent_dict = {model.name: base_model.name for model in models}
     if parent_dict and not isinstance(list(parent_dict.keys())[0], str):
@@ -774,74 +785,47 @@ def rank_models(
 
     models_all = [base_model] + models
     res_all = [base_model_res] + models_res
+    names = [model.name for model in models_all]
 
-    rank_values, delta_values = {}, {}
-    models_to_rank = []
-
-    ref_value = _get_rankval(base_model, base_model_res, strictness, rank_type, bic_type, **kwargs)
-    model_dict = {model.name: (model, res) for model, res in zip(models_all, res_all)}
+    # NOTE: All models are ranked at once using one table with a row per model
+    table = _create_rank_table(models_all, res_all, strictness, rank_type, bic_type, **kwargs)
+    ofvs = table['ofv'].to_numpy()
+    rank_values = table['rank_value'].to_numpy()
+    ref_value = rank_values[0]
+    ranked = ~np.isnan(rank_values)
+    is_base = np.array([name == base_model.name for name in names])
 
-    # Filter on strictness
-    for model, res in zip(models_all, res_all):
-        # Exclude OFV etc. if model was not successful
-        rank_value = _get_rankval(model, res, strictness, rank_type, bic_type, **kwargs)
-        if np.isnan(rank_value):
-            continue
-        if model.name == base_model.name:
-            pass
-        elif rank_type == 'lrt':
-            parent_model, parent_res = model_dict[parent_dict[model.name]]
-            if cutoff is None:
-                co = 0.05 if lrt_df(parent_model, model) >= 0 else 0.01
-            elif isinstance(cutoff, tuple):
-                co = cutoff[0] if lrt_df(parent_model, model) >= 0 else cutoff[1]
-            else:
-                assert isinstance(cutoff, (float, int))
-                co = cutoff
-            parent_ofv = np.nan if (mfr := parent_res) is None else mfr.ofv
-            model_ofv = np.nan if (mfr := res) is None else mfr.ofv
-            if not lrt_test(parent_model, model, parent_ofv, model_ofv, co):
-                continue
-        elif cutoff is not None:
-            if ref_value - rank_value <= cutoff:
-                continue
-
-        # Add ranking value and model
-        rank_values[model.name] = rank_value
-        delta_values[model.name] = ref_value - rank_value
-        models_to_rank.append(model)
-
-    # Sort
-    def _get_delta(model):
-        if np.isnan(ref_value):
-            return -rank_values[model.name]
-        return delta_values[model.name]
-
-    models_sorted = sorted(models_to_rank, key=_get_delta, reverse=True)
-
-    # Create rank for models, if two have the same value they will have the same rank
-    ranking = {}
-    rank, count, prev = 0, 0, None
-    for model in models_sorted:
-        count += 1
-        value = _get_delta(model)
-        if value != prev:
-            rank += count
-            prev = value
-            count = 0
-        ranking[model.name] = rank
+    if rank_type == 'lrt':
+        assert parent_dict is not None
+        position = {name: i for i, name in enumerate(names)}
+        tested = np.flatnonzero(ranked & ~is_base)
+        parents = np.array([position[parent_dict[names[i]]] for i in tested], dtype=int)
+        n_parameters = table['n_parameters'].to_numpy()
+        dofs = n_parameters[tested] - n_parameters[parents]
+        if cutoff is None:
+            alpha = np.where(dofs >= 0, 0.05, 0.01)
+        elif isinstance(cutoff, tuple):
+            alpha = np.where(dofs >= 0, cutoff[0], cutoff[1])
+        else:
+            assert isinstance(cutoff, (float, int))
+            alpha = np.full(len(tested), cutoff)
+        ranked[tested] = ofvs[parents] - ofvs[tested] >= _lrt_cutoffs(dofs, alpha)
+    elif cutoff is not None:
+        ranked &= is_base | ~(ref_value - rank_values <= cutoff)
+
+    rank_values = np.where(ranked, rank_values, np.nan)
+    delta_values = ref_value - rank_values
+    sort_values = -rank_values if np.isnan(ref_value) else delta_values
+
+    # NOTE: Models with the same value have the same rank
+    ranks = [np.nan] * len(names)
+    positions = pd.Series(sort_values[ranked]).rank(method='min', ascending=False)
+    for i, rank in zip(np.flatnonzero(ranked), positions):
+        ranks[i] = int(rank)
 
     rows = {}
-    for model in models_all:
-        delta, rank_value, rank = np.nan, np.nan, np.nan
-        if model.name in ranking.keys():
-            rank = ranking[model.name]
-        if model.name in rank_values.keys():
-            rank_value = rank_values[model.name]
-        if model.name in delta_values.keys():
-            delta = delta_values[model.name]
-
-        rows[model.name] = (delta, rank_value, rank)
+    for name, row in zip(names, zip(delta_values, rank_values, ranks)):
+        rows[name] = row
 
     if rank_type == 'lrt':
         rank_type_name = 'ofv'
@@ -859,24 +843,87 @@ def rank_models(
         return df.sort_values(by=[f'd{rank_type_name}'], ascending=False)
 
 
-class ArrayEvaluator:
-    def __init__(self, x):
-        self.x = x
-
-    def __lt__(self, value):
-        return all(e < value for e in self.x)
-
-    def __eq__(self, value):
-        return all(e == value for e in self.x)
-
-    def __le__(self, value):
-        return all(e <= value for e in self.x)
+def _create_rank_table(models, results, strictness, rank_type, bic_type, **kwargs):
+    # NOTE: One row per model with the ofv, the values needed for the strictness
+    # criteria and the value to rank on. Models without results, without ofv or not
+    # fulfilling the strictness criteria get NaN as rank value.
+    ofvs = np.array([np.nan if res is None else res.ofv for res in results], dtype=float)
+    fulfilled = ~np.isnan(ofvs)
+    table = pd.DataFrame({'ofv': ofvs})
+    if strictness is not None:
+        predicate, names = _compile_strictness(strictness)
+        strictness_table = _create_strictness_table(models, results, names, fulfilled)
+        table = pd.concat([table, strictness_table], axis=1)
+        fulfilled &= predicate(table)
+
+    rank_values = np.full(len(models), np.nan)
+    if rank_type in ('ofv', 'lrt'):
+        rank_values[fulfilled] = ofvs[fulfilled]
+    elif rank_type == 'aic':
+        n_estimated = [len(models[i].parameters.nonfixed) for i in np.flatnonzero(fulfilled)]
+        rank_values[fulfilled] = ofvs[fulfilled] + 2 * np.array(n_estimated, dtype=int)
+    else:
+        penalties = _bic_penalties(
+            [models[i] for i in np.flatnonzero(fulfilled)], bic_type, **kwargs
+        )
+        rank_values[fulfilled] = ofvs[fulfilled] + penalties
+    table['rank_value'] = rank_values
 
-    def __ge__(self, value):
-        return all(e >= value for e in self.x)
+    if rank_type == 'lrt':
+        table['n_parameters'] = [len(model.parameters) for model in models]
+    return table
+
+
+def _bic_penalties(models, bic_type, **kwargs):
+    # NOTE: The number of observations and individuals are calculated once per dataset
+    counts = {}
+    penalties = np.empty(len(models))
+    for i, model in enumerate(models):
+        key = (id(model.dataset), model.datainfo)
+        if key not in counts:
+            nobs = len(get_observations(model)) if bic_type in ('fixed', 'mixed') else None
+            nsubs = len(get_ids(model)) if bic_type in ('random', 'iiv', 'mixed') else None
+            # NOTE: The dataset is kept to make sure that its id is not reused
+            counts[key] = (model.dataset, nobs, nsubs)
+        _, nobs, nsubs = counts[key]
+        penalties[i] = _bic_penalty(model, bic_type, nobs=nobs, nsubs=nsubs, **kwargs)
+    return penalties
+
+
+def _lrt_cutoffs(dofs, alpha):
+    # NOTE: Same as pharmpy.modeling.lrt.cutoff for arrays of degrees of freedom
+    cutoffs = np.zeros(len(dofs))
+    positive, negative = dofs > 0, dofs < 0
+    cutoffs[positive] = stats.chi2.isf(q=alpha[positive], df=dofs[positive])
+    cutoffs[negative] = -stats.chi2.isf(q=alpha[negative], df=-dofs[negative])
+    return cutoffs
+
+
+_STRICTNESS_ARGUMENTS = (
+    'minimization_successful',
+    'rounding_errors',
+    'sigdigs',
+    'maxevals_exceeded',
+    'rse',
+    'rse_theta',
+    'rse_omega',
+    'rse_sigma',
+    'condition_number',
+    'final_zero_gradient',
+    'final_zero_gradient_theta',
+    'final_zero_gradient_omega',
+    'final_zero_gradient_sigma',
+    'estimate_near_boundary',
+    'estimate_near_boundary_theta',
+    'estimate_near_boundary_omega',
+    'estimate_near_boundary_sigma',
+)
 
-    def __gt__(self, value):
-        return all(e > value for e in self.x)
+# NOTE: Arguments that can have several values for a model. A comparison is
+# fulfilled if it is fulfilled for all values.
+_STRICTNESS_ARRAY_ARGUMENTS = frozenset(
+    ('sigdigs', 'condition_number', 'rse', 'rse_theta', 'rse_omega', 'rse_sigma')
+)
 
 
 def is_strictness_fulfilled(
@@ -913,118 +960,205 @@ def is_strictness_fulfilled(
     if res is None or np.isnan(res.ofv):
         return False
     if statement is not None:
-        statement = statement.lower()
-        allowed_args = [
-            'minimization_successful',
-            'rounding_errors',
-            'sigdigs',
-            'maxevals_exceeded',
-            'rse',
-            'rse_theta',
-            'rse_omega',
-            'rse_sigma',
-            'condition_number',
-            'final_zero_gradient',
-            'final_zero_gradient_theta',
-            'final_zero_gradient_omega',
-            'final_zero_gradient_sigma',
-            'estimate_near_boundary',
-            'estimate_near_boundary_theta',
-            'estimate_near_boundary_omega',
-            'estimate_near_boundary_sigma',
-        ]
-        unwanted_args = ['and', 'or', 'not']
-        find_all_words = re.findall(r'[^\d\W]+', statement)
-        args_in_statement = [w for w in find_all_words if w not in unwanted_args]
-        find_all_non_allowed_operators = re.findall(r"[^\w\s\.\<\>\=\!\(\)]", statement)
-        if len(find_all_non_allowed_operators) > 0:
-            raise ValueError(
-                f"Unallowed operators found: {', '.join(find_all_non_allowed_operators)}"
-            )
-
-        # Check that only allowed arguments are in the statement
-        if not all(map(lambda x: x in allowed_args, args_in_statement)):
-            raise ValueError(
-                f'Some expressions were not correct. Valid arguments are: {allowed_args}'
-            )
-        else:
-            minimization_successful = res.minimization_successful  # noqa
-            rounding_errors = res.termination_cause == "rounding_errors"  # noqa
-            maxevals_exceeded = res.termination_cause == "maxevals_exceeded"  # noqa
-            sigdigs = ArrayEvaluator([res.significant_digits])  # noqa
-            final_zero_gradient = 'final_zero_gradient' in res.warnings  # noqa
-            estimate_near_boundary = 'estimate_near_boundary' in res.warnings  # noqa
-            if 'condition_number' in args_in_statement:
-                if res.covariance_matrix is not None:
-                    condition_number = ArrayEvaluator(  # noqa
-                        [np.linalg.cond(res.covariance_matrix)]
-                    )
-                else:
-                    raise ValueError("Could not calculate condition_number.")
-            if "rse" in args_in_statement:
-                if res.relative_standard_errors is not None:
-                    rse = ArrayEvaluator(res.relative_standard_errors)  # noqa
-                else:
-                    raise ValueError("Could not calculate relative standard error.")
-
-            if (
-                'rse_theta' in args_in_statement
-                or 'rse_omega' in args_in_statement
-                or 'rse_sigma' in args_in_statement
-            ):
-                rse = res.relative_standard_errors
-                rse_theta = ArrayEvaluator(rse[rse.index.isin(get_thetas(model).names)])  # noqa
-                rse_omega = ArrayEvaluator(rse[rse.index.isin(get_omegas(model).names)])  # noqa
-                rse_sigma = ArrayEvaluator(rse[rse.index.isin(get_sigmas(model).names)])  # noqa
-            if (
-                'final_zero_gradient_theta' in args_in_statement
-                or 'final_zero_gradient_omega' in args_in_statement
-                or 'final_zero_gradient_sigma' in args_in_statement
-            ):
-                grd = res.gradients
-                final_zero_gradient_theta = (  # noqa
-                    grd[grd.index.isin(get_thetas(model).names)] == 0
-                ).any() or grd[grd.index.isin(get_thetas(model).names)].isnull().any()
-                final_zero_gradient_omega = (  # noqa
-                    grd[grd.index.isin(get_omegas(model).names)] == 0
-                ).any() or grd[grd.index.isin(get_thetas(model).names)].isnull().any()
-                final_zero_gradient_sigma = (  # noqa
-                    grd[grd.index.isin(get_sigmas(model).names)] == 0
-                ).any() or grd[grd.index.isin(get_thetas(model).names)].isnull().any()
-            if (
-                'estimate_near_boundary' in args_in_statement
-                or 'estimate_near_boundary_theta' in args_in_statement
-                or 'estimate_near_boundary_omega' in args_in_statement
-                or 'estimate_near_boundary_sigma' in args_in_statement
-            ):
-                ests = res.parameter_estimates
-                estimate_near_boundary = check_parameters_near_bounds(model, ests).any()  # noqa
-                estimate_near_boundary_theta = check_parameters_near_bounds(  # noqa
-                    model, ests[ests.index.isin(get_thetas(model).names)]
-                ).any()
-                estimate_near_boundary_omega = check_parameters_near_bounds(  # noqa
-                    model, ests[ests.index.isin(get_omegas(model).names)]
-                ).any()
-                estimate_near_boundary_sigma = check_parameters_near_bounds(  # noqa
-                    model, ests[ests.index.isin(get_sigmas(model).names)]
-                ).any()
-
-        return eval(statement)
+        predicate, names = _compile_strictness(statement)
+        table = _create_strictness_table([model], [res], names, np.array([True]))
+        return bool(predicate(table)[0])
     else:
         return True
 
 
-def _get_rankval(model, res, strictness, rank_type, bic_type, **kwargs):
-    if not is_strictness_fulfilled(res, model, strictness):
-        return np.nan
-    if rank_type in ['ofv', 'lrt']:
-        return res.ofv
-    elif rank_type == 'aic':
-        return calculate_aic(model, res.ofv)
-    elif rank_type == 'bic':
-        return calculate_bic(model, res.ofv, bic_type, **kwargs)
+@functools.lru_cache(maxsize=256)
+def _compile_strictness(statement: str):
+    # NOTE: The statement is compiled into a function evaluating it for all rows of
+    # a strictness table at once. The names of the arguments in the statement are
+    # also returned.
+    statement = statement.lower()
+    unwanted_args = ['and', 'or', 'not']
+    find_all_words = re.findall(r'[^\d\W]+', statement)
+    args_in_statement = [w for w in find_all_words if w not in unwanted_args]
+    find_all_non_allowed_operators = re.findall(r"[^\w\s\.\<\>\=\!\(\)]", statement)
+    if len(find_all_non_allowed_operators) > 0:
+        raise ValueError(f"Unallowed operators found: {', '.join(find_all_non_allowed_operators)}")
+
+    # Check that only allowed arguments are in the statement
+    if not all(map(lambda x: x in _STRICTNESS_ARGUMENTS, args_in_statement)):
+        raise ValueError(
+            f'Some expressions were not correct. Valid arguments are: {list(_STRICTNESS_ARGUMENTS)}'
+        )
+
+    evaluate = _compile_strictness_node(ast.parse(statement, mode='eval').body)
+
+    def predicate(table):
+        return np.broadcast_to(_truth(evaluate(table), len(table)), (len(table),))
+
+    return predicate, tuple(dict.fromkeys(args_in_statement))
+
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+_REFLECTED_COMPARISONS = {
+    ast.Lt: ast.Gt,
+    ast.LtE: ast.GtE,
+    ast.Gt: ast.Lt,
+    ast.GtE: ast.LtE,
+    ast.Eq: ast.Eq,
+    ast.NotEq: ast.NotEq,
+}
+
+
+class _ArrayArgument:
+    def __init__(self, name):
+        self.name = name
+
+
+def _compile_strictness_node(node):
+    # NOTE: Each node is compiled into a function of the table. A bare array
+    # argument is compiled into an _ArrayArgument that can only be compared.
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_strictness_node(value) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def evaluate_bool_op(table):
+            values = [_truth(operand(table), len(table)) for operand in operands]
+            return functools.reduce(combine, values)
+
+        return evaluate_bool_op
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_strictness_node(node.operand)
+        return lambda table: np.logical_not(_truth(operand(table), len(table)))
+    elif isinstance(node, ast.Compare):
+        operands = [_compile_strictness_node(node.left)] + [
+            _compile_strictness_node(comparator) for comparator in node.comparators
+        ]
+        comparisons = [
+            _compile_comparison(left, type(op), right)
+            for left, op, right in zip(operands[:-1], node.ops, operands[1:])
+        ]
+        return lambda table: functools.reduce(
+            np.logical_and, (comparison(table) for comparison in comparisons)
+        )
+    elif isinstance(node, ast.Name):
+        name = node.id
+        if name in _STRICTNESS_ARRAY_ARGUMENTS:
+            array = _ArrayArgument(name)
+            return lambda table: array
+        return lambda table: table[name].to_numpy()
+    elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        value = node.value
+        return lambda table: value
+    raise ValueError(f'Unsupported expression in strictness statement: {ast.unparse(node)}')
+
+
+def _compile_comparison(left, op, right):
+    def evaluate_comparison(table):
+        a, b, comparison = left(table), right(table), op
+        if isinstance(a, _ArrayArgument) and isinstance(b, _ArrayArgument):
+            raise ValueError(f'Cannot compare {a.name} with {b.name} in strictness statement')
+        if isinstance(b, _ArrayArgument):
+            a, b, comparison = b, a, _REFLECTED_COMPARISONS[op]
+        if not isinstance(a, _ArrayArgument):
+            return _COMPARISONS[comparison](a, b)
+        # NOTE: A comparison of all values is decided by the smallest or the largest
+        # value. NaN values make all comparisons false. An argument without values
+        # fulfills all comparisons.
+        lowest = table[f'{a.name}_min'].to_numpy()
+        highest = table[f'{a.name}_max'].to_numpy()
+        if comparison in (ast.Lt, ast.LtE):
+            return _COMPARISONS[comparison](highest, b)
+        elif comparison in (ast.Gt, ast.GtE):
+            return _COMPARISONS[comparison](lowest, b)
+        equal = (lowest > highest) | ((lowest == b) & (highest == b))
+        return equal if comparison is ast.Eq else ~equal
+
+    return evaluate_comparison
+
+
+def _truth(value, n):
+    if isinstance(value, _ArrayArgument):
+        return np.ones(n, dtype=bool)
+    if isinstance(value, np.ndarray):
+        return np.array([bool(x) for x in value]) if value.dtype == object else value != 0
+    return np.full(n, bool(value))
+
+
+def _create_strictness_table(models, results, names, fulfilled):
+    # NOTE: Values are only calculated for models with an ofv. Arguments that can have
+    # several values are stored as their smallest and largest value.
+    columns = []
+    for name in names:
+        if name in _STRICTNESS_ARRAY_ARGUMENTS:
+            columns.extend((f'{name}_min', f'{name}_max'))
+        else:
+            columns.append(name)
+    rows = []
+    for model, res, include in zip(models, results, fulfilled):
+        row = {}
+        if include:
+            for name in names:
+                value = _get_strictness_value(model, res, name)
+                if name in _STRICTNESS_ARRAY_ARGUMENTS:
+                    values = np.asarray(value, dtype=float)
+                    empty = len(values) == 0
+                    row[f'{name}_min'] = np.inf if empty else values.min()
+                    row[f'{name}_max'] = -np.inf if empty else values.max()
+                else:
+                    row[name] = value
+        rows.append(row)
+    return pd.DataFrame.from_records(rows, columns=columns, index=range(len(rows)))
+
+
+def _get_strictness_value(model, res, name):
+    if name == 'minimization_successful':
+        return res.minimization_successful
+    elif name == 'rounding_errors':
+        return res.termination_cause == "rounding_errors"
+    elif name == 'maxevals_exceeded':
+        return res.termination_cause == "maxevals_exceeded"
+    elif name == 'sigdigs':
+        return [res.significant_digits]
+    elif name == 'final_zero_gradient':
+        return 'final_zero_gradient' in res.warnings
+    elif name == 'condition_number':
+        if res.covariance_matrix is None:
+            raise ValueError("Could not calculate condition_number.")
+        return [np.linalg.cond(res.covariance_matrix)]
+    elif name.startswith('rse'):
+        rse = res.relative_standard_errors
+        if name == 'rse':
+            if rse is None:
+                raise ValueError("Could not calculate relative standard error.")
+            return rse
+        return rse[rse.index.isin(_get_parameter_names(model, name))]
+    elif name.startswith('final_zero_gradient_'):
+        grd = res.gradients
+        # NOTE: Missing gradients are always checked among the thetas
+        thetas = grd.index.isin(get_thetas(model).names)
+        selected = grd[grd.index.isin(_get_parameter_names(model, name))]
+        return (selected == 0).any() or grd[thetas].isnull().any()
     else:
-        raise ValueError('Unknown rank_type: must be ofv, lrt, aic, or bic')
+        assert name.startswith('estimate_near_boundary')
+        ests = res.parameter_estimates
+        if name != 'estimate_near_boundary':
+            ests = ests[ests.index.isin(_get_parameter_names(model, name))]
+        return check_parameters_near_bounds(model, ests).any()
+
+
+def _get_parameter_names(model, name):
+    kind = name.rsplit('_', 1)[1]
+    if kind == 'theta':
+        return get_thetas(model).names
+    elif kind == 'omega':
+        return get_omegas(model).names
+    else:
+        assert kind == 'sigma'
+        return get_sigmas(model).names
 
 
 def summarize_modelfit_results(
@@ -19,6 +19,10 @@
      - ``pharmpy.workflows.LocalDirectoryToolDatabase``
      - str
      - Name of default tool database class
+   * - ``results_format``
+     - ``json``
+     - str
+     - Format of results files stored by tools, either json or npz
 
 """
 
@@ -55,6 +59,9 @@ class WorkflowConfiguration(config.Configuration):
     default_tool_database = config.ConfigItem(
         'pharmpy.workflows.LocalDirectoryToolDatabase', 'Name of default tool database class'
     )
+    results_format = config.ConfigItem(
+        'json', 'Format of results files stored by tools, either json or npz'
+    )
 
 
 conf = WorkflowConfiguration()
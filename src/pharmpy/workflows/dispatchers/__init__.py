@@ -5,9 +5,43 @@ class DispatcherConfiguration(config.Configuration):
     module = 'pharmpy.workflows.dispatchers'
     dask_dispatcher = config.ConfigItem(
         None,
-        'Which type of dask scheduler to use (supports threaded and distributed).',
+        'Which type of dask scheduler to use (supports threaded, distributed and processes).',
         str,
     )
+    dask_n_workers = config.ConfigItem(
+        0,
+        'Number of worker processes to use for the processes scheduler (0 means the number '
+        'of CPUs).',
+    )
+    dask_threads_per_worker = config.ConfigItem(
+        1,
+        'Number of threads, i.e. the CPU budget for tasks, in each worker process of the '
+        'processes scheduler.',
+    )
+    dask_task_cpus = config.ConfigItem(
+        1,
+        'Number of threads of a worker process of the processes scheduler that each task '
+        'reserves. Must not be larger than dask_threads_per_worker.',
+    )
+    dask_memory_limit = config.ConfigItem(
+        'auto',
+        'Memory limit per worker process of the processes scheduler (e.g. 4GB or auto).',
+    )
+    dask_scheduler_address = config.ConfigItem(
+        '',
+        'Address of an existing dask scheduler to attach to instead of starting a local cluster '
+        '(e.g. tcp://127.0.0.1:8786).',
+    )
+    dask_shared_cluster = config.ConfigItem(
+        False,
+        'Lazily start one local dask cluster that is reused by all tool runs in the same '
+        'process, including nested tool runs.',
+    )
+    dask_dashboard_address = config.ConfigItem(
+        ':31058',
+        'Address of the dask dashboard of local clusters. Use :0 for a random port or an empty '
+        'string to disable the dashboard.',
+    )
 
 
 conf = DispatcherConfiguration()
@@ -1,5 +1,9 @@
+import atexit
 import os
+import threading
+import uuid
 import warnings
+from contextlib import contextmanager
 from typing import TypeVar
 
 import pharmpy.workflows.dispatchers
@@ -10,6 +14,9 @@ from ..workflow import Workflow
 
 T = TypeVar('T')
 
+_shared = {}
+_shared_lock = threading.Lock()
+
 
 def run(workflow: Workflow[T]) -> T:
     # NOTE: We change to a new temporary directory so that all files generated
@@ -36,50 +43,174 @@ def run(workflow: Workflow[T]) -> T:
 
             res = get(dsk, 'results')
         else:
+            from ..optimize import optimize_task_graph_for_dask_distributed
+
+            # NOTE: The scheduler can be shared with other (possibly nested)
+            # runs so the key of the output must be unique.
+            results_key = f'results-{uuid.uuid4()}'
+            dsk[results_key] = dsk.pop('results')
+
+            resources = _task_resources(dask_dispatcher)
+
+            with _dask_warnings(), _client(dask_dispatcher) as client:
+                dsk_optimized = optimize_task_graph_for_dask_distributed(client, dsk)
+                res = client.get(dsk_optimized, results_key, resources=resources)
+    return res  # pyright: ignore [reportGeneralTypeIssues]
+
+
+@contextmanager
+def _client(dask_dispatcher: str):
+    from dask.distributed import Client, worker_client
+
+    conf = pharmpy.workflows.dispatchers.conf
+
+    if conf.dask_scheduler_address or conf.dask_shared_cluster:
+        if _in_worker():
+            # NOTE: This is a nested tool run. The worker thread running the
+            # calling task secedes from the thread pool while waiting so that
+            # the tasks of the nested workflow cannot starve.
+            with worker_client() as client:
+                yield client
+        elif conf.dask_scheduler_address:
+            with Client(conf.dask_scheduler_address) as client:
+                yield client
+        else:
+            yield _shared_client(dask_dispatcher)
+    else:
+        with _dask_temporary_directory():
+            with _create_cluster(dask_dispatcher) as cluster, Client(cluster) as client:
+                print(client)
+                yield client
+
+
+def _task_resources(dask_dispatcher: str):
+    # NOTE: Each worker process of the processes scheduler has one CPU resource
+    # per thread. A task reserving more than one CPU will leave the other
+    # threads of its worker idle, so the worker memory is shared by fewer tasks.
+    # Tasks of nested runs and tasks on external schedulers, which might not
+    # have the resource, do not reserve any CPUs.
+    conf = pharmpy.workflows.dispatchers.conf
+    if dask_dispatcher != 'processes' or conf.dask_scheduler_address or _in_worker():
+        return None
+    if conf.dask_task_cpus > conf.dask_threads_per_worker:
+        raise ValueError(
+            f'dask_task_cpus ({conf.dask_task_cpus}) cannot be larger than '
+            f'dask_threads_per_worker ({conf.dask_threads_per_worker})'
+        )
+    return {'CPU': conf.dask_task_cpus}
+
+
+def _in_worker() -> bool:
+    from dask.distributed import get_worker
+
+    try:
+        get_worker()
+    except ValueError:
+        return False
+    return True
+
+
+def _shared_client(dask_dispatcher: str):
+    # NOTE: One shared cluster per type of dispatcher is started lazily on
+    # first use and is reused by all subsequent tool runs in the same process.
+    # The clusters are closed at exit.
+    with _shared_lock:
+        if dask_dispatcher not in _shared:
             import dask
-            from dask.distributed import Client, LocalCluster
+            from dask.distributed import Client
 
-            from ..optimize import optimize_task_graph_for_dask_distributed
+            if not _shared:
+                atexit.register(_close_shared_clusters)
 
-            # NOTE: We set the dask temporary directory to avoid permission
-            # errors in the dask-worker-space directory in case for
-            # instance different users run dask on the same filesystem (e.g., on
-            # a cluster node).
-            # An attempt at solving this kind of problem was introduced two
-            # months ago, by suffixing the directory name with the user id on
-            # POSIX. It should fix the problem, except maybe on Windows. Since
-            # we experienced issues before that change, maybe this is it, and we
-            # could instead set temporary_directory to tempfile.gettempdir().
-            # Note that if this is done, then our custom patch of
-            # TemporaryDirectory can be removed. See:
-            #   - https://github.com/dask/distributed/blob/cff33d500f24b67efbd94ce39b15cb36473cd9f6/distributed/diskutils.py#L132-L153 # noqa: E501
-            #   - https://github.com/dask/distributed/issues/6748
-            #   - https://github.com/dask/distributed/pull/7054
-            # NOTE: We also ignore cleanup errors that can occur on Windows. We
-            # must do so because dask also ignore those, see for instance:
-            #   - https://github.com/dask/distributed/issues/6052#issue-1189891052
-            #   - https://github.com/dask/distributed/issues/966#issuecomment-353265964
-            #   - https://github.com/dask/distributed/commit/9ffac1b9b
-            #   - https://github.com/dask/distributed/blob/5dc591bbdd4427fe49fe90338a34fc85ee35f2c9/distributed/diskutils.py#L23-L29  # noqa: E501
-            #   - https://github.com/dask/distributed/commit/7ed517c47de90a68abd537d29df9740a2c20b638
-            is_windows = os.name == 'nt'
-            with TemporaryDirectory(
-                ignore_cleanup_errors=is_windows
-            ) as dasktempdir, dask.config.set(  # pyright: ignore [reportPrivateImportUsage]
-                {'temporary_directory': dasktempdir}
+            tempdir = TemporaryDirectory(ignore_cleanup_errors=os.name == 'nt')
+            # NOTE: Worker processes keep the working directory they were
+            # started in so we start the cluster in a directory that outlives
+            # all runs. See _dask_temporary_directory for why the dask
+            # temporary directory is set.
+            with chdir(tempdir.name), dask.config.set(  # pyright: ignore [reportPrivateImportUsage]
+                {'temporary_directory': tempdir.name}
             ):
-                with warnings.catch_warnings():
-                    # NOTE: Catch deprecation warning from python 3.10 via tornado.
-                    # Should be fixed with tornado 6.2
-                    warnings.filterwarnings("ignore", message="There is no current event loop")
-                    # Because of https://github.com/dask/distributed/issues/8559 when having no network
-                    warnings.filterwarnings(
-                        "ignore", "Couldn't detect a suitable IP address for reaching"
-                    )
-                    with LocalCluster(
-                        processes=False, dashboard_address=':31058'
-                    ) as cluster, Client(cluster) as client:
-                        print(client)
-                        dsk_optimized = optimize_task_graph_for_dask_distributed(client, dsk)
-                        res = client.get(dsk_optimized, 'results')
-    return res  # pyright: ignore [reportGeneralTypeIssues]
+                cluster = _create_cluster(dask_dispatcher)
+                client = Client(cluster, set_as_default=False)
+            print(client)
+            _shared[dask_dispatcher] = (tempdir, cluster, client)
+
+        return _shared[dask_dispatcher][2]
+
+
+def _close_shared_clusters():
+    with _shared_lock:
+        while _shared:
+            _, (tempdir, cluster, client) = _shared.popitem()
+            client.close()
+            cluster.close()
+            tempdir.cleanup()
+
+
+@contextmanager
+def _dask_temporary_directory():
+    import dask
+
+    # NOTE: We set the dask temporary directory to avoid permission
+    # errors in the dask-worker-space directory in case for
+    # instance different users run dask on the same filesystem (e.g., on
+    # a cluster node).
+    # An attempt at solving this kind of problem was introduced two
+    # months ago, by suffixing the directory name with the user id on
+    # POSIX. It should fix the problem, except maybe on Windows. Since
+    # we experienced issues before that change, maybe this is it, and we
+    # could instead set temporary_directory to tempfile.gettempdir().
+    # Note that if this is done, then our custom patch of
+    # TemporaryDirectory can be removed. See:
+    #   - https://github.com/dask/distributed/blob/cff33d500f24b67efbd94ce39b15cb36473cd9f6/distributed/diskutils.py#L132-L153 # noqa: E501
+    #   - https://github.com/dask/distributed/issues/6748
+    #   - https://github.com/dask/distributed/pull/7054
+    # NOTE: We also ignore cleanup errors that can occur on Windows. We
+    # must do so because dask also ignore those, see for instance:
+    #   - https://github.com/dask/distributed/issues/6052#issue-1189891052
+    #   - https://github.com/dask/distributed/issues/966#issuecomment-353265964
+    #   - https://github.com/dask/distributed/commit/9ffac1b9b
+    #   - https://github.com/dask/distributed/blob/5dc591bbdd4427fe49fe90338a34fc85ee35f2c9/distributed/diskutils.py#L23-L29  # noqa: E501
+    #   - https://github.com/dask/distributed/commit/7ed517c47de90a68abd537d29df9740a2c20b638
+    is_windows = os.name == 'nt'
+    with TemporaryDirectory(
+        ignore_cleanup_errors=is_windows
+    ) as dasktempdir, dask.config.set(  # pyright: ignore [reportPrivateImportUsage]
+        {'temporary_directory': dasktempdir}
+    ):
+        yield
+
+
+@contextmanager
+def _dask_warnings():
+    with warnings.catch_warnings():
+        # NOTE: Catch deprecation warning from python 3.10 via tornado.
+        # Should be fixed with tornado 6.2
+        warnings.filterwarnings("ignore", message="There is no current event loop")
+        # Because of https://github.com/dask/distributed/issues/8559 when having no network
+        warnings.filterwarnings("ignore", "Couldn't detect a suitable IP address for reaching")
+        yield
+
+
+def _create_cluster(dask_dispatcher: str):
+    from dask.distributed import LocalCluster
+
+    conf = pharmpy.workflows.dispatchers.conf
+    dashboard_address = conf.dask_dashboard_address if conf.dask_dashboard_address else None
+
+    if dask_dispatcher == 'processes':
+        # NOTE: Python code running in separate worker processes is not
+        # serialized by the GIL. Each worker gets its own CPU and memory
+        # budget so that CPU-bound tasks (model transformations, parsing of
+        # results etc.) can use all available cores.
+        n_workers = conf.dask_n_workers if conf.dask_n_workers else os.cpu_count() or 1
+        return LocalCluster(
+            processes=True,
+            n_workers=n_workers,
+            threads_per_worker=conf.dask_threads_per_worker,
+            memory_limit=conf.dask_memory_limit,
+            resources={'CPU': conf.dask_threads_per_worker},
+            dashboard_address=dashboard_address,
+        )
+    else:
+        return LocalCluster(processes=False, dashboard_address=dashboard_address)
@@ -1,10 +1,17 @@
 import base64
 import hashlib
 import json
+import weakref
 
 from pharmpy.deps import numpy as np
+from pharmpy.deps import pandas as pd
 from pharmpy.modeling import load_dataset
 
+# Cache of hashes of model datasets keyed on the identity of the DataFrame. Datasets of
+# models are never modified in place so the hash of the same object will not change.
+# Arbitrary DataFrames can be modified in place so they must not use this cache.
+_model_dataset_hash_cache = {}
+
 
 def _encode(obj):
     # Encode a model subobject into a bytes string
@@ -14,17 +21,28 @@ def _encode(obj):
     return enc
 
 
+def _update_hash_with_array(values, h):
+    if values.dtype.kind in 'biufcmM':
+        # The buffer of a numeric column can be hashed directly without copying
+        if not values.flags['C_CONTIGUOUS']:
+            values = np.ascontiguousarray(values)
+        h.update(values.view(np.uint8))
+    else:
+        hashes = pd.util.hash_array(values, encoding='utf8', hash_key='0123456789123456')
+        h.update(hashes)
+
+
 def _update_hash_with_dataset(df, h):
-    values = df.values
-    if not values.flags['C_CONTIGUOUS']:
-        values = np.ascontiguousarray(values)
-    columns = repr(df.columns).encode('utf-8')
-    index = repr(df.index).encode('utf-8')
+    columns = repr(list(df.columns)).encode('utf-8')
     dtypes = repr(list(df.dtypes)).encode('utf-8')
-    h.update(values)
     h.update(columns)
-    h.update(index)
     h.update(dtypes)
+    if isinstance(df.index, pd.RangeIndex):
+        h.update(repr(df.index).encode('utf-8'))
+    else:
+        _update_hash_with_array(df.index.to_numpy(), h)
+    for i in range(len(df.columns)):
+        _update_hash_with_array(df.iloc[:, i].to_numpy(), h)
 
 
 def _hash_to_string(h):
@@ -33,6 +51,28 @@ def _hash_to_string(h):
     return b64.replace('=', '')  # Remove padding characters
 
 
+def _dataset_hash(df):
+    h = hashlib.sha256()
+    _update_hash_with_dataset(df, h)
+    return _hash_to_string(h)
+
+
+def _model_dataset_hash(df):
+    key = id(df)
+    entry = _model_dataset_hash_cache.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    hash_string = _dataset_hash(df)
+
+    def _remove(ref):
+        if _model_dataset_hash_cache.get(key, (None,))[0] is ref:
+            del _model_dataset_hash_cache[key]
+
+    _model_dataset_hash_cache[key] = (weakref.ref(df, _remove), hash_string)
+    return hash_string
+
+
 class Hash:
     def __str__(self):
         return self._hash
@@ -40,9 +80,7 @@ class Hash:
 
 class DatasetHash(Hash):
     def __init__(self, df):
-        h = hashlib.sha256()
-        _update_hash_with_dataset(df, h)
-        self._hash = _hash_to_string(h)
+        self._hash = _dataset_hash(df)
 
 
 class ModelHash(Hash):
@@ -60,8 +98,8 @@ class ModelHash(Hash):
                 model = model.replace(datainfo=di)
             model = model.replace(name='', description='')
             model_bytes = _encode(model)
+            self.dataset_hash = _model_dataset_hash(model.dataset)
             h = hashlib.sha256()
-            _update_hash_with_dataset(model.dataset, h)
-            self.dataset_hash = _hash_to_string(h)
+            h.update(self.dataset_hash.encode('utf-8'))
             h.update(model_bytes)
             self._hash = _hash_to_string(h)
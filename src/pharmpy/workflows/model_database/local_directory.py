@@ -10,7 +10,7 @@ from pharmpy.internals.fs.lock import path_lock
 from pharmpy.internals.fs.path import path_absolute
 from pharmpy.model import DataInfo, Model
 from pharmpy.workflows.model_entry import ModelEntry
-from pharmpy.workflows.results import ModelfitResults, read_results
+from pharmpy.workflows.results import LazyModelfitResults, ModelfitResults, read_results
 
 from .baseclass import (
     ModelSnapshot,
@@ -306,6 +306,11 @@ class LocalModelDirectoryDatabaseTransaction(ModelTransaction):
 
         modelfit_results = self.model_entry.modelfit_results
 
+        if isinstance(modelfit_results, LazyModelfitResults):
+            # NOTE: Attributes that have not been loaded are parsed from the stored
+            # result files when the results are retrieved
+            modelfit_results = modelfit_results.loaded()
+
         if modelfit_results is not None:
             modelfit_results.to_json(destination / FILE_MODELFIT_RESULTS)
 
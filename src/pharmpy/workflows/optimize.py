@@ -1,46 +1,88 @@
 import dask
+from dask.sizeof import sizeof
+
+# NOTE: Values estimated to be smaller than this (in bytes) are embedded in
+# the graph instead of being scattered. Sending them with the graph is cheaper
+# than the extra round-trip and bookkeeping of a future.
+SCATTER_THRESHOLD = 10000
 
 
 def optimize_task_graph_for_dask_distributed(client, graph):
     from dask.distributed import Future
 
-    optimized = {key: _scatter_computation(Future, client, value) for key, value in graph.items()}
+    # NOTE: Identical objects (for instance a model or a dataset shared by
+    # many tasks) are only scattered once. Objects are identified by id, which
+    # is safe since the graph keeps all of them alive.
+    values = {}
+    for computation in graph.values():
+        _collect_values(Future, computation, values)
+
+    futures = _scatter_values(client, list(values.values()))
+    value_to_future = dict(zip(values.keys(), futures))
+
+    optimized = {key: _replace_computation(value_to_future, value) for key, value in graph.items()}
     from dask.optimization import fuse
 
     return fuse(optimized)[0]
 
 
-def _scatter_computation(Future, client, computation):
+def _collect_values(Future, computation, values):
     # NOTE: According to dask's graph spec (https://docs.dask.org/en/stable/spec.html):
     # A computation may be one of the following:
     #  - Any key present in the Dask graph like 'x'
     #  - Any other value like 1, to be interpreted literally
     #  - A task like (inc, 'x') (see below)
     #  - A list of computations, like [1, 'x', (inc, 'x')]
+    if isinstance(computation, tuple):
+        # NOTE: The first element of a task is the function
+        for c in computation[1:]:
+            _collect_values(Future, c, values)
+    elif isinstance(computation, list):
+        for c in computation:
+            _collect_values(Future, c, values)
+    elif id(computation) not in values and _should_scatter(Future, computation):
+        values[id(computation)] = computation
+
+
+def _should_scatter(Future, value):
+    if isinstance(value, (int, str, float, bool, range, Future)) or callable(value):
+        return False
+    return _sizeof(value) >= SCATTER_THRESHOLD
+
+
+def _sizeof(value):
+    from pharmpy.model import Model
+    from pharmpy.workflows.model_entry import ModelEntry
+
+    # NOTE: The default estimate of dask is the shallow size of the object,
+    # which is far too small for models since they hold parsed code, a
+    # dataset etc. Models are therefore always considered large.
+    if isinstance(value, (Model, ModelEntry)):
+        return SCATTER_THRESHOLD
+    return sizeof(value)
+
+
+def _scatter_values(client, values):
+    if not values:
+        return []
+    if dask.__version__ in ('2024.2.1', '2024.3.0', '2024.3.1', '2024.4.0'):
+        # This is a workaround for https://github.com/dask/distributed/issues/8576
+        return client.scatter(values, hash=False)
+    else:
+        return client.scatter(values)
+
+
+def _replace_computation(value_to_future, computation):
     if isinstance(computation, tuple):
         if len(computation) == 0:  # Avoid further interpreting empty argument
             return computation
         else:
             return (
                 computation[0],
-                *map(lambda c: _scatter_computation(Future, client, c), computation[1:]),
+                *(_replace_computation(value_to_future, c) for c in computation[1:]),
             )
 
     if isinstance(computation, list):
-        return list(map(lambda c: _scatter_computation(Future, client, c), computation))
+        return [_replace_computation(value_to_future, c) for c in computation]
 
-    return _scatter_value(Future, client, computation)
-
-
-def _scatter_value(Future, client, value):
-    # TODO: We could automatically compute whether object size is above
-    # threshold with a slight twist on https://stackoverflow.com/a/30316760
-    if isinstance(value, (int, str, float, bool, range, Future)) or callable(value):
-        return value
-    else:
-        if dask.__version__ in ('2024.2.1', '2024.3.0', '2024.3.1', '2024.4.0'):
-            # This is a workaround for https://github.com/dask/distributed/issues/8576
-            future = client.scatter(value, hash=False)
-        else:
-            future = client.scatter(value)
-        return future
+    return value_to_future.get(id(computation), computation)
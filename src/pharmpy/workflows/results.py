@@ -5,12 +5,25 @@ import json
 import lzma
 import re
 import warnings
+import zipfile
 from contextlib import closing
 from dataclasses import dataclass
 from io import StringIO
 from lzma import open as lzma_open
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Union,
+    overload,
+)
 
 import pharmpy
 from pharmpy.deps import altair as alt
@@ -18,12 +31,17 @@ from pharmpy.internals.immutable import Immutable
 from pharmpy.model import Model
 
 if TYPE_CHECKING:
+    import numpy as np
     import pandas as pd
 
     from pharmpy.workflows import Log
 else:
+    from pharmpy.deps import numpy as np
     from pharmpy.deps import pandas as pd
 
+NPZ_METADATA = 'results.json'
+SIMULATION_TABLE_METADATA = 'table.json'
+
 
 def mfr(res: ModelfitResults) -> ModelfitResults:
     assert isinstance(res, ModelfitResults)
@@ -114,11 +132,118 @@ class ResultsJSONEncoder(json.JSONEncoder):
         elif isinstance(obj, Path):
             d = {'path': str(obj), '__class__': 'PosixPath'}
             return d
+        elif isinstance(obj, SimulationTable):
+            return {
+                'path': str(obj.path),
+                '__module__': obj.__class__.__module__,
+                '__class__': obj.__class__.__qualname__,
+            }
         else:
             # NOTE: This will raise a proper TypeError
             return super().default(obj)
 
 
+class ResultsNpzEncoder(ResultsJSONEncoder):
+    """Encoder for the npz results format
+
+    DataFrames and Series are stored column by column as arrays in the archive and
+    only a reference to them is kept in the json metadata. Frames that cannot be
+    stored as arrays fall back to the json table format.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._nframes = 0
+
+    def default(self, obj):
+        if isinstance(obj, pd.DataFrame):
+            d = self._store_frame(obj)
+            if d is not None:
+                d['__class__'] = 'DataFrame'
+                return d
+        elif isinstance(obj, pd.Series) and not (
+            obj.size >= 1 and isinstance(obj.iloc[0], pd.DataFrame)
+        ):
+            d = self._store_frame(obj.to_frame())
+            if d is not None:
+                d['__class__'] = 'Series'
+                d['name'] = _label_to_json(obj.name)
+                return d
+        return super().default(obj)
+
+    def _store_frame(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        prefix = f'frames/{self._nframes}'
+        arrays = {}
+        if isinstance(df.index, pd.RangeIndex):
+            index = {'range': [df.index.start, df.index.stop, df.index.step]}
+        else:
+            for i in range(df.index.nlevels):
+                values = _column_to_array(df.index.get_level_values(i))
+                if values is None:
+                    return None
+                arrays[f'{prefix}/index/{i}.npy'] = values
+            index = {'nlevels': df.index.nlevels}
+        index['names'] = [_label_to_json(name) for name in df.index.names]
+
+        for i in range(len(df.columns)):
+            values = _column_to_array(df.iloc[:, i])
+            if values is None:
+                return None
+            arrays[f'{prefix}/columns/{i}.npy'] = values
+
+        self.arrays.update(arrays)
+        self._nframes += 1
+        return {
+            '__frame__': prefix,
+            'index': index,
+            'columns': [_label_to_json(c) for c in df.columns],
+            'column_names': [_label_to_json(name) for name in df.columns.names],
+        }
+
+
+def _label_to_json(label):
+    if isinstance(label, tuple):
+        return [_label_to_json(x) for x in label]
+    if isinstance(label, np.generic):
+        return label.item()
+    return label
+
+
+def _column_to_array(values: Union[pd.Series, pd.Index]) -> Optional[np.ndarray]:
+    if isinstance(values.dtype, np.dtype):
+        if values.dtype.kind in 'biufcmM':
+            return values.to_numpy()
+        if values.dtype.kind == 'O':
+            array = values.to_numpy()
+            if all(type(x) is str for x in array):
+                return array.astype(str)
+    return None
+
+
+def _frame_from_arrays(obj, read_array) -> pd.DataFrame:
+    prefix = obj['__frame__']
+    index_meta = obj['index']
+    if 'range' in index_meta:
+        index = pd.RangeIndex(*index_meta['range'], name=index_meta['names'][0])
+    else:
+        levels = [read_array(f'{prefix}/index/{i}.npy') for i in range(index_meta['nlevels'])]
+        if len(levels) == 1:
+            index = pd.Index(levels[0], name=index_meta['names'][0])
+        else:
+            index = pd.MultiIndex.from_arrays(levels, names=index_meta['names'])
+
+    labels = [tuple(c) if isinstance(c, list) else c for c in obj['columns']]
+    if len(obj['column_names']) > 1:
+        columns = pd.MultiIndex.from_tuples(labels, names=obj['column_names'])
+    else:
+        columns = pd.Index(labels, name=obj['column_names'][0], dtype=object)
+    data = {i: read_array(f'{prefix}/columns/{i}.npy') for i in range(len(labels))}
+    df = pd.DataFrame(data, index=index)
+    df.columns = columns
+    return df
+
+
 def _df_read_json(obj) -> pd.DataFrame:
     # Convert time strings to naive datetime and then to string
     # Needed because of https://github.com/pandas-dev/pandas/issues/52595
@@ -135,7 +260,8 @@ def _multi_index_read_json(obj) -> pd.MultiIndex:
 
 
 class ResultsJSONDecoder(json.JSONDecoder):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, read_array=None, **kwargs):
+        self._read_array = read_array
         json.JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
 
     def object_hook(self, obj):
@@ -144,6 +270,14 @@ class ResultsJSONDecoder(json.JSONDecoder):
         module = None
         cls = None
 
+        if '__frame__' in obj:
+            # NOTE: Frame stored as arrays in an npz archive
+            df = _frame_from_arrays(obj, self._read_array)
+            if obj['__class__'] == 'Series':
+                name = obj['name']
+                return df.iloc[:, 0].rename(tuple(name) if isinstance(name, list) else name)
+            return df
+
         if '__module__' in obj:
             module = obj['__module__']
             del obj['__module__']
@@ -212,6 +346,8 @@ class ResultsJSONDecoder(json.JSONDecoder):
 
         if cls == 'PosixPath':
             return Path(obj)
+        if cls == 'SimulationTable':
+            return SimulationTable(obj['path'])
         if cls == 'Log':
             return Log.from_dict(obj)
 
@@ -225,13 +361,19 @@ def _is_likely_to_be_json(source: str):
     return match is not None and match.group(1) == '{'
 
 
-def read_results(path_or_str: Union[str, Path]):
+def read_results(path_or_str: Union[str, Path], attributes: Optional[List[str]] = None):
     if isinstance(path_or_str, str) and _is_likely_to_be_json(path_or_str):
         manager = closing(StringIO(path_or_str))
     else:
         path = Path(path_or_str)
         if path.is_dir():
-            path /= 'results.json'
+            if (path / 'results.npz').is_file():
+                path /= 'results.npz'
+            else:
+                path /= 'results.json'
+
+        if path.suffix == '.npz':
+            return _read_results_npz(path, attributes)
 
         if path.name.endswith('.xz'):
             manager = lzma.open(path, 'r', encoding='utf-8')
@@ -242,6 +384,24 @@ def read_results(path_or_str: Union[str, Path]):
         return json.load(readable, cls=ResultsJSONDecoder)
 
 
+def _read_results_npz(path: Path, attributes: Optional[List[str]] = None):
+    with zipfile.ZipFile(path) as zf:
+        metadata = json.loads(zf.read(NPZ_METADATA))
+        if attributes is not None:
+            # NOTE: The arrays of frames of other attributes are never read
+            for key in metadata:
+                if key not in attributes and not key.startswith('__'):
+                    metadata[key] = None
+
+        def read_array(name):
+            with zf.open(name) as f:
+                array = np.lib.format.read_array(f, allow_pickle=False)
+            # NOTE: Strings are stored as fixed width unicode
+            return array.astype(object) if array.dtype.kind == 'U' else array
+
+        return json.loads(json.dumps(metadata), cls=ResultsJSONDecoder, read_array=read_array)
+
+
 @dataclass(frozen=True)
 class Results(Immutable):
     """Base class for all result classes"""
@@ -294,6 +454,27 @@ class Results(Immutable):
         else:
             return s
 
+    def to_npz(self, path: Path):
+        """Serialize results object in the npz format
+
+        The npz format is a zip archive in which all DataFrames and Series are stored
+        column by column as numpy arrays. Only small metadata is stored as json. This
+        is much more compact and faster to read than json for large results. It is
+        possible to read only some of the attributes, see read_results.
+
+        Parameters
+        ----------
+        path : Path
+            Path to npz file
+        """
+        encoder = ResultsNpzEncoder()
+        s = encoder.encode(self)
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as zf:
+            zf.writestr(NPZ_METADATA, s)
+            for name, array in encoder.arrays.items():
+                with zf.open(name, 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+
     def get_and_reset_index(self, attr: str, **kwargs) -> pd.DataFrame:
         """Wrapper to reset index of attribute or result from method.
 
@@ -479,6 +660,154 @@ class ModelfitResults(Results):
         return f'<Pharmpy modelfit results object {self.name}>'
 
 
+class LazyAttribute:
+    """Placeholder for an attribute of LazyModelfitResults
+
+    Parameters
+    ----------
+    load : Callable
+        Function without arguments returning the value of the attribute
+    """
+
+    __slots__ = ('load',)
+
+    def __init__(self, load: Callable[[], Any]):
+        self.load = load
+
+
+class _LazyResults:
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+        if isinstance(value, LazyAttribute):
+            value = value.load()
+            object.__setattr__(self, name, value)
+        return value
+
+
+class LazyModelfitResults(_LazyResults, ModelfitResults):
+    """Modelfit results with attributes loaded on first access
+
+    Any attribute can be given as a LazyAttribute. It will be replaced by its value
+    the first time it is accessed. This is used to avoid parsing large results files
+    that might never be needed, for example when only the ofv and the parameter
+    estimates are used to rank models. All attributes are loaded when the object is
+    serialized. Use loaded to get the attributes loaded so far without loading the rest.
+    """
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: getattr(self, key) for key in vars(self)}
+
+    def loaded(self) -> ModelfitResults:
+        """Modelfit results with only the attributes loaded so far
+
+        Attributes that have not been loaded are set to None without being loaded.
+
+        Returns
+        -------
+        ModelfitResults
+            Modelfit results without lazy attributes
+        """
+        d = {
+            key: None if isinstance(value, LazyAttribute) else value
+            for key, value in vars(self).items()
+        }
+        return ModelfitResults.from_dict(d)
+
+
+class SimulationTable:
+    """Simulated tables of all replicates stored on disk
+
+    The table of each replicate is stored column by column as numpy arrays in a zip
+    archive, in the same way as frames in the npz results format. Only one replicate at
+    a time is read when iterating so the memory needed does not grow with the number of
+    replicates.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the archive
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    @classmethod
+    def write(cls, path: Union[str, Path], replicates: Iterable[pd.DataFrame]) -> SimulationTable:
+        """Write the tables of replicates to disk
+
+        Parameters
+        ----------
+        path : Path
+            Path to the archive
+        replicates : iterable of pd.DataFrame
+            Table of each replicate. All tables should have the same columns and index.
+
+        Returns
+        -------
+        SimulationTable
+            The stored replicates
+        """
+        encoder = ResultsNpzEncoder()
+        frames = []
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for df in replicates:
+                d = encoder._store_frame(df)
+                if d is None:
+                    raise ValueError(f'Cannot store simulation table with dtypes {list(df.dtypes)}')
+                for name, array in encoder.arrays.items():
+                    with zf.open(name, 'w', force_zip64=True) as f:
+                        np.lib.format.write_array(f, array, allow_pickle=False)
+                encoder.arrays.clear()
+                frames.append(d)
+            zf.writestr(SIMULATION_TABLE_METADATA, json.dumps({'replicates': frames}))
+        return cls(path)
+
+    def _read_metadata(self) -> List[Dict[str, Any]]:
+        with zipfile.ZipFile(self.path) as zf:
+            return json.loads(zf.read(SIMULATION_TABLE_METADATA))['replicates']
+
+    def __len__(self):
+        return len(self._read_metadata())
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        frames = self._read_metadata()
+        with zipfile.ZipFile(self.path) as zf:
+
+            def read_array(name):
+                with zf.open(name) as f:
+                    array = np.lib.format.read_array(f, allow_pickle=False)
+                return array.astype(object) if array.dtype.kind == 'U' else array
+
+            for d in frames:
+                yield _frame_from_arrays(d, read_array)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Table of all replicates
+
+        Returns
+        -------
+        pd.DataFrame
+            Tables of all replicates indexed on the replicate number SIM, starting from 1,
+            and on the index of the tables
+        """
+        frames = list(self)
+        if not frames:
+            return pd.DataFrame(columns=['SIM', 'index']).set_index(['SIM', 'index'])
+        return pd.concat(frames, keys=range(1, len(frames) + 1), names=['SIM'])
+
+    def __eq__(self, other):
+        return isinstance(other, SimulationTable) and self.path == other.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f'SimulationTable({str(self.path)!r})'
+
+
 @dataclass(frozen=True)
 class SimulationResults(Results):
     """Base class for resutls from simulation operation
@@ -491,11 +820,35 @@ class SimulationResults(Results):
         Description of model
     table : pd.DataFrame
         Table file of model
+    replicates : SimulationTable
+        Table of each replicate stored on disk. Optional.
     """
 
     name: Optional[str] = None
     description: Optional[str] = None
     table: Optional[pd.DataFrame] = None
+    replicates: Optional[SimulationTable] = None
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]):
+        if d.get('table') is None and d.get('replicates') is not None:
+            # NOTE: The table is only read from the replicates if it is used
+            d = {**d, 'table': LazyAttribute(d['replicates'].to_dataframe)}
+            cls = LazySimulationResults
+        return super(SimulationResults, cls).from_dict(d)
 
     def __repr__(self):
         return f'<Pharmpy simulation results object {self.name}>'
+
+
+class LazySimulationResults(_LazyResults, SimulationResults):
+    """Simulation results with the table read from the replicates on first access
+
+    The replicates stay on disk when the object is serialized.
+    """
+
+    def to_dict(self) -> dict[str, Any]:
+        d = vars(self).copy()
+        if isinstance(d['table'], LazyAttribute):
+            d['table'] = None
+        return d
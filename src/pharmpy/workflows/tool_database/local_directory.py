@@ -64,7 +64,12 @@ class LocalDirectoryToolDatabase(ToolDatabase):
             shutil.copy2(source_path, self.path)
 
     def store_results(self, res):
-        res.to_json(path=self.path / 'results.json')
+        from pharmpy.workflows import conf
+
+        if conf.results_format == 'npz':
+            res.to_npz(path=self.path / 'results.npz')
+        else:
+            res.to_json(path=self.path / 'results.json')
         res.to_csv(path=self.path / 'results.csv')
 
     def store_metadata(self, metadata):
@@ -0,0 +1,28 @@
+import pytest
+
+from pharmpy.internals.sequence.lcs import diff
+
+
+@pytest.mark.parametrize(
+    'old, new, expected',
+    (
+        ([], [], []),
+        ([1, 2], [1, 2], [(0, 1), (0, 2)]),
+        ([], [1, 2], [(1, 1), (1, 2)]),
+        ([1, 2], [], [(-1, 1), (-1, 2)]),
+        ([1, 2, 3], [1, 4, 3], [(0, 1), (-1, 2), (1, 4), (0, 3)]),
+        ([1, 2, 3, 4], [2, 5, 4, 6], [(-1, 1), (0, 2), (-1, 3), (1, 5), (0, 4), (1, 6)]),
+        ([[1], [2]], [[2], [3]], [(-1, [1]), (0, [2]), (1, [3])]),
+    ),
+)
+def test_diff(old, new, expected):
+    assert list(diff(old, new)) == expected
+
+
+def test_diff_long():
+    old = [f'S{i}' for i in range(5000)]
+    new = [f'S{i}' if i % 100 else f'T{i}' for i in range(5000)]
+    result = list(diff(old, new))
+    assert [x for op, x in result if op != 1] == old
+    assert [x for op, x in result if op != -1] == new
+    assert sum(op == 0 for op, _ in result) == 4950
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pharmpy.internals.ode_solver import create_breakpoints, solve_linear, solve_nonlinear
+
+
+def _breakpoints(interval=None):
+    # Individual 0: lagged bolus, then a reset. Individual 1: infusion.
+    individual = np.array([0, 0, 0, 0, 1, 1, 1])
+    time = np.array([0.0, 2.0, 3.0, 4.0, 0.0, 1.0, 3.0])
+    reset = np.array([False, False, True, False, False, False, False])
+    compartment = np.array([0, -1, -1, -1, 0, -1, -1])
+    amount = np.array([10.0, 0.0, 0.0, 0.0, 4.0, 0.0, 0.0])
+    duration = np.array([0.0, 0.0, 0.0, 0.0, 2.0, 0.0, 0.0])
+    lag = np.array([1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+    if interval is None:
+        interval = np.zeros(7)
+    return create_breakpoints(
+        individual, time, reset, compartment, amount, duration, lag, interval, 1
+    )
+
+
+def _expected(k):
+    return np.array(
+        [
+            0.0,
+            10 * np.exp(-k),
+            0.0,
+            0.0,
+            0.0,
+            2 / k * (1 - np.exp(-k)),
+            2 / k * (1 - np.exp(-2 * k)) * np.exp(-k),
+        ]
+    )
+
+
+def test_solve_linear():
+    k = 0.5
+    bp = _breakpoints()
+    amounts = solve_linear(bp, np.full((7, 1, 1), -k), np.zeros((7, 1)), np.zeros((2, 1)))
+    np.testing.assert_allclose(amounts[:, 0], _expected(k), atol=1e-12)
+
+
+def test_solve_nonlinear():
+    k = 0.5
+    bp = _breakpoints()
+
+    def rhs(state, t, record):
+        return -k * state
+
+    amounts = solve_nonlinear(bp, rhs, np.zeros((2, 1)))
+    np.testing.assert_allclose(amounts[:, 0], _expected(k), rtol=1e-6, atol=1e-10)
+
+
+def test_solve_linear_steady_state():
+    k = 0.5
+    individual = np.array([0, 0])
+    time = np.array([0.0, 1.0])
+    bp = create_breakpoints(
+        individual,
+        time,
+        np.zeros(2, dtype=bool),
+        np.array([0, -1]),
+        np.array([10.0, 0.0]),
+        np.zeros(2),
+        np.zeros(2),
+        np.array([12.0, 0.0]),
+        1,
+    )
+    amounts = solve_linear(bp, np.full((2, 1, 1), -k), np.zeros((2, 1)), np.zeros((1, 1)))
+    peak = 10 / (1 - np.exp(-12 * k))
+    np.testing.assert_allclose(amounts[:, 0], [peak, peak * np.exp(-k)])
+
+    with pytest.raises(ValueError):
+        solve_nonlinear(bp, lambda state, t, record: -k * state, np.zeros((1, 1)))
@@ -348,6 +348,18 @@ def test_full_expression(load_model_for_test, pheno_path):
     with pytest.raises(ValueError):
         model.statements.full_expression("Y")
 
+    sset = Statements(
+        [
+            Assignment(S('X'), S('A')),
+            Assignment(S('Y'), S('X') + 1),
+            Assignment(S('X'), S('X') * S('Y')),
+            Assignment(S('Z'), S('X') + S('B')),
+        ]
+    )
+    assert sset.full_expression('Z') == S('A') * (S('A') + 1) + S('B')
+    assert sset.full_expression('X + Y') == S('A') * (S('A') + 1) + S('A') + 1
+    assert sset[:2].full_expression('Y') == S('A') + 1
+
 
 def test_to_explicit_ode_system(load_model_for_test, pheno_path):
     model = load_model_for_test(pheno_path)
@@ -422,6 +434,25 @@ def test_dependencies(load_model_for_test, pheno_path):
         model.statements.dependencies("NONEXISTING")
 
 
+def test_dependency_graph_derived_statements(load_model_for_test, pheno_path):
+    model = load_model_for_test(pheno_path)
+    sset = model.statements
+    graph = sset._create_dependency_graph()
+    assert sset._create_dependency_graph() is graph
+
+    def assert_same_graph(derived):
+        assert derived._graph is not None
+        expected = Statements(tuple(derived))._create_dependency_graph()
+        assert set(derived._graph.edges) == set(expected.edges)
+        assert set(derived._graph.nodes) == set(expected.nodes)
+
+    assert_same_graph(sset[2:8])
+    assert_same_graph(sset[:4] + sset[4:])
+    assert_same_graph(sset.reassign(S('TVV'), S('PTVV') * S('CL')))
+    assert_same_graph(sset.subs({S('WGT'): S('CL')}))
+    assert sset.before_odes.dependencies(S('CL')) == {S('PTVCL'), S('WGT'), S('ETA_1')}
+
+
 def test_builder():
     cb = CompartmentalSystemBuilder()
     dose = Bolus(Expr.symbol('AMT'))
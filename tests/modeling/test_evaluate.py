@@ -3,15 +3,23 @@ from pathlib import Path
 
 import pytest
 
+from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
+from pharmpy.internals.expr.eval import _lambdify_canonical
 from pharmpy.model.external.nonmem.dataset import read_nonmem_dataset
 from pharmpy.modeling import (
+    create_amounts_evaluator,
+    create_expression_evaluator,
+    create_individual_prediction_evaluator,
+    create_population_prediction_evaluator,
+    evaluate_amounts,
     evaluate_epsilon_gradient,
     evaluate_eta_gradient,
     evaluate_expression,
     evaluate_individual_prediction,
     evaluate_population_prediction,
     evaluate_weighted_residuals,
+    set_michaelis_menten_elimination,
 )
 from pharmpy.tools import read_modelfit_results
 
@@ -100,3 +108,82 @@ def test_evaluate_weighted_residuals(load_model_for_test, testdata):
     res = read_modelfit_results(linpath)
     wres = evaluate_weighted_residuals(linmod, parameters=dict(res.parameter_estimates))
     pd.testing.assert_series_equal(lincorrect['WRES'], wres, rtol=1e-4, check_names=False)
+
+
+def test_create_population_prediction_evaluator(load_model_for_test, testdata):
+    linpath = testdata / 'nonmem' / 'pheno_real_linbase.mod'
+    linmod = load_model_for_test(linpath)
+    evaluator = create_population_prediction_evaluator(linmod)
+    pd.testing.assert_series_equal(evaluator(), evaluate_population_prediction(linmod))
+
+    parameters = {name: value * 1.1 for name, value in linmod.parameters.inits.items()}
+    pd.testing.assert_series_equal(
+        evaluator(parameters), evaluate_population_prediction(linmod, parameters=parameters)
+    )
+
+    # The evaluator does not depend on the shared cache of compiled expressions
+    _lambdify_canonical.cache_clear()
+    evaluator(parameters)
+    assert _lambdify_canonical.cache_info().misses == 0
+
+
+def test_create_individual_prediction_evaluator(load_model_for_test, testdata):
+    linpath = testdata / 'nonmem' / 'pheno_real_linbase.mod'
+    linmod = load_model_for_test(linpath)
+    res = read_modelfit_results(linpath)
+    evaluator = create_individual_prediction_evaluator(linmod)
+    pred = evaluator(res.individual_estimates)
+    pd.testing.assert_series_equal(lincorrect['CIPREDI'], pred, rtol=1e-4, check_names=False)
+
+
+def test_create_expression_evaluator(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'models' / 'pheno_noifs.mod')
+    res = read_modelfit_results(testdata / 'nonmem' / 'models' / 'pheno_noifs.mod')
+    evaluator = create_expression_evaluator(model, 'TVV')
+    ser = evaluator(res.parameter_estimates)
+    assert ser[0] == pytest.approx(1.413062)
+    assert ser[743] == pytest.approx(1.110262)
+
+
+def test_evaluate_predictions_odes(load_model_for_test, testdata):
+    path = testdata / 'nonmem' / 'pheno_real.mod'
+    model = load_model_for_test(path)
+    res = read_modelfit_results(path)
+    parameters = dict(res.parameter_estimates)
+    pred = evaluate_population_prediction(model, parameters=parameters)
+    np.testing.assert_allclose(pred, res.predictions['PRED'], rtol=1e-4)
+    ipred = evaluate_individual_prediction(
+        model, etas=res.individual_estimates, parameters=parameters
+    )
+    np.testing.assert_allclose(ipred, res.predictions['IPRED'], rtol=1e-4)
+
+    # First order absorption with steady state doses
+    path = testdata / 'nonmem' / 'models' / 'mox2.mod'
+    model = load_model_for_test(path)
+    res = read_modelfit_results(path)
+    table = read_nonmem_dataset(
+        path.parent / 'mytab_mox2',
+        ignore_character='@',
+        colnames=['ID', 'TIME', 'DV', 'CWRES', 'CIPREDI'],
+    )
+    ipred = evaluate_individual_prediction(
+        model, etas=res.individual_estimates, parameters=dict(res.parameter_estimates)
+    )
+    np.testing.assert_allclose(ipred, table['CIPREDI'], rtol=1e-4, atol=1e-4)
+
+
+def test_evaluate_amounts(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    amounts = evaluate_amounts(model)
+    assert list(amounts.columns) == ['A_CENTRAL']
+    assert amounts.iloc[0, 0] == 25.0
+    assert amounts.iloc[1, 0] == pytest.approx(25.0 * np.exp(-2.0 * 0.00469307 / 1.00916))
+
+    # With a large KM Michaelis-Menten elimination is close to first order elimination
+    mm = set_michaelis_menten_elimination(model)
+    evaluator = create_amounts_evaluator(mm)
+    parameters = {'POP_KM': 1e6}
+    np.testing.assert_allclose(evaluator(parameters=parameters), amounts, rtol=1e-4)
+
+    with pytest.raises(ValueError, match='no ODE system'):
+        create_amounts_evaluator(load_model_for_test(testdata / 'nonmem' / 'minimal.mod'))
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+exports = (
+    ('read_model',),
+    ('write_csv',),
+    ('add_covariate_effect',),
+    ('set_tmdd',),
+    ('vpc_plot',),
+)
+
+
+@pytest.mark.parametrize(('func',), exports)
+def test_import_modeling_all(func):
+    import pharmpy.modeling as modeling
+
+    assert func in getattr(modeling, '__all__')
+
+
+@pytest.mark.parametrize(('func',), exports)
+def test_import_modeling_dir(func):
+    import pharmpy.modeling as modeling
+
+    assert func in dir(modeling)
+
+
+@pytest.mark.parametrize(('func',), exports)
+def test_import_modeling_import(func):
+    mod = __import__('pharmpy.modeling', globals(), locals(), [func], 0)
+    assert callable(getattr(mod, func))
+
+
+def test_import_modeling_all_callable():
+    import pharmpy.modeling as modeling
+
+    for func in modeling.__all__:
+        assert callable(getattr(modeling, func))
+
+
+def test_import_modeling_unknown():
+    import pharmpy.modeling as modeling
+
+    with pytest.raises(AttributeError):
+        modeling.no_such_function
+
+
+def test_import_modeling_lazy():
+    code = (
+        'import sys\n'
+        'from pharmpy.modeling import read_model\n'
+        'print(\'pharmpy.modeling.plots\' in sys.modules)\n'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == 'False'
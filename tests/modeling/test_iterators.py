@@ -109,3 +109,19 @@ def test_resampler_anonymization(testdata):
         df_oldid.reset_index(inplace=True, drop=True)
         df_newid['ID'] = old_id
         pandas.testing.assert_frame_equal(df_newid, df_oldid)
+
+
+def test_resampler_seed(df):
+    resampler = iters.Resample(df, 'ID', resamples=3, replace=True, seed=11)
+    samples = list(resampler)
+    assert len(samples) == 3
+    resampler = iters.Resample(df, 'ID', resamples=3, replace=True, seed=11)
+    for (new_df, ids), (expected_df, expected_ids) in zip(resampler, samples):
+        assert ids == expected_ids
+        pandas.testing.assert_frame_equal(new_df, expected_df)
+
+    for new_df, ids in iters.Resample(df, 'ID', resamples=5, stratify='STRAT', seed=3):
+        assert sorted(ids) == [1, 2, 4]
+        assert list(new_df['ID']) == [1, 1, 2, 2, 3, 3]
+        expected_dv = [dv for i in ids for dv in df.loc[df['ID'] == i, 'DV']]
+        assert list(new_df['DV']) == expected_dv
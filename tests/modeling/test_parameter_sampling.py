@@ -7,7 +7,9 @@ from pharmpy.modeling import (
     sample_individual_estimates,
     sample_parameters_from_covariance_matrix,
     sample_parameters_uniformly,
+    set_lower_bounds,
 )
+from pharmpy.modeling.parameter_sampling import _sample_truncated_joint_normal
 from pharmpy.tools import read_modelfit_results
 
 
@@ -51,6 +53,7 @@ def test_sample_parameter_from_covariance_matrix(load_model_for_test, testdata):
         }
     )
     pd.testing.assert_frame_equal(samples, correct, atol=1e-6)
+    assert samples.attrs['acceptance'] == {'accepted': 3, 'drawn': 3, 'gibbs': 0}
     # Make cov matrix non-posdef
     cm2 = cm.copy()
     cm2.loc['PTVCL', 'PTVCL'] = -1
@@ -64,6 +67,49 @@ def test_sample_parameter_from_covariance_matrix(load_model_for_test, testdata):
         )
 
 
+def test_sample_parameter_from_covariance_matrix_acceptance(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    res = read_modelfit_results(testdata / 'nonmem' / 'pheno_real.mod')
+    pe = res.parameter_estimates
+    cm = res.covariance_matrix
+    # NOTE: About 2% of the samples are above the lower bound
+    model = set_lower_bounds(model, {'PTVCL': pe['PTVCL'] + 2 * np.sqrt(cm.loc['PTVCL', 'PTVCL'])})
+    with pytest.warns(UserWarning, match='Acceptance rate'):
+        samples = sample_parameters_from_covariance_matrix(
+            model, pe, cm, n=2000, seed=create_rng(318)
+        )
+    assert len(samples) == 2000
+    assert (samples['PTVCL'] > model.parameters['PTVCL'].lower).all()
+    acceptance = samples.attrs['acceptance']
+    assert acceptance['accepted'] + acceptance['gibbs'] == 2000
+    assert acceptance['gibbs'] > 0
+    assert acceptance['accepted'] / acceptance['drawn'] < 0.1
+
+
+def test_sample_truncated_joint_normal():
+    sigma = np.array([[1.0, 0.8], [0.8, 1.0]])
+    mu = np.zeros(2)
+    a = np.array([-np.inf, -np.inf])
+    b = np.array([0.5, np.inf])
+    samples = _sample_truncated_joint_normal(sigma, mu, a, b, 1000, create_rng(9))
+    assert samples.shape == (1000, 2)
+    assert (samples[:, 0] < 0.5).all()
+
+    # Acceptance rate is about 3.5%
+    a = np.array([1.5, 1.5])
+    b = np.array([np.inf, 4.0])
+    statistics = {'accepted': 0, 'drawn': 0, 'gibbs': 0}
+    with pytest.warns(UserWarning, match='Acceptance rate'):
+        samples = _sample_truncated_joint_normal(
+            sigma, mu, a, b, 2000, create_rng(9), statistics=statistics
+        )
+    assert samples.shape == (2000, 2)
+    assert statistics['accepted'] + statistics['gibbs'] == 2000
+    assert statistics['accepted'] / statistics['drawn'] < 0.1
+    assert ((samples > a) & (samples < b)).all()
+    assert samples.mean(axis=0) == pytest.approx([2.06, 2.06], abs=0.05)
+
+
 def test_sample_individual_estimates(load_model_for_test, testdata):
     model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
     res = read_modelfit_results(testdata / 'nonmem' / 'pheno_real.mod')
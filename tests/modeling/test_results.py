@@ -11,6 +11,7 @@ from pharmpy.modeling import (
     calculate_individual_parameter_statistics,
     calculate_individual_shrinkage,
     calculate_pk_parameters_statistics,
+    calculate_vpc,
     check_parameters_near_bounds,
     set_iiv_on_ruv,
 )
@@ -95,6 +96,25 @@ def test_calculate_individual_parameter_statistics(load_model_for_test, testdata
     assert stats['stderr']['K', 'p95'] == pytest.approx(0.006735905156223314, abs=1e-6)
 
 
+def test_calculate_individual_parameter_statistics_sample_sizes(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'secondary_parameters' / 'run2.mod')
+    res = read_modelfit_results(testdata / 'nonmem' / 'secondary_parameters' / 'run2.mod')
+    pe = res.parameter_estimates
+    cov = res.covariance_matrix
+    kwargs = {'nsamples': 20000, 'nparameter_samples': 50, 'nsamples_per_parameter': 4}
+    stats = calculate_individual_parameter_statistics(model, 'K = CL/V', pe, cov, seed=1, **kwargs)
+    chunked = calculate_individual_parameter_statistics(
+        model, 'K = CL/V', pe, cov, seed=1, memory_limit=10000, **kwargs
+    )
+    assert list(chunked.index) == list(stats.index)
+    pd.testing.assert_series_equal(chunked['stderr'], stats['stderr'])
+    pd.testing.assert_series_equal(chunked['mean'], stats['mean'], rtol=0.05)
+    pd.testing.assert_series_equal(chunked['variance'], stats['variance'], rtol=0.1)
+
+    stats = calculate_individual_parameter_statistics(model, 'K = CL/V', pe, seed=1, **kwargs)
+    assert stats['stderr'].isna().all()
+
+
 def test_calculate_pk_parameters_statistics(load_model_for_test, testdata):
     model = load_model_for_test(testdata / 'nonmem' / 'models' / 'mox1.mod')
     res = read_modelfit_results(testdata / 'nonmem' / 'models' / 'mox1.mod')
@@ -113,6 +133,87 @@ def test_calculate_pk_parameters_statistics(load_model_for_test, testdata):
     assert df['stderr'].loc['C_max_dose', 'median'] == pytest.approx(0.11128015565024524)
 
 
+def test_calculate_vpc(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    df = calculate_vpc(model, simulations)
+    assert list(df['n_data_points']) == [14, 24, 20, 19, 20, 19, 20, 19]
+    assert df.loc[0].to_dict() == pytest.approx(
+        {
+            'obs_central': 22.1,
+            'obs_lower': 13.7,
+            'obs_upper': 30.0,
+            'sim_central': 20.4605,
+            'sim_central_lower': 14.569,
+            'sim_central_upper': 28.879,
+            'sim_lower': 7.8255,
+            'sim_lower_lower': 5.0745,
+            'sim_lower_upper': 11.997,
+            'sim_upper': 53.077,
+            'sim_upper_lower': 33.12,
+            'sim_upper_upper': 69.536,
+            'bin_midpoint': 0.9,
+            'bin_edges_right': 1.8,
+            'bin_edges_left': 0.0,
+            'n_data_points': 14,
+        }
+    )
+
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_pd.mod')
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations_dvid.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    df = calculate_vpc(model, simulations, nbins=3, query='DVID == 1')
+    assert list(df['n_data_points']) == [2, 2, 1]
+    assert list(df['obs_central']) == [17.3, 31.0, 33.0]
+
+
+def test_calculate_vpc_replicates(load_model_for_test, testdata, monkeypatch):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    replicates = [df.droplevel('SIM') for _, df in simulations.groupby('SIM')]
+    expected = calculate_vpc(model, simulations, binning='equal_width', nbins=5, qi=0.8)
+
+    # NOTE: Small sizes to make sure that several passes over the replicates are needed
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_CHUNK_SIZE', 500)
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_HISTOGRAM_SIZE', 4)
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_SELECTION_SIZE', 10)
+    df = calculate_vpc(model, replicates, binning='equal_width', nbins=5, qi=0.8)
+    pd.testing.assert_frame_equal(df, expected)
+
+    with pytest.raises(ValueError):
+        calculate_vpc(model, iter(replicates))
+
+
+def test_calculate_vpc_replicates_ties(load_model_for_test, testdata, monkeypatch):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    # NOTE: Most simulated values are tied at zero
+    sim, index = simulations.index.codes
+    simulations.loc[(sim + index) % 5 < 3, 'DV'] = 0.0
+    expected = calculate_vpc(model, simulations, binning='equal_width', nbins=5, qi=0.8)
+
+    class Replicates:
+        def __init__(self):
+            self.passes = 0
+
+        def __iter__(self):
+            self.passes += 1
+            return (df.droplevel('SIM') for _, df in simulations.groupby('SIM'))
+
+    # NOTE: All bins have more values than can be selected at once
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_CHUNK_SIZE', 500)
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_HISTOGRAM_SIZE', 4)
+    monkeypatch.setattr('pharmpy.modeling.results._VPC_SELECTION_SIZE', 10)
+    replicates = Replicates()
+    df = calculate_vpc(model, replicates, binning='equal_width', nbins=5, qi=0.8)
+    pd.testing.assert_frame_equal(df, expected)
+    assert (df['sim_lower'] == 0.0).all()
+    assert replicates.passes <= 12
+
+
 def test_calc_pk_two_comp_bolus(load_model_for_test, testdata):
     # Warning: These results are based on a manually modified cov-matrix
     # Results are not verified
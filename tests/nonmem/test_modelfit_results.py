@@ -1,3 +1,4 @@
+import pickle
 import re
 import shutil
 
@@ -9,8 +10,12 @@ from pharmpy.internals.fs.cwd import chdir
 from pharmpy.model import Parameter, Parameters
 from pharmpy.modeling import read_model
 from pharmpy.tools import read_modelfit_results
-from pharmpy.tools.external.nonmem.results import parse_modelfit_results, simfit_results
-from pharmpy.workflows.results import read_results
+from pharmpy.tools.external.nonmem.results import (
+    parse_modelfit_results,
+    parse_simulation_results,
+    simfit_results,
+)
+from pharmpy.workflows.results import LazyAttribute, SimulationTable, read_results
 
 
 def test_ofv(pheno_path):
@@ -188,6 +193,90 @@ def test_predictions(testdata):
     assert df['PRED'][1.0, 0.0] == 18.143
 
 
+def test_lazy_attributes(testdata, monkeypatch):
+    import pharmpy.tools.external.nonmem.results as nonmem_results
+
+    parsed = []
+    for name in ('_parse_tables', '_parse_phi', '_parse_grd', '_parse_matrix'):
+        func = getattr(nonmem_results, name)
+
+        def wrapper(*args, name=name, func=func, **kwargs):
+            parsed.append(name)
+            return func(*args, **kwargs)
+
+        monkeypatch.setattr(nonmem_results, name, wrapper)
+
+    res = read_modelfit_results(testdata / 'nonmem' / 'pheno_real.mod')
+    assert res.ofv == 586.27605628188053
+    assert len(res.parameter_estimates) == 6
+    assert parsed == []
+    assert isinstance(vars(res)['predictions'], LazyAttribute)
+
+    assert len(res.predictions) == 744
+    assert len(res.residuals) == 155
+    assert parsed == ['_parse_tables']
+    assert isinstance(vars(res)['predictions'], pd.DataFrame)
+
+    res_unpickled = pickle.loads(pickle.dumps(res))
+    assert parsed.count('_parse_phi') == 1
+    assert parsed.count('_parse_grd') == 1
+    assert not any(isinstance(value, LazyAttribute) for value in vars(res_unpickled).values())
+    pd.testing.assert_frame_equal(res.individual_estimates, res_unpickled.individual_estimates)
+    pd.testing.assert_frame_equal(res.covariance_matrix, res_unpickled.covariance_matrix)
+
+
+def test_parse_simulation_results(tmp_path, testdata):
+    model = read_model(testdata / 'nonmem' / 'pheno_real.mod')
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    with open(tmp_path / 'sdtab1', 'w') as f:
+        for i in range(3):
+            print(f'TABLE NO.  {i + 1}', file=f)
+            print(' DV', file=f)
+            for value in simulations.loc[i, 'DV']:
+                print(f' {value: .4E}', file=f)
+
+    res = parse_simulation_results(model, tmp_path / 'pheno_real')
+    assert isinstance(res.replicates, SimulationTable)
+    assert res.replicates.path == tmp_path / 'pheno_real.sim.npz'
+    assert len(res.replicates) == 3
+    assert isinstance(vars(res)['table'], LazyAttribute)
+
+    first = next(iter(res.replicates))
+    assert list(first.columns) == ['DV']
+    assert list(first.index[:3]) == [0, 1, 2]
+    np.testing.assert_allclose(first['DV'], simulations.loc[0, 'DV'])
+
+    res_unpickled = pickle.loads(pickle.dumps(res))
+    assert isinstance(vars(res_unpickled)['table'], LazyAttribute)
+
+    res_read = read_results(res.to_json())
+    assert res_read.replicates == res.replicates
+    assert isinstance(vars(res_read)['table'], LazyAttribute)
+
+    assert res.table.index.names == ['SIM', 'index']
+    assert len(res.table) == 3 * len(model.dataset)
+    assert list(res.table.index.get_level_values('SIM').unique()) == [1, 2, 3]
+    pd.testing.assert_frame_equal(res.table, res_read.table)
+
+
+def test_simulation_table(tmp_path):
+    replicates = [
+        pd.DataFrame({'DV': [1.0, 2.0], 'ID': [1, 1]}, index=pd.Index([3, 5], name='index')),
+        pd.DataFrame({'DV': [3.0, 4.0], 'ID': [1, 1]}, index=pd.Index([3, 5], name='index')),
+    ]
+    table = SimulationTable.write(tmp_path / 'sim.npz', iter(replicates))
+    assert len(table) == 2
+    for df, expected in zip(table, replicates):
+        pd.testing.assert_frame_equal(df, expected, check_column_type=False)
+    df = table.to_dataframe()
+    assert list(df.index) == [(1, 3), (1, 5), (2, 3), (2, 5)]
+    assert list(df['DV']) == [1.0, 2.0, 3.0, 4.0]
+
+    with pytest.raises(ValueError):
+        SimulationTable.write(tmp_path / 'bad.npz', [pd.DataFrame({'DV': [[1.0]]})])
+
+
 def test_runtime_total(testdata):
     res = read_modelfit_results(testdata / 'nonmem' / 'pheno_real.mod')
     runtime = res.runtime_total
@@ -306,6 +395,27 @@ def test_serialization(testdata):
     assert res.log.to_dataframe().equals(res_decode.log.to_dataframe())
 
 
+def test_serialization_npz(testdata, tmp_path):
+    res = read_modelfit_results(testdata / 'nonmem' / 'models' / 'mox_2comp.mod')
+    path = tmp_path / 'results.npz'
+    res.to_npz(path)
+    res_decode = read_results(path)
+
+    pd.testing.assert_series_equal(res.parameter_estimates, res_decode.parameter_estimates)
+    pd.testing.assert_frame_equal(res.individual_estimates, res_decode.individual_estimates)
+    pd.testing.assert_frame_equal(
+        res.parameter_estimates_iterations, res_decode.parameter_estimates_iterations
+    )
+    pd.testing.assert_series_equal(res.individual_ofv, res_decode.individual_ofv)
+    assert res.ofv == res_decode.ofv
+    assert res.log.to_dataframe().equals(res_decode.log.to_dataframe())
+
+    res_decode = read_results(tmp_path, attributes=['ofv', 'individual_estimates'])
+    assert res_decode.ofv == res.ofv
+    pd.testing.assert_frame_equal(res.individual_estimates, res_decode.individual_estimates)
+    assert res_decode.parameter_estimates is None
+
+
 def test_empty_results(testdata, pheno_path):
     model = read_model(pheno_path)
     res = parse_modelfit_results(
@@ -2,7 +2,13 @@ import pytest
 
 from pharmpy.deps import pandas as pd
 from pharmpy.internals.fs.cwd import chdir
-from pharmpy.model.external.nonmem.table import CovTable, ExtTable, NONMEMTableFile, PhiTable
+from pharmpy.model.external.nonmem.table import (
+    CovTable,
+    ExtTable,
+    NONMEMTableFile,
+    PhiTable,
+    iterate_tables,
+)
 
 
 def test_nonmem_table(pheno_ext):
@@ -120,3 +126,29 @@ def test_nonmemtablefile_notitle_github_issues_1251(tmp_path):
 
         assert tuple(df.columns) == ('ID', 'TIME', 'CWRES', 'CIPREDI', 'VC')
         assert len(df) == 2
+
+
+def test_iterate_tables(tmp_path):
+    filename = 'sdtab'
+    header = ' ID          TIME        DV\n'
+    rows = '  1.0000E+00  0.0000E+00  1.5000E+00\n  1.0000E+00  1.0000E+00  2.5000E+00\n'
+    with chdir(tmp_path):
+        with open(filename, 'w') as fd:
+            for i in range(1, 4):
+                fd.write(
+                    f'TABLE NO.     1: Simulation: Problem=1 Subproblem={i} Superproblem1=0 '
+                    'Iteration1=0 Superproblem2=0 Iteration2=0\n'
+                )
+                fd.write(header + rows + header + rows)
+
+        tables = list(iterate_tables(filename))
+        assert len(tables) == 3
+        assert [table.subproblem for table in tables] == [1, 2, 3]
+        df = tables[2].data_frame
+        assert tuple(df.columns) == ('ID', 'TIME', 'DV')
+        assert list(df['DV']) == [1.5, 2.5, 1.5, 2.5]
+        assert df['DV'].dtype == 'float64'
+
+        table_file = NONMEMTableFile(filename)
+        assert len(table_file) == 3
+        pd.testing.assert_frame_equal(table_file[0].data_frame, df)
@@ -4,6 +4,7 @@ from pharmpy.basic import Expr
 from pharmpy.model import Assignment
 from pharmpy.model.external.nonmem.nmtran_parser import NMTranParser
 from pharmpy.model.external.nonmem.parsing import parse_table_columns
+from pharmpy.model.external.nonmem.records.parsers import LazyLark, install_grammar
 from pharmpy.modeling import read_model_from_string
 
 
@@ -30,6 +31,18 @@ def test_simple_parse():
     assert str(model2) == model2_str
 
 
+def test_lazy_grammar():
+    @install_grammar
+    class Parser:
+        grammar_filename = 'problem_record.lark'
+
+    assert isinstance(vars(Parser)['lark'], LazyLark)
+    lark = Parser.lark
+    assert vars(Parser)['lark'] is lark
+    assert Parser().lark is lark
+    assert lark.parse('MYPROB\n').data == 'root'
+
+
 def test_round_trip(pheno_path):
     parser = NMTranParser()
 
@@ -151,3 +151,37 @@ def test_nonmem_dataset_with_ignore_accept():
     assert len(df) == 2
     assert list(df.iloc[0]) == [1, 2]
     assert list(df.iloc[1]) == [1, 3]
+
+
+def test_read_nonmem_dataset_special_formats():
+    abc = ['A', 'B', 'C']
+    df = read_nonmem_dataset(StringIO("1D1 1.5-1 +\n. -99 2.5E+1\n"), colnames=abc)
+    assert list(df['A']) == [10.0, 0.0]
+    assert list(df['B'])[0] == 0.15
+    assert pd.isna(df['B'][1])
+    assert list(df['C']) == [0.0, 25.0]
+    with pytest.raises(DatasetError):
+        read_nonmem_dataset(StringIO("1,2,3\n1,x,3\n"), colnames=abc)
+    with pytest.raises(DatasetError):
+        read_nonmem_dataset(StringIO("1,2,3\n1,1234567890123456789012345,3\n"), colnames=abc)
+
+    raw = read_nonmem_dataset(StringIO("1,2,3\n4,5\n"), colnames=abc, raw=True)
+    assert list(raw.iloc[1]) == ['4', '5', None]
+    df = read_nonmem_dataset(StringIO("1\t\t3\n4 , 5 ,  6\n"), colnames=abc)
+    assert list(df.iloc[0]) == [1, 0, 3]
+    assert list(df.iloc[1]) == [4, 5, 6]
+
+
+def test_nonmem_dataset_with_several_ignore():
+    colnames = ['ID', 'DV', 'X']
+    data = "1,2,a\n1,3,b\n2,4,a\n2,5,c\n3,1D1,b\n"
+    drop = [False, False, True]
+    df = read_nonmem_dataset(
+        StringIO(data), colnames=colnames, drop=drop, ignore=['DV.GT.4', 'X.EQ.a', 'ID.EQN.3']
+    )
+    assert list(df['DV']) == [3.0]
+    assert list(df.index) == [0]
+    df = read_nonmem_dataset(
+        StringIO(data), colnames=colnames, drop=drop, accept=['DV.GE.3', 'X.NE.a']
+    )
+    assert list(df['DV']) == [3.0, 5.0, 10.0]
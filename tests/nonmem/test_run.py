@@ -0,0 +1,89 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pharmpy.deps import pandas as pd
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.modeling import read_model, set_simulation
+from pharmpy.tools.external.nonmem.run import execute_model
+from pharmpy.workflows import LocalDirectoryToolDatabase, ModelEntry
+from pharmpy.workflows.results import LazyAttribute
+
+
+@pytest.fixture
+def nonmem_output(monkeypatch, testdata):
+    """Replace running NONMEM with copying the result files of pheno_real
+
+    Returns a dict of extra output files, name to content, written by the run.
+    """
+    output = {}
+
+    def run(args, cwd, **kwargs):
+        cwd = Path(cwd)
+        for suffix in ['.ext', '.phi', '.cov', '.cor', '.coi']:
+            shutil.copy2(testdata / 'nonmem' / f'pheno_real{suffix}', cwd / f'pheno_real{suffix}')
+        shutil.copy2(testdata / 'nonmem' / 'pheno_real.lst', cwd / 'results.lst')
+        shutil.copy2(testdata / 'nonmem' / 'sdtab1', cwd / 'sdtab1')
+        for name, content in output.items():
+            (cwd / name).write_text(content)
+        return subprocess.CompletedProcess(args, 0)
+
+    monkeypatch.setattr('pharmpy.tools.external.nonmem.run.nmfe', lambda *args: ['nmfe', *args])
+    monkeypatch.setattr('pharmpy.tools.external.nonmem.run.subprocess.run', run)
+    return output
+
+
+def test_execute_model_simulation(tmp_path, testdata, nonmem_output):
+    model = read_model(testdata / 'nonmem' / 'pheno_real.mod')
+    model = set_simulation(model, n=3)
+    simulations = pd.read_csv(testdata / 'nonmem' / 'vpc_simulations.csv')
+    simulations = simulations.set_index(['SIM', 'index'])
+    lines = []
+    for i in range(3):
+        lines += [f'TABLE NO.  {i + 1}', ' DV']
+        lines += [f' {value: .4E}' for value in simulations.loc[i, 'DV']]
+    nonmem_output['sdtab1'] = '\n'.join(lines) + '\n'
+
+    with chdir(tmp_path):
+        db = LocalDirectoryToolDatabase('simulation')
+        model_entry = execute_model(ModelEntry.create(model), db)
+
+    # NOTE: The replicates are read from the database and not from the run directory
+    replicates = model_entry.simulation_results.replicates
+    assert replicates.path.parent == db.model_database.path / model.name
+    assert len(replicates) == 3
+    for path in tmp_path.glob('NONMEM_run_*'):
+        shutil.rmtree(path)
+    assert list(model_entry.simulation_results.table.index.levels[0]) == [1, 2, 3]
+
+
+def test_execute_model_lazy_results(tmp_path, testdata, nonmem_output, monkeypatch):
+    import pharmpy.tools.external.nonmem.results as nonmem_results
+
+    parsed = []
+    for name in ('_parse_tables', '_parse_phi', '_parse_grd', '_parse_matrix'):
+        func = getattr(nonmem_results, name)
+
+        def wrapper(*args, name=name, func=func, **kwargs):
+            parsed.append(name)
+            return func(*args, **kwargs)
+
+        monkeypatch.setattr(nonmem_results, name, wrapper)
+
+    model = read_model(testdata / 'nonmem' / 'pheno_real.mod')
+    with chdir(tmp_path):
+        db = LocalDirectoryToolDatabase('modelfit')
+        model_entry = execute_model(ModelEntry.create(model), db)
+
+    # NOTE: Storing the model entry in the database does not parse the result files
+    res = model_entry.modelfit_results
+    assert parsed == []
+    for name in ('individual_estimates', 'covariance_matrix', 'predictions'):
+        assert isinstance(vars(res)[name], LazyAttribute)
+    assert res.ofv == 586.27605628188053
+
+    res_db = db.model_database.retrieve_modelfit_results(model.name)
+    pd.testing.assert_frame_equal(res_db.covariance_matrix, res.covariance_matrix)
+    assert len(res_db.predictions) == 744
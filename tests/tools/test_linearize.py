@@ -2,9 +2,12 @@ from io import StringIO
 
 import pytest
 
+from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.model import DataInfo
+from pharmpy.modeling import set_estimation_step
 from pharmpy.tools import read_modelfit_results
+from pharmpy.tools.linearize.estimation import create_objective_function, estimate
 from pharmpy.tools.linearize.results import calculate_results, psn_linearize_results
 from pharmpy.tools.linearize.tool import create_linearized_model
 from pharmpy.tools.psn_helpers import create_results
@@ -120,3 +123,39 @@ def test_create_linearized_model(load_model_for_test, testdata):
     model = model.replace(datainfo=datainfo)
     linbase = create_linearized_model(model)
     assert len(linbase.statements) == 8
+
+
+def test_objective_function(load_model_for_test, testdata):
+    path = testdata / 'nonmem' / 'qa' / 'pheno_linbase.mod'
+    model = load_model_for_test(path)
+    res = read_modelfit_results(path)
+    objective_function = create_objective_function(model)
+    iofv, etas = objective_function(model.parameters.inits)
+    assert np.sum(iofv) == pytest.approx(730.894727, abs=1e-5)
+
+    parameters = {**model.parameters.inits, **res.parameter_estimates}
+    iofv, etas = objective_function(parameters)
+    np.testing.assert_allclose(iofv, res.individual_ofv, atol=1e-4)
+    np.testing.assert_allclose(etas, res.individual_estimates, atol=1e-5)
+
+    model = set_estimation_step(model, 'FO', interaction=False)
+    iofv, etas = create_objective_function(model)(parameters)
+    assert np.isfinite(iofv).all()
+    assert (etas == 0).all()
+
+
+def test_objective_function_ode(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    with pytest.raises(ValueError, match='ODE'):
+        create_objective_function(model)
+
+
+def test_estimate(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'qa' / 'pheno_linbase.mod')
+    res = estimate(model)
+    assert res.minimization_successful
+    assert res.ofv_iterations.iloc[0] == pytest.approx(730.894727, abs=1e-5)
+    assert res.ofv == pytest.approx(730.847272, abs=1e-3)
+    assert res.parameter_estimates['IVCL'] == pytest.approx(0.114943, rel=0.05)
+    assert len(res.individual_ofv) == 59
+    assert list(res.individual_estimates.columns) == ['ETA_1', 'ETA_2']
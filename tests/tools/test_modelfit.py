@@ -0,0 +1,73 @@
+import os
+
+from pharmpy.config import ConfigurationContext
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.tools import read_modelfit_results
+from pharmpy.tools.modelfit import conf
+from pharmpy.tools.modelfit.cache import ModelfitResultsCache, get_modelfit_results_cache
+from pharmpy.tools.modelfit.tool import retrieve_from_database_or_execute_model_with_tool
+from pharmpy.workflows import LocalDirectoryToolDatabase, ModelEntry
+from pharmpy.workflows.hashing import ModelHash
+
+
+def test_modelfit_results_cache(tmp_path, pheno, pheno_path):
+    res = read_modelfit_results(pheno_path)
+    cache = ModelfitResultsCache(tmp_path, max_size=10**9)
+    assert cache.retrieve(pheno) is None
+
+    cache.store(pheno, res, res.log)
+    cached_res, cached_log = cache.retrieve(pheno.replace(name='other'))
+    assert cached_res.ofv == res.ofv
+    assert cached_res.parameter_estimates.equals(res.parameter_estimates)
+    assert cached_log is not None
+
+    assert (
+        cache.retrieve(
+            pheno.replace(parameters=pheno.parameters.set_initial_estimates({'PTVCL': 1.0}))
+        )
+        is None
+    )
+
+
+def test_modelfit_results_cache_eviction(tmp_path, pheno, pheno_path):
+    res = read_modelfit_results(pheno_path)
+    models = [
+        pheno.replace(parameters=pheno.parameters.set_initial_estimates({'PTVCL': float(i)}))
+        for i in range(1, 4)
+    ]
+    cache = ModelfitResultsCache(tmp_path, max_size=10**9)
+    cache.store(models[0], res)
+    entry_size = os.path.getsize(tmp_path / f'{ModelHash(models[0])}.pickle')
+
+    cache = ModelfitResultsCache(tmp_path, max_size=2 * entry_size)
+    cache.store(models[1], res)
+    os.utime(tmp_path / f'{ModelHash(models[0])}.pickle', (0, 0))
+    os.utime(tmp_path / f'{ModelHash(models[1])}.pickle', (1, 1))
+    # NOTE: Retrieving makes the first model the most recently used
+    assert cache.retrieve(models[0]) is not None
+    cache.store(models[2], res)
+    assert cache.retrieve(models[0]) is not None
+    assert cache.retrieve(models[1]) is None
+    assert cache.retrieve(models[2]) is not None
+
+
+def test_retrieve_from_cache(tmp_path, pheno, pheno_path):
+    res = read_modelfit_results(pheno_path)
+    with ConfigurationContext(conf, cache=True, cache_path=str(tmp_path / 'cache')):
+        cache = get_modelfit_results_cache('nonmem')
+        cache.store(pheno, res, res.log)
+
+        with chdir(tmp_path):
+            context = LocalDirectoryToolDatabase('modelfit')
+            task = retrieve_from_database_or_execute_model_with_tool('nonmem')
+            model = pheno.replace(name='run2', description='A copy')
+            model_entry = task(context, ModelEntry.create(model=model))
+
+    assert model_entry.model is model
+    assert model_entry.modelfit_results.name == 'run2'
+    assert model_entry.modelfit_results.ofv == res.ofv
+    assert context.model_database.retrieve_model_entry('run2').modelfit_results.ofv == res.ofv
+
+
+def test_cache_disabled_by_default():
+    assert get_modelfit_results_cache('nonmem') is None
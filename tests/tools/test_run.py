@@ -317,6 +317,32 @@ def test_rank_models():
         rank_models(base, base_res, models + [m5], models_res)
 
 
+def test_rank_models_strictness():
+    base = DummyModel('base', parameter_names=['p1'])
+    models = [DummyModel(f'm{i}', parameter_names=['p1', 'p2']) for i in range(6)]
+    base_res = DummyResults(name=base.name, ofv=0)
+    models_res = [
+        DummyResults(
+            name=model.name,
+            ofv=-i,
+            minimization_successful=i % 2 == 0,
+            termination_cause='rounding_errors' if i % 3 == 0 else None,
+            significant_digits=[np.nan, 2, 4][i % 3],
+        )
+        for i, model in enumerate(models)
+    ]
+    statement = 'minimization_successful or (rounding_errors and 1 < sigdigs < 3)'
+    df = rank_models(base, base_res, models, models_res, strictness=statement)
+    ranked = set(df.dropna().index)
+    assert ranked == {'base', 'm0', 'm2', 'm4'}
+    for model, res in zip(models, models_res):
+        assert (model.name in ranked) == is_strictness_fulfilled(res, model, statement)
+    assert list(df.dropna()['rank']) == [1, 2, 3, 3]
+
+    with pytest.raises(ValueError, match='Unknown rank_type'):
+        rank_models(base, base_res, models, models_res, rank_type='x')
+
+
 def test_rank_models_bic(load_model_for_test, testdata):
     model_base = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
     model_iiv = add_iiv(model_base, ['S1'], 'exp')
@@ -518,6 +544,16 @@ def test_load_example_modelfit_results():
             'final_zero_gradient_sigma',
             False,
         ),
+        (
+            'nonmem/pheno_real.mod',
+            '0.1 < rse_omega <= 1 and not sigdigs != 3.8',
+            True,
+        ),
+        (
+            'nonmem/pheno_real.mod',
+            'rse == 0.5 or not (rse_sigma > 0.1)',
+            False,
+        ),
     ],
 )
 def test_strictness(testdata, path, statement, expected):
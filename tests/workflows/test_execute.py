@@ -222,3 +222,68 @@ def test_local_dispatcher():
     wf = Workflow(wb)
     res = local_dask.run(wf)
     assert res == 'input'
+
+
+@pytest.mark.xdist_group(name="workflow")
+def test_execute_workflow_processes(tmp_path):
+    from pharmpy.config import ConfigurationContext
+    from pharmpy.workflows.dispatchers import conf
+
+    a = lambda: 2  # noqa E731
+    f = lambda x: x**2  # noqa E731
+    t1 = Task('t1', a)
+    t2 = Task('t2', f)
+    wb = WorkflowBuilder(tasks=[t1], name='test-workflow')
+    wb.add_task(t2, predecessors=[t1])
+    wf = Workflow(wb)
+
+    with chdir(tmp_path), ConfigurationContext(
+        conf,
+        dask_dispatcher='processes',
+        dask_n_workers=2,
+        dask_threads_per_worker=2,
+        dask_task_cpus=2,
+        dask_dashboard_address=':0',
+    ):
+        with warnings.catch_warnings():
+            ignore_scratch_warning()
+            res = execute_workflow(wf)
+
+    assert res == f(a())
+
+    with chdir(tmp_path), ConfigurationContext(conf, dask_dispatcher='processes', dask_task_cpus=2):
+        with pytest.raises(ValueError, match='dask_task_cpus'):
+            execute_workflow(wf)
+
+
+@pytest.mark.xdist_group(name="workflow")
+def test_execute_workflow_shared_cluster(tmp_path):
+    from pharmpy.config import ConfigurationContext
+    from pharmpy.workflows.dispatchers import conf
+    from pharmpy.workflows.dispatchers.local_dask import _close_shared_clusters
+
+    def nested(x):
+        t = Task('t', lambda: x + 1)
+        return execute_workflow(Workflow(WorkflowBuilder(tasks=[t], name='nested')))
+
+    t1 = Task('t1', lambda: 1)
+    t2 = Task('t2', nested)
+    wb = WorkflowBuilder(tasks=[t1], name='test-workflow')
+    wb.add_task(t2, predecessors=[t1])
+    wf = Workflow(wb)
+
+    with chdir(tmp_path), ConfigurationContext(
+        conf, dask_shared_cluster=True, dask_dashboard_address=':0'
+    ):
+        try:
+            with warnings.catch_warnings():
+                ignore_scratch_warning()
+                res1 = execute_workflow(wf)
+                shared = dict(local_dask._shared)
+                res2 = execute_workflow(wf)
+                assert local_dask._shared == shared
+        finally:
+            _close_shared_clusters()
+
+    assert res1 == res2 == 2
+    assert not local_dask._shared
@@ -1,9 +1,37 @@
+from pharmpy.deps import pandas as pd
 from pharmpy.workflows.hashing import DatasetHash, ModelHash
 
 
 def test_hash(load_example_model_for_test):
     model = load_example_model_for_test("pheno")
     h = ModelHash(model)
-    assert str(h) == "cC3WaMBw3uZGDzRrPuEqFHEfl--g3OYS42v6RmqnyCU"
+    assert str(h) == "VGCg33Lj8Be_5DcNziWu_Fn0WlfpqaKzwU1AKXHfKQk"
     d = DatasetHash(model.dataset)
     assert str(d) == h.dataset_hash
+
+    model2 = model.replace(name='run2', description='Another description')
+    assert str(ModelHash(model2)) == str(h)
+    assert str(DatasetHash(model.dataset.copy())) == str(d)
+
+    df = model.dataset.copy()
+    df.loc[0, 'DV'] = 1.0
+    assert str(DatasetHash(df)) != str(d)
+
+
+def test_dataset_hash_mixed_dtypes():
+    df = pd.DataFrame({'ID': [1, 2], 'DV': [0.5, 1.5], 'TYPE': ['a', 'b']}, index=pd.Index([3, 4]))
+    h = str(DatasetHash(df))
+    assert h == str(DatasetHash(df.copy()))
+    df2 = df.copy()
+    df2['TYPE'] = ['a', 'c']
+    assert h != str(DatasetHash(df2))
+    df3 = df.copy()
+    df3.index = pd.Index([3, 5])
+    assert h != str(DatasetHash(df3))
+
+
+def test_dataset_hash_modified_in_place():
+    df = pd.DataFrame({'A': [1.0, 2.0]})
+    h = str(DatasetHash(df))
+    df.loc[0, 'A'] = 5.0
+    assert h != str(DatasetHash(df))
@@ -0,0 +1,58 @@
+from pharmpy.deps import numpy as np
+from pharmpy.workflows.optimize import optimize_task_graph_for_dask_distributed
+
+
+class ScatterClient:
+    def __init__(self):
+        self.scattered = []
+
+    def scatter(self, values, hash=True):
+        self.scattered.append(values)
+        return [f'future-{i}' for i in range(len(values))]
+
+
+def _f(*args):
+    return args
+
+
+def _flatten(computations):
+    args = []
+    for computation in computations:
+        if isinstance(computation, tuple) and computation and callable(computation[0]):
+            args.extend(_flatten(computation[1:]))
+        elif isinstance(computation, list):
+            args.extend(_flatten(computation))
+        else:
+            args.append(computation)
+    return args
+
+
+def test_optimize_task_graph_for_dask_distributed(load_example_model_for_test):
+    model = load_example_model_for_test('pheno')
+    array = np.zeros(10000)
+    graph = {
+        'a': (_f, model, (1, 2), 'x'),
+        'b': (_f, model, array, [model, 3.0], 'a'),
+        'results': (_f, array, 'a', 'b'),
+    }
+    client = ScatterClient()
+    optimized = optimize_task_graph_for_dask_distributed(client, graph)
+
+    assert len(client.scattered) == 1
+    scattered = client.scattered[0]
+    assert len(scattered) == 2
+    assert scattered[0] is model
+    assert scattered[1] is array
+
+    args = _flatten(optimized.values())
+    assert 'future-0' in args and 'future-1' in args
+    assert not any(arg is model or arg is array for arg in args)
+    assert (1, 2) in args and 3.0 in args
+
+
+def test_optimize_task_graph_for_dask_distributed_small_values():
+    graph = {'results': (_f, (1, 2), {'a': 1}, [0.5])}
+    client = ScatterClient()
+    optimized = optimize_task_graph_for_dask_distributed(client, graph)
+    assert client.scattered == []
+    assert optimized == graph
@@ -1,6 +1,25 @@
-from pharmpy.workflows import NullToolDatabase
+from pharmpy.config import ConfigurationContext
+from pharmpy.deps import pandas as pd
+from pharmpy.workflows import LocalDirectoryToolDatabase, NullToolDatabase, conf
+from pharmpy.workflows.results import ModelfitResults, read_results
 
 
 def test_null_tool_database():
     db = NullToolDatabase("any", sl1=23, model=45, opr=12, dummy="some dummy kwargs")
     db.store_local_file("path")
+
+
+def test_local_directory_tool_database_results_format(tmp_path):
+    res = ModelfitResults(name='run1', ofv=12.5, parameter_estimates=pd.Series({'THETA_1': 0.5}))
+    db = LocalDirectoryToolDatabase('modelfit', path=tmp_path / 'json')
+    db.store_results(res)
+    assert (db.path / 'results.json').is_file()
+
+    with ConfigurationContext(conf, results_format='npz'):
+        db = LocalDirectoryToolDatabase('modelfit', path=tmp_path / 'npz')
+        db.store_results(res)
+    assert (db.path / 'results.npz').is_file()
+    assert not (db.path / 'results.json').exists()
+    res_decode = read_results(db.path)
+    assert res_decode.ofv == 12.5
+    pd.testing.assert_series_equal(res_decode.parameter_estimates, res.parameter_estimates)